@@ -0,0 +1,810 @@
+"""
+クイズデータ作成スクリプトのデータベース接続・操作
+
+main.py（単発の生成）・runner.py（並行生成）・streaming.py（ストリーミング生成）・dedup.py（重複検出）が
+同じ接続マネージャーを共有するよう、データベースに関するコードはこのモジュールにまとめます。
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+import boto3
+from datetime import datetime
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, Column, Integer, Text, JSON, DateTime, ForeignKey, String, Enum, Boolean
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.exc import SQLAlchemyError
+import dedup
+import generation
+
+load_dotenv()
+
+# SQLAlchemyのベースクラス
+Base = declarative_base()
+
+class Exam(Base):
+    """
+    試験テーブルのORMクラス
+    """
+    __tablename__ = 'exams'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    exam_name = Column(String(255), nullable=False, comment='試験名')
+    exam_code = Column(String(20), nullable=False, comment='AWS 公認のコード例：SAA-C03')
+    level = Column(Enum('Foundational', 'Associate', 'Professional', 'Specialty'), nullable=True, comment='難易度')
+    description = Column(Text, nullable=True, comment='試験概要')
+    is_active = Column(Boolean, nullable=False, default=True, comment='0なら非アクティブ')
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    updated_at = Column(DateTime, nullable=True, onupdate=datetime.now)
+
+class Category(Base):
+    """
+    カテゴリテーブルのORMクラス
+    """
+    __tablename__ = 'categories'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    category_name = Column(String(100), nullable=False, comment='カテゴリー名')
+    description = Column(Text, nullable=True, comment='概要')
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+
+class ExamCategory(Base):
+    """
+    試験カテゴリテーブルのORMクラス
+    """
+    __tablename__ = 'exam_categories'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    exam_id = Column(Integer, ForeignKey('exams.id'), nullable=False)
+    category_id = Column(Integer, ForeignKey('categories.id'), nullable=False)
+    question_count = Column(Integer, nullable=False, default=0, comment='論理削除されていない問題数')
+    
+    # リレーションシップ
+    exam = relationship("Exam")
+    category = relationship("Category")
+
+class Question(Base):
+    """
+    問題テーブルのORMクラス
+    """
+    __tablename__ = 'questions'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    body = Column(Text, nullable=False, comment='問題文')
+    explanation = Column(Text, nullable=False, comment='解説')
+    choices = Column(JSON, nullable=False, comment='選択肢')
+    correct_key = Column(JSON, nullable=False, comment='答えの選択肢ID')
+    exam_categories_id = Column(Integer, ForeignKey('exam_categories.id'), nullable=False, comment='試験・カテゴリー')
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    # lambdas のキャッシュ・ETagは updated_at で問題の変更を検出するため、作成時にも設定する
+    updated_at = Column(DateTime, nullable=True, default=datetime.now, onupdate=datetime.now)
+    deleted_at = Column(DateTime, nullable=True)
+
+# データベース接続設定
+DB_HOST = os.getenv("DB_HOST")
+DB_PORT = int(os.getenv("DB_PORT", "3306"))
+DB_NAME = os.getenv("DB_NAME")
+DB_USER = os.getenv("DB_USER")
+DB_PASSWORD = os.getenv("DB_PASSWORD")
+
+# Aurora Serverless V2 接続設定
+USE_AURORA_SERVERLESS = os.getenv("USE_AURORA_SERVERLESS", "false").lower() == "true"
+AURORA_CLUSTER_ARN = os.getenv("AURORA_CLUSTER_ARN")
+AURORA_SECRET_ARN = os.getenv("AURORA_SECRET_ARN")
+AWS_REGION = os.getenv("AWS_REGION", "ap-northeast-1")
+AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
+AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
+AWS_SESSION_TOKEN = os.getenv("AWS_SESSION_TOKEN")  # 一時的な認証情報を使用する場合
+# ローカルのData APIエミュレーターの接続先（設定するとAuroraの代わりに使用）
+DATA_API_EMULATOR_URL = os.getenv("DATA_API_EMULATOR_URL")
+
+# コネクション再利用設定
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# この秒数以上使われていなかったData API接続は、再利用前に疎通確認する
+DB_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_HEALTH_CHECK_INTERVAL", "60"))
+
+# 一括挿入設定
+BULK_INSERT_DB = os.getenv("BULK_INSERT_DB", "true").lower() == "true"
+INSERT_CHUNK_SIZE = int(os.getenv("INSERT_CHUNK_SIZE", "100"))
+# Data APIのBatchExecuteStatementはリクエストのペイロードサイズに上限があるため、
+# 1チャンクのパラメータの合計サイズがこの値を超えないように分割する
+DATA_API_MAX_BATCH_BYTES = int(os.getenv("DATA_API_MAX_BATCH_BYTES", str(3 * 1024 * 1024)))
+
+class DatabaseConnectionManager:
+    """
+    プロセス全体で共有するデータベース接続マネージャー
+    
+    RDSの場合はエンジン（コネクションプール）とセッションメーカーを1度だけ作成し、
+    Aurora Serverlessの場合はboto3のrds-dataクライアントを共有して、
+    スレッドごとにData API接続を保持します（Data API接続はトランザクションを
+    保持するため、スレッド間では共有しません）。
+    疎通確認は接続作成時と、一定時間使われていなかった接続の再利用時にのみ行います。
+    """
+    
+    def __init__(self, health_check_interval=None, rds_data_client=None):
+        self.health_check_interval = DB_HEALTH_CHECK_INTERVAL if health_check_interval is None else health_check_interval
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._session_factory = None
+        self._rds_data_client = rds_data_client
+    
+    def get(self):
+        """
+        接続を取得します。
+        
+        Returns:
+            tuple: (connection_type, connection_object) get_database_connectionと同じ形式
+        """
+        if USE_AURORA_SERVERLESS:
+            connection = self._get_aurora_connection()
+            return ("aurora_serverless", connection) if connection else (None, None)
+        session_factory = self._get_session_factory()
+        return ("rds", session_factory) if session_factory else (None, None)
+    
+    def invalidate(self):
+        """
+        現在のスレッドのData API接続を破棄します。
+        エラー発生後に呼び出すと、次回のgetで接続を作り直します。
+        """
+        connection = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+    
+    def close(self):
+        """エンジンと現在のスレッドの接続を破棄します"""
+        self.invalidate()
+        with self._lock:
+            if self._session_factory is not None:
+                self._session_factory.kw['bind'].dispose()
+                self._session_factory = None
+    
+    def _get_session_factory(self):
+        if self._session_factory is None:
+            with self._lock:
+                if self._session_factory is None:
+                    self._session_factory = get_standard_rds_connection()
+        return self._session_factory
+    
+    def _get_rds_data_client(self):
+        if self._rds_data_client is None:
+            with self._lock:
+                if self._rds_data_client is None:
+                    if DATA_API_EMULATOR_URL:
+                        client = create_data_api_emulator()
+                    else:
+                        configure_aws_environment()
+                        # boto3のクライアントはスレッドセーフなので全スレッドで共有する
+                        from dataapi_support.retry import data_api_client_config
+                        client = boto3.client('rds-data', region_name=os.environ['AWS_DEFAULT_REGION'],
+                                              config=data_api_client_config())
+                    self._rds_data_client = create_resilient_client(client)
+        return self._rds_data_client
+    
+    def _get_aurora_connection(self):
+        now = time.monotonic()
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and now - self._local.last_used_at > self.health_check_interval:
+            if not ping_aurora_connection(connection):
+                print("⚠️  Data API接続の疎通確認に失敗したため、再接続します")
+                self.invalidate()
+                connection = None
+        if connection is None:
+            connection = get_aurora_serverless_connection(rds_data_client=self._get_rds_data_client())
+            if connection is None:
+                return None
+            self._local.connection = connection
+        self._local.last_used_at = now
+        return connection
+
+def create_data_api_emulator():
+    """
+    Data APIエミュレーター（packages/dataapi-support の dataapi_support.emulator）をrds-dataクライアントとして作成します。
+    遅延・スロットリングの設定は DATA_API_EMULATOR_* 環境変数で指定します。
+    """
+    from dataapi_support.emulator import create_emulator_client
+    print(f"Data APIエミュレーターを使用します: {DATA_API_EMULATOR_URL}")
+    return create_emulator_client(DATA_API_EMULATOR_URL)
+
+def report_data_api_retry(outcome):
+    """Data APIの再試行結果を出力します（Aurora Serverlessの再開待ちの時間を確認するため）"""
+    status = "成功" if outcome.succeeded else "失敗"
+    print(f"⏳ Data API {outcome.operation}: {outcome.attempts}回目で{status} "
+          f"(待機 {outcome.waited_seconds:.1f}秒, うち再開待ち {outcome.resume_wait_seconds:.1f}秒, "
+          f"{', '.join(sorted(set(outcome.categories)))})")
+
+def create_resilient_client(client):
+    """
+    rds-dataクライアントを、再開中・スロットリングのエラーを待って再試行するプロキシで包みます。
+    再試行の処理は lambdas と共有しており（packages/dataapi-support）、同じ DB_RETRY_* 環境変数で設定します。
+    """
+    from dataapi_support.retry import ResilientDataAPIClient
+    return ResilientDataAPIClient(client, observer=report_data_api_retry)
+
+def get_database_connection():
+    """
+    データベース接続を取得します。
+    環境変数 USE_AURORA_SERVERLESS に基づいて通常のRDSまたはAurora Serverlessに接続します。
+    接続はプロセス全体で共有するconnection_managerが管理し、呼び出しごとに再接続はしません。
+    
+    Returns:
+        tuple: (connection_type, connection_object)
+        - connection_type: "rds" または "aurora_serverless"
+        - connection_object: SQLAlchemyのセッションメーカー（RDS）またはaurora_data_api接続（Aurora）
+    """
+    try:
+        return connection_manager.get()
+    except Exception as e:
+        print(f"データベース接続エラー: {e}")
+        return (None, None)
+
+def get_standard_rds_connection():
+    """
+    通常のRDSデータベース接続を取得します。
+    
+    Returns:
+        sessionmaker: SQLAlchemyのセッションメーカー
+    """
+    try:
+        # データベース接続文字列を作成
+        database_url = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
+        
+        # エンジンを作成（並行ワーカーからも共有できるようにプールサイズを設定し、
+        # チェックアウト時のpre-pingで切断済みの接続を透過的に張り直す）
+        engine = create_engine(
+            database_url,
+            echo=False,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True
+        )
+        
+        # セッションメーカーを作成
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        
+        print("✅ 標準RDSデータベースに接続しました")
+        return SessionLocal
+    except Exception as e:
+        print(f"❌ 標準RDSデータベース接続エラー: {e}")
+        return None
+
+def configure_aws_environment():
+    """
+    Data API接続に使用するAWS認証情報とリージョンを環境変数に設定します。
+    """
+    # AWS認証情報とリージョンを設定
+    if AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY:
+        print("明示的なAWS認証情報を使用します")
+        os.environ['AWS_ACCESS_KEY_ID'] = AWS_ACCESS_KEY_ID
+        os.environ['AWS_SECRET_ACCESS_KEY'] = AWS_SECRET_ACCESS_KEY
+        if AWS_SESSION_TOKEN:
+            os.environ['AWS_SESSION_TOKEN'] = AWS_SESSION_TOKEN
+    else:
+        print("デフォルトの認証情報（環境変数、プロファイル、またはEC2インスタンスロール）を使用します")
+    
+    # リージョンを環境変数に設定（必須）
+    if AWS_REGION:
+        os.environ['AWS_DEFAULT_REGION'] = AWS_REGION
+    elif not os.getenv('AWS_DEFAULT_REGION'):
+        print("警告: AWS_REGIONまたはAWS_DEFAULT_REGIONが設定されていません。ap-northeast-1を使用します。")
+        os.environ['AWS_DEFAULT_REGION'] = 'ap-northeast-1'
+
+def ping_aurora_connection(connection):
+    """
+    Data API接続の疎通確認を行います。
+    
+    Returns:
+        bool: 疎通できた場合True
+    """
+    try:
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT 1 as test_value")
+            cursor.fetchone()
+        finally:
+            cursor.close()
+        # 疎通確認で開始したトランザクションを終了する
+        connection.rollback()
+        return True
+    except Exception as e:
+        print(f"Data API接続の疎通確認エラー: {e}")
+        return False
+
+def get_aurora_serverless_connection(rds_data_client=None):
+    """
+    Aurora Serverless V2データベース接続をData APIとARNとSecretsManagerを使用して取得します。
+    Data APIを使用することでVPCの外からでも安全に接続できます。
+    
+    Args:
+        rds_data_client: 共有するboto3のrds-dataクライアント。Noneの場合はaurora_data_apiが作成します。
+    
+    Returns:
+        aurora_data_api connection: Data API の直接接続オブジェクト
+    """
+    try:
+        # aurora-data-api パッケージをインポート
+        import aurora_data_api
+        
+        if rds_data_client is None:
+            configure_aws_environment()
+        
+        # Data APIでAuroraに接続
+        print("Aurora Data API接続を作成中...")
+        connection = aurora_data_api.connect(
+            aurora_cluster_arn=AURORA_CLUSTER_ARN,
+            secret_arn=AURORA_SECRET_ARN,
+            database=DB_NAME,
+            rds_data_client=rds_data_client
+        )
+        
+        # 接続テスト
+        print("データベース接続テスト実行中...")
+        if not ping_aurora_connection(connection):
+            raise RuntimeError("データベース接続テストに失敗しました")
+        print("データベース接続テスト成功")
+        
+        print("✅ Aurora Serverless V2データベースにData APIで接続しました")
+        return connection
+        
+    except ImportError as ie:
+        print(f"❌ 必要なライブラリがインストールされていません: {ie}")
+        print("以下のコマンドを実行してください: pip install aurora-data-api")
+        return None
+    except Exception as e:
+        print(f"❌ Aurora Serverless Data API接続エラー: {str(e)}")
+        import traceback
+        print(f"エラー詳細: {traceback.format_exc()}")
+        return None
+
+# プロセス全体で共有する接続マネージャー
+connection_manager = DatabaseConnectionManager()
+
+def build_question_row(quiz, exam_categories_id, created_at=None):
+    """
+    生成されたクイズ1問分をquestionsテーブルの行データに変換します。
+    
+    Args:
+        quiz (dict): 生成されたクイズ
+        exam_categories_id (int): 試験カテゴリID
+        created_at (datetime): 作成日時。省略時は現在時刻
+    
+    Returns:
+        dict: questionsテーブルのカラム名をキーとする辞書
+    """
+    created_at = created_at or datetime.now()
+    return {
+        'body': quiz.get('body', ''),
+        'explanation': quiz.get('explanation', ''),
+        'choices': quiz.get('choices', []),
+        'correct_key': quiz.get('correct_choices', []),
+        'exam_categories_id': exam_categories_id,
+        'created_at': created_at,
+        'updated_at': created_at
+    }
+
+def chunk_rows(rows, chunk_size, max_bytes=None):
+    """
+    行データを件数（およびペイロードサイズ）の上限ごとに分割します。
+    
+    Args:
+        rows (list): 行データのリスト
+        chunk_size (int): 1チャンクあたりの最大件数
+        max_bytes (int): 1チャンクあたりの最大バイト数。Noneの場合はサイズで分割しない
+    
+    Yields:
+        list: 分割された行データ
+    """
+    chunk = []
+    chunk_bytes = 0
+    for row in rows:
+        row_bytes = len(json.dumps(row, default=str).encode('utf-8')) if max_bytes else 0
+        if chunk and (len(chunk) >= chunk_size or (max_bytes and chunk_bytes + row_bytes > max_bytes)):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(row)
+        chunk_bytes += row_bytes
+    if chunk:
+        yield chunk
+
+# 問題の挿入と同じトランザクションで、試験カテゴリの問題数を加算するSQL
+INCREMENT_QUESTION_COUNT_SQL = """
+UPDATE exam_categories SET question_count = question_count + :count WHERE id = :exam_categories_id
+"""
+
+def increment_question_count(session, exam_categories_id, count):
+    """
+    exam_categories.question_count を加算します（RDS、コミットは呼び出し側で行う）。
+    
+    Args:
+        session (Session): SQLAlchemyのセッション
+        exam_categories_id (int): 試験カテゴリID
+        count (int): 挿入した問題数
+    """
+    session.execute(
+        ExamCategory.__table__.update()
+        .where(ExamCategory.id == exam_categories_id)
+        .values(question_count=ExamCategory.question_count + count)
+    )
+
+def bulk_insert_questions_rds(session_factory, rows, chunk_size):
+    """
+    SQLAlchemy Coreの複数行INSERTで問題を一括挿入します（RDS）。
+    チャンクごとに1トランザクションでコミットします。
+    
+    Args:
+        session_factory (sessionmaker): SQLAlchemyのセッションメーカー
+        rows (list): build_question_rowで作成した行データのリスト
+        chunk_size (int): 1チャンクあたりの最大件数
+    
+    Returns:
+        tuple: (挿入した件数, 全件成功したかどうか)
+    """
+    inserted = 0
+    for chunk in chunk_rows(rows, chunk_size):
+        session = session_factory()
+        try:
+            # INSERT ... VALUES (...), (...), ... を1回のラウンドトリップで実行
+            session.execute(Question.__table__.insert().values(chunk))
+            for exam_categories_id, count in Counter(row['exam_categories_id'] for row in chunk).items():
+                increment_question_count(session, exam_categories_id, count)
+            session.commit()
+            inserted += len(chunk)
+        except SQLAlchemyError as e:
+            session.rollback()
+            print(f"❌ データベース一括挿入エラー（RDS）: {e}")
+            return inserted, False
+        except Exception as e:
+            session.rollback()
+            print(f"❌ 予期せぬエラー（RDS）: {e}")
+            return inserted, False
+        finally:
+            session.close()
+    return inserted, True
+
+def bulk_insert_questions_aurora(connection, rows, chunk_size):
+    """
+    Data APIのBatchExecuteStatementで問題を一括挿入します（Aurora Serverless）。
+    チャンクごとに1トランザクションでコミットします。
+    
+    Args:
+        connection: aurora_data_api接続
+        rows (list): build_question_rowで作成した行データのリスト
+        chunk_size (int): 1チャンクあたりの最大件数
+    
+    Returns:
+        tuple: (挿入した件数, 全件成功したかどうか)
+    """
+    insert_sql = """
+    INSERT INTO questions (body, explanation, choices, correct_key, exam_categories_id, created_at, updated_at)
+    VALUES (:body, :explanation, :choices, :correct_key, :exam_categories_id, :created_at, :updated_at)
+    """
+    # Data APIにはJSON型がないため、JSONカラムは文字列に変換して渡す
+    parameter_sets = [
+        dict(row, choices=json.dumps(row['choices']), correct_key=json.dumps(row['correct_key']))
+        for row in rows
+    ]
+    
+    inserted = 0
+    for chunk in chunk_rows(parameter_sets, chunk_size, DATA_API_MAX_BATCH_BYTES):
+        cursor = connection.cursor()
+        try:
+            # aurora_data_apiのexecutemanyはBatchExecuteStatementを1回呼び出す
+            cursor.executemany(insert_sql, chunk)
+            for exam_categories_id, count in Counter(row['exam_categories_id'] for row in chunk).items():
+                cursor.execute(INCREMENT_QUESTION_COUNT_SQL, {'count': count, 'exam_categories_id': exam_categories_id})
+            connection.commit()
+            inserted += len(chunk)
+        except Exception as e:
+            connection.rollback()
+            print(f"❌ データベース一括挿入エラー（Aurora Serverless）: {e}")
+            return inserted, False
+        finally:
+            cursor.close()
+    return inserted, True
+
+def insert_questions_to_db(quiz_list, exam_categories_id=None, bulk=None, chunk_size=None):
+    """
+    生成されたクイズをデータベースに挿入します。
+    
+    Args:
+        quiz_list (list): 生成されたクイズのリスト
+        exam_categories_id (int): 試験カテゴリID。デフォルトは環境変数から取得。
+        bulk (bool): 一括挿入モードを使用するかどうか。デフォルトは環境変数から取得。
+        chunk_size (int): 一括挿入時の1トランザクションあたりの件数。デフォルトは環境変数から取得。
+    
+    Returns:
+        bool: 成功した場合True、失敗した場合False
+    """
+    _, _, success = insert_questions(quiz_list, exam_categories_id, bulk, chunk_size)
+    return success
+
+def insert_questions(quiz_list, exam_categories_id=None, bulk=None, chunk_size=None):
+    """
+    insert_questions_to_dbと同じ処理で挿入し、挿入した件数も返します。
+    
+    Returns:
+        tuple: (挿入した件数, 重複として除外した件数, 全件成功したかどうか)
+    """
+    if exam_categories_id is None:
+        exam_categories_id = generation.EXAM_CATEGORIES_ID
+    if bulk is None:
+        bulk = BULK_INSERT_DB
+    if chunk_size is None:
+        chunk_size = INSERT_CHUNK_SIZE
+    
+    if not dedup.DEDUP_ENABLED:
+        inserted, success = _insert_questions(quiz_list, exam_categories_id, bulk, chunk_size)
+        return inserted, 0, success
+    
+    # 既存問題とほぼ同一の問題を除外してから挿入する
+    try:
+        dedup_index = dedup.get_index(exam_categories_id)
+    except Exception as e:
+        print(f"❌ 重複検出索引の読み込みに失敗しました: {e}")
+        return 0, 0, False
+    novel_list, provisional_keys = dedup_index.filter_novel(quiz_list)
+    skipped = len(quiz_list) - len(novel_list)
+    if skipped:
+        print(f"♻️  {len(quiz_list)}問中{skipped}問を重複として除外しました。")
+    if not novel_list:
+        return 0, skipped, True
+    inserted, success = _insert_questions(novel_list, exam_categories_id, bulk, chunk_size)
+    if not success:
+        # 一括挿入はチャンクごとに先頭から順にコミットされるため、コミットされなかった問題の仮キーだけを取り消す
+        # （コミット済みの問題は次回の読み込みでウォーターマーク以降として正式なidで取り込まれる）
+        dedup_index.discard(provisional_keys[inserted:])
+    return inserted, skipped, success
+
+def _insert_questions(quiz_list, exam_categories_id, bulk, chunk_size):
+    """
+    insert_questions_to_dbの本体。重複除外後のクイズを挿入します。
+    
+    Returns:
+        tuple: (コミットした件数, 全件成功したかどうか)。コミットされるのはquiz_listの先頭から件数分
+    """
+    connection_type, connection_obj = get_database_connection()
+    if not connection_obj:
+        return 0, False
+    
+    if bulk and connection_type in ("rds", "aurora_serverless"):
+        created_at = datetime.now()
+        rows = [build_question_row(quiz, exam_categories_id, created_at) for quiz in quiz_list]
+        label = "RDS" if connection_type == "rds" else "Aurora Serverless"
+        if connection_type == "rds":
+            inserted, success = bulk_insert_questions_rds(connection_obj, rows, chunk_size)
+        else:
+            inserted, success = bulk_insert_questions_aurora(connection_obj, rows, chunk_size)
+        
+        if success:
+            print(f"✅ {inserted}問の問題をデータベースに一括挿入しました（{label}、チャンクサイズ: {chunk_size}）。")
+        else:
+            print(f"⚠️  {len(rows)}問中{inserted}問を挿入した時点で失敗しました（{label}）。")
+            if connection_type == "aurora_serverless":
+                connection_manager.invalidate()
+        return inserted, success
+    
+    if connection_type == "rds":
+        # SQLAlchemy セッションを使用
+        session = connection_obj()
+        try:
+            for quiz in quiz_list:
+                # Questionオブジェクトを作成
+                question = Question(
+                    body=quiz.get('body', ''),
+                    explanation=quiz.get('explanation', ''),
+                    choices=quiz.get('choices', []),  # JSONとして直接保存
+                    correct_key=quiz.get('correct_choices', []),  # JSONとして直接保存
+                    exam_categories_id=exam_categories_id
+                )
+                
+                # セッションに追加
+                session.add(question)
+            increment_question_count(session, exam_categories_id, len(quiz_list))
+            
+            # コミット
+            session.commit()
+            print(f"✅ {len(quiz_list)}問の問題をデータベースに挿入しました（RDS）。")
+            return len(quiz_list), True
+            
+        except SQLAlchemyError as e:
+            session.rollback()
+            print(f"❌ データベース挿入エラー（RDS）: {e}")
+            return 0, False
+        except Exception as e:
+            session.rollback()
+            print(f"❌ 予期せぬエラー（RDS）: {e}")
+            return 0, False
+        finally:
+            session.close()
+    
+    elif connection_type == "aurora_serverless":
+        # Aurora Data API 接続を使用
+        cursor = connection_obj.cursor()
+        try:
+            for quiz in quiz_list:
+                # JSONデータを文字列に変換
+                choices_json = json.dumps(quiz.get('choices', []))
+                correct_key_json = json.dumps(quiz.get('correct_choices', []))
+                
+                # INSERT文を実行
+                insert_sql = """
+                INSERT INTO questions (body, explanation, choices, correct_key, exam_categories_id, created_at, updated_at)
+                VALUES (:body, :explanation, :choices, :correct_key, :exam_categories_id, :created_at, :created_at)
+                """
+                
+                cursor.execute(insert_sql, {
+                    'body': quiz.get('body', ''),
+                    'explanation': quiz.get('explanation', ''),
+                    'choices': choices_json,
+                    'correct_key': correct_key_json,
+                    'exam_categories_id': exam_categories_id,
+                    'created_at': datetime.now()
+                })
+            cursor.execute(INCREMENT_QUESTION_COUNT_SQL, {'count': len(quiz_list), 'exam_categories_id': exam_categories_id})
+            connection_obj.commit()  # Aurora Data APIは自動コミットではないため、明示的にコミット
+            # Aurora Data APIは自動コミット
+            print(f"✅ {len(quiz_list)}問の問題をデータベースに挿入しました（Aurora Serverless）。")
+            return len(quiz_list), True
+            
+        except Exception as e:
+            print(f"❌ データベース挿入エラー（Aurora Serverless）: {e}")
+            connection_manager.invalidate()
+            return 0, False
+        finally:
+            cursor.close()
+    
+    else:
+        print(f"❌ 未対応の接続タイプ: {connection_type}")
+        return 0, False
+
+def fetch_questions_after(exam_categories_id, after_id, limit):
+    """
+    指定した試験カテゴリの問題のうち、idがafter_idより大きいものをid順に取得します。
+    重複検出索引の差分取り込みに使用します（論理削除済みの問題は除外）。
+    
+    Args:
+        exam_categories_id (int): 試験カテゴリID
+        after_id (int): このidより大きい問題を取得する
+        limit (int): 最大取得件数
+    
+    Returns:
+        list: {'id', 'body', 'choices'} の辞書のリスト。エラーの場合はNone
+    """
+    connection_type, connection_obj = get_database_connection()
+    if not connection_obj:
+        return None
+    
+    if connection_type == "rds":
+        session = connection_obj()
+        try:
+            rows = session.query(Question.id, Question.body, Question.choices).filter(
+                Question.exam_categories_id == exam_categories_id,
+                Question.id > after_id,
+                Question.deleted_at.is_(None)
+            ).order_by(Question.id).limit(limit).all()
+            return [{'id': row.id, 'body': row.body, 'choices': row.choices} for row in rows]
+        except SQLAlchemyError as e:
+            print(f"❌ データベース取得エラー（RDS）: {e}")
+            return None
+        finally:
+            session.close()
+    
+    elif connection_type == "aurora_serverless":
+        cursor = connection_obj.cursor()
+        try:
+            query_sql = """
+            SELECT id, body, choices
+            FROM questions
+            WHERE exam_categories_id = :exam_categories_id
+              AND id > :after_id
+              AND deleted_at IS NULL
+            ORDER BY id
+            LIMIT :limit
+            """
+            cursor.execute(query_sql, {'exam_categories_id': exam_categories_id, 'after_id': after_id, 'limit': limit})
+            rows = cursor.fetchall()
+            # 接続は再利用されるため、読み取りで開始したトランザクションはここで終了する
+            connection_obj.rollback()
+            # Data APIではJSONカラムが文字列で返る
+            return [
+                {'id': row[0], 'body': row[1], 'choices': json.loads(row[2]) if isinstance(row[2], str) else row[2]}
+                for row in rows
+            ]
+        except Exception as e:
+            print(f"❌ データベース取得エラー（Aurora Serverless）: {e}")
+            connection_manager.invalidate()
+            return None
+        finally:
+            cursor.close()
+    
+    else:
+        print(f"❌ 未対応の接続タイプ: {connection_type}")
+        return None
+
+def get_exam_category_info(exam_categories_id):
+    """
+    EXAM_CATEGORIES_IDから試験名とカテゴリ名を取得します。
+    
+    Args:
+        exam_categories_id (int): 試験カテゴリID
+    
+    Returns:
+        tuple: (exam_name, category_name, exam_code, category_description) または (None, None, None, None)
+    """
+    connection_type, connection_obj = get_database_connection()
+    if not connection_obj:
+        return None, None, None, None
+    
+    if connection_type == "rds":
+        # SQLAlchemy セッションを使用
+        session = connection_obj()
+        try:
+            # exam_categoriesテーブルから関連情報を取得
+            result = session.query(ExamCategory).filter(
+                ExamCategory.id == exam_categories_id
+            ).first()
+            
+            if result:
+                exam_name = result.exam.exam_name
+                category_name = result.category.category_name
+                exam_code = result.exam.exam_code
+                category_description = result.category.description
+                return exam_name, category_name, exam_code, category_description
+            else:
+                print(f"❌ EXAM_CATEGORIES_ID {exam_categories_id} が見つかりません。")
+                return None, None, None, None
+                
+        except SQLAlchemyError as e:
+            print(f"❌ データベース取得エラー（RDS）: {e}")
+            return None, None, None, None
+        except Exception as e:
+            print(f"❌ 予期せぬエラー（RDS）: {e}")
+            return None, None, None, None
+        finally:
+            session.close()
+    
+    elif connection_type == "aurora_serverless":
+        # Aurora Data API 接続を使用
+        cursor = connection_obj.cursor()
+        try:
+            # JOINクエリで関連情報を取得
+            query_sql = """
+            SELECT e.exam_name, c.category_name, e.exam_code, c.description
+            FROM exam_categories ec
+            JOIN exams e ON ec.exam_id = e.id
+            JOIN categories c ON ec.category_id = c.id
+            WHERE ec.id = :exam_categories_id
+            """
+            
+            cursor.execute(query_sql, {'exam_categories_id': exam_categories_id})
+            result = cursor.fetchone()
+            # 接続は再利用されるため、読み取りで開始したトランザクションはここで終了する
+            connection_obj.rollback()
+            
+            if result:
+                exam_name, category_name, exam_code, category_description = result
+                return exam_name, category_name, exam_code, category_description
+            else:
+                print(f"❌ EXAM_CATEGORIES_ID {exam_categories_id} が見つかりません。")
+                return None, None, None, None
+                
+        except Exception as e:
+            print(f"❌ データベース取得エラー（Aurora Serverless）: {e}")
+            connection_manager.invalidate()
+            return None, None, None, None
+        finally:
+            cursor.close()
+    
+    else:
+        print(f"❌ 未対応の接続タイプ: {connection_type}")
+        return None, None, None, None
@@ -0,0 +1,304 @@
+"""
+生成された問題の重複（ほぼ同一の問題）を検出するモジュール
+
+問題文と選択肢を正規化した文字n-gram（シングル）のMinHash署名をLSHで索引化し、
+新しく生成された問題と類似した既存問題を候補の絞り込みだけで探します。
+索引は exam_categories_id ごとにファイルへ保存し、次回の実行では
+保存時点より後に追加された問題（idがウォーターマークより大きいもの）だけを取り込みます。
+"""
+
+import atexit
+import base64
+import hashlib
+import json
+import os
+import struct
+import threading
+import unicodedata
+from dotenv import load_dotenv
+
+import database
+
+load_dotenv()
+
+# 重複検出設定、trueなら既存問題とほぼ同一の問題を挿入前に除外（database.insert_questions_to_db で使用）
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+DEDUP_INDEX_DIR = os.getenv("DEDUP_INDEX_DIR", "dedup_index")
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+# バンド数を増やすほど低い類似度の組も候補になる（再現率が上がり、候補の検証コストが増える）
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "32"))
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "3"))
+# 既存問題を取り込む際の1回あたりの取得件数
+DEDUP_FETCH_SIZE = int(os.getenv("DEDUP_FETCH_SIZE", "1000"))
+
+INDEX_FORMAT_VERSION = 1
+
+def normalize_text(text):
+    """
+    日本語テキストを比較用に正規化します。
+
+    NFKCで全角英数字・半角カナを統一し、カタカナをひらがなに寄せ、
+    小文字化したうえで文字・数字以外（空白、句読点、記号）を取り除きます。
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    chars = []
+    for char in text:
+        if "ァ" <= char <= "ヶ":
+            char = chr(ord(char) - 0x60)
+        if unicodedata.category(char)[0] in ("L", "N"):
+            chars.append(char)
+    return "".join(chars)
+
+def question_text(question):
+    """問題文と選択肢のテキストを1つの比較用テキストにまとめます"""
+    choices = question.get("choices") or []
+    if isinstance(choices, str):
+        choices = json.loads(choices)
+    choice_texts = sorted(normalize_text(choice.get("choice_text", "")) for choice in choices if isinstance(choice, dict))
+    return normalize_text(question.get("body", "")) + "".join(choice_texts)
+
+def shingles(text, size=None):
+    """文字n-gramの集合を返します（日本語は単語区切りがないため文字単位で分割する）"""
+    size = size or DEDUP_SHINGLE_SIZE
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+class MinHasher:
+    """
+    シングル集合からMinHash署名を計算するクラス
+
+    SHAKE-128の可変長出力を num_perm 個の独立な32bitハッシュとして使い、
+    各スロットごとの最小値を署名とします。
+    """
+
+    def __init__(self, num_perm=None):
+        self.num_perm = num_perm or DEDUP_NUM_PERM
+        self._format = f"<{self.num_perm}I"
+        self._digest_size = 4 * self.num_perm
+
+    def signature(self, shingle_set):
+        if not shingle_set:
+            return (0xFFFFFFFF,) * self.num_perm
+        hashes = [
+            struct.unpack(self._format, hashlib.shake_128(shingle.encode("utf-8")).digest(self._digest_size))
+            for shingle in shingle_set
+        ]
+        return tuple(map(min, zip(*hashes)))
+
+def estimate_similarity(signature_a, signature_b):
+    """2つの署名から推定Jaccard類似度を計算します"""
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / len(signature_a)
+
+class QuestionDedupIndex:
+    """
+    exam_categories_id 1つ分の重複検出索引
+
+    署名はLSHのバンドごとのバケットに登録され、問い合わせ時は同じバケットに
+    入った問題だけを候補として推定類似度を検証します。
+    """
+
+    def __init__(self, exam_categories_id, threshold=None, num_perm=None, bands=None):
+        self.exam_categories_id = exam_categories_id
+        self.threshold = DEDUP_THRESHOLD if threshold is None else threshold
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands or DEDUP_BANDS
+        if self.hasher.num_perm % self.bands != 0:
+            raise ValueError("DEDUP_NUM_PERM は DEDUP_BANDS で割り切れる必要があります")
+        self.rows = self.hasher.num_perm // self.bands
+        # 保存済みの問題のうち最大のid。次回はこれより大きいidだけを取り込む
+        self.watermark = 0
+        self._signatures = {}
+        self._buckets = [{} for _ in range(self.bands)]
+        self._provisional_seq = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def _insert(self, key, signature):
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, set()).add(key)
+
+    def _remove(self, key):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def signature_of(self, question):
+        return self.hasher.signature(shingles(question_text(question)))
+
+    def find_duplicate(self, signature):
+        """
+        類似度がしきい値以上の既存問題を探します。
+
+        Returns:
+            tuple: (key, 類似度)。見つからない場合はNone
+        """
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        best = None
+        for key in candidates:
+            similarity = estimate_similarity(signature, self._signatures[key])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def add_stored(self, question_id, question):
+        """データベースに保存済みの問題を登録します"""
+        with self._lock:
+            self._insert(question_id, self.signature_of(question))
+            self.watermark = max(self.watermark, question_id)
+
+    def filter_novel(self, questions):
+        """
+        既存問題・同じバッチ内の問題と重複しない問題だけを返します。
+        返した問題はidが未確定のため仮キーで登録されます（保存はされません）。
+
+        Returns:
+            tuple: (重複しない問題のリスト, 仮キーのリスト)
+        """
+        novel = []
+        keys = []
+        with self._lock:
+            for question in questions:
+                signature = self.signature_of(question)
+                duplicate = self.find_duplicate(signature)
+                if duplicate is not None:
+                    print(f"♻️  重複のためスキップします (類似度 {duplicate[1]:.2f}, 既存キー {duplicate[0]}): {question.get('body', '')[:40]}")
+                    continue
+                self._provisional_seq += 1
+                key = f"new-{self._provisional_seq}"
+                self._insert(key, signature)
+                novel.append(question)
+                keys.append(key)
+        return novel, keys
+
+    def discard(self, keys):
+        """挿入に失敗した問題の仮キーを取り消します"""
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def to_dict(self):
+        """保存用の辞書に変換します（仮キーの問題は次回ウォーターマーク以降として取り込まれるため含めない）"""
+        with self._lock:
+            return {
+                "version": INDEX_FORMAT_VERSION,
+                "exam_categories_id": self.exam_categories_id,
+                "num_perm": self.hasher.num_perm,
+                "bands": self.bands,
+                "shingle_size": DEDUP_SHINGLE_SIZE,
+                "watermark": self.watermark,
+                "signatures": {
+                    str(key): base64.b64encode(struct.pack(self.hasher._format, *signature)).decode("ascii")
+                    for key, signature in self._signatures.items()
+                    if isinstance(key, int)
+                },
+            }
+
+    @classmethod
+    def from_dict(cls, data, threshold=None):
+        """
+        保存された辞書から索引を復元します。
+        署名のパラメータが現在の設定と異なる場合はNoneを返します（作り直しが必要）。
+        """
+        if (data.get("version") != INDEX_FORMAT_VERSION
+                or data.get("num_perm") != DEDUP_NUM_PERM
+                or data.get("shingle_size") != DEDUP_SHINGLE_SIZE):
+            return None
+        index = cls(data["exam_categories_id"], threshold=threshold, bands=data.get("bands"))
+        fmt = index.hasher._format
+        for key, encoded in data["signatures"].items():
+            index._insert(int(key), struct.unpack(fmt, base64.b64decode(encoded)))
+        index.watermark = data.get("watermark", 0)
+        return index
+
+def index_path(exam_categories_id):
+    return os.path.join(DEDUP_INDEX_DIR, f"exam_categories_{exam_categories_id}.json")
+
+def save_index(index):
+    """索引をファイルに保存します（一時ファイルに書いてから置き換える）"""
+    os.makedirs(DEDUP_INDEX_DIR, exist_ok=True)
+    path = index_path(index.exam_categories_id)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index.to_dict(), f)
+    os.replace(tmp_path, path)
+
+def load_index(exam_categories_id):
+    """
+    保存済みの索引を読み込み、ウォーターマーク以降に追加された問題を取り込みます。
+
+    Returns:
+        QuestionDedupIndex: 最新の状態に追いついた索引
+    """
+    index = None
+    path = index_path(exam_categories_id)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            index = QuestionDedupIndex.from_dict(json.load(f))
+        if index is None:
+            print(f"⚠️  重複検出索引の設定が変更されたため作り直します: {path}")
+    if index is None:
+        index = QuestionDedupIndex(exam_categories_id)
+
+    loaded = 0
+    while True:
+        rows = database.fetch_questions_after(exam_categories_id, index.watermark, DEDUP_FETCH_SIZE)
+        if rows is None:
+            raise RuntimeError("重複検出索引の更新に必要な既存問題を取得できませんでした")
+        for row in rows:
+            index.add_stored(row["id"], row)
+        loaded += len(rows)
+        if len(rows) < DEDUP_FETCH_SIZE:
+            break
+    print(f"🔎 重複検出索引を読み込みました (EXAM_CATEGORIES_ID {exam_categories_id}: {len(index)}問、新規取り込み {loaded}問)")
+    return index
+
+_indexes = {}
+_load_locks = {}
+_indexes_lock = threading.Lock()
+
+def get_index(exam_categories_id):
+    """
+    実行中に1度だけ索引を読み込み、以降は同じインスタンスを返します。
+    読み込んだ索引はプロセス終了時に保存されます。
+
+    読み込み（既存問題の取得）は exam_categories_id ごとのロックで行うため、
+    異なるカテゴリーの索引は並行して読み込まれます。
+    """
+    with _indexes_lock:
+        index = _indexes.get(exam_categories_id)
+        if index is not None:
+            return index
+        load_lock = _load_locks.setdefault(exam_categories_id, threading.Lock())
+    with load_lock:
+        with _indexes_lock:
+            index = _indexes.get(exam_categories_id)
+        if index is None:
+            index = load_index(exam_categories_id)
+            with _indexes_lock:
+                if not _indexes:
+                    atexit.register(save_all_indexes)
+                _indexes[exam_categories_id] = index
+        return index
+
+def save_all_indexes():
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        save_index(index)
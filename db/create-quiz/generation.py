@@ -0,0 +1,88 @@
+"""
+OpenAI APIでクイズを生成する際の設定とリクエストの組み立て
+
+main.py・runner.py・streaming.py で共通して使用します。
+"""
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 環境変数から設定値を読み込み
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL")
+NUM_QUESTIONS = int(os.getenv("NUM_QUESTIONS"))
+EXAM_CATEGORIES_ID = int(os.getenv("EXAM_CATEGORIES_ID"))
+SYSTEM_PROMPT = os.getenv("SYSTEM_PROMPT")
+
+# データベースへの自動挿入設定
+AUTO_INSERT_DB = os.getenv("AUTO_INSERT_DB", "true").lower() == "true"
+
+# ストリーミング生成設定、trueなら生成完了を待たずに完成した問題から順に挿入
+STREAM_GENERATION = os.getenv("STREAM_GENERATION", "false").lower() == "true"
+
+def build_user_prompt(exam_name, exam_code, category_name, category_description, num_questions):
+    """
+    クイズ生成用のユーザープロンプトを作成します。
+    
+    Returns:
+        str: ユーザープロンプト
+    """
+    return f"""
+        クイズをJSON形式で生成してください。
+        - 試験名: {exam_name}
+        - 試験コード: {exam_code}
+        - カテゴリ: {category_name}
+        - カテゴリ概要: {category_description}
+        - 問題数: {num_questions}
+        """
+
+def build_response_request(user_prompt):
+    """
+    OpenAI Responses APIのリクエストパラメータを作成します。
+    同期クライアント・非同期クライアントの両方で使用します。
+    
+    Returns:
+        dict: client.responses.create に渡すキーワード引数
+    """
+    return dict(
+        model=OPENAI_MODEL,
+        input=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        text={
+            "format": {
+                "type": "json_object"
+            },
+        }
+    )
+
+def normalize_quiz_list(quiz_list):
+    """
+    json.loads後のレスポンスをクイズのリストに正規化します。
+    
+    GPT-3.5-turboで response_format を使っても、期待通りの配列ではなく、
+    "questions": [...] のようなオブジェクトを返すことがあるため、柔軟にパースする
+    
+    Args:
+        quiz_list: json.loads後のデータ
+    
+    Returns:
+        list: クイズのリスト。予期しない形式の場合はNone
+    """
+    # もし、トップレベルが "questions" のようなキーを持つオブジェクトだったら、その中の配列を取り出す
+    if isinstance(quiz_list, dict) and len(quiz_list.keys()) == 1:
+        potential_key = list(quiz_list.keys())[0]
+        if isinstance(quiz_list[potential_key], list):
+            quiz_list = quiz_list[potential_key]
+
+    # num_questionsが1の場合でも配列でラップされていることを期待
+    if not isinstance(quiz_list, list):
+        # 単一のオブジェクトが返ってきた場合、リストに変換
+        if isinstance(quiz_list, dict) and "body" in quiz_list:
+            quiz_list = [quiz_list]
+        else:
+            return None
+    return quiz_list
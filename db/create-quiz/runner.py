@@ -0,0 +1,264 @@
+"""
+複数の試験カテゴリの問題生成を並行実行するランナー
+
+(exam_categories_id, 問題数) のジョブ一覧を受け取り、非同期OpenAIクライアントで
+同時実行数を制限しながら並行にクイズを生成・挿入します。
+RPM（リクエスト数/分）とTPM（トークン数/分）はトークンバケットで制御し、
+RateLimitError / APIConnectionError はジッター付き指数バックオフでリトライします。
+
+使い方:
+    python runner.py 3:20 4:20 5:10
+    # または環境変数 GENERATION_JOBS="3:20,4:20,5:10" を設定して引数なしで実行
+
+OPENAI_BASE_URL を設定すると、ローカルのスタブサーバーに向けて実行できます。
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+
+import openai
+
+import database
+import generation
+
+# ランナー設定
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+GENERATION_JOBS = os.getenv("GENERATION_JOBS", "")
+RUNNER_MAX_CONCURRENCY = int(os.getenv("RUNNER_MAX_CONCURRENCY", "4"))
+QUESTIONS_PER_REQUEST = int(os.getenv("QUESTIONS_PER_REQUEST", "10"))
+
+# レート制限設定（OpenAIのアカウントの上限に合わせる）
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "200000"))
+# 実際の使用量はレスポンス受信後に判明するため、送信前は問題数から見積もる
+ESTIMATED_TOKENS_PER_QUESTION = int(os.getenv("ESTIMATED_TOKENS_PER_QUESTION", "600"))
+ESTIMATED_PROMPT_TOKENS = int(os.getenv("ESTIMATED_PROMPT_TOKENS", "1000"))
+
+# リトライ設定
+RUNNER_MAX_RETRIES = int(os.getenv("RUNNER_MAX_RETRIES", "5"))
+RUNNER_RETRY_BASE_DELAY = float(os.getenv("RUNNER_RETRY_BASE_DELAY", "1.0"))
+RUNNER_RETRY_MAX_DELAY = float(os.getenv("RUNNER_RETRY_MAX_DELAY", "60.0"))
+
+@dataclass
+class GenerationJob:
+    """1カテゴリ分の生成ジョブ"""
+    exam_categories_id: int
+    count: int
+
+class TokenBucket:
+    """
+    1分あたりの上限値から補充レートを決めるトークンバケット
+
+    待機中のコルーチンはロック順に処理されるため、大きなリクエストが
+    小さなリクエストに追い越され続けることはありません。
+    """
+
+    def __init__(self, per_minute, capacity=None, clock=time.monotonic):
+        self.capacity = capacity or per_minute
+        self.refill_per_second = per_minute / 60.0
+        self.tokens = float(self.capacity)
+        self._clock = clock
+        self._updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.refill_per_second)
+        self._updated_at = now
+
+    async def acquire(self, amount=1):
+        """トークンが貯まるまで待機してから消費します"""
+        # バケット容量を超える要求は永久に満たされないため容量で頭打ちにする
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.refill_per_second)
+
+    def adjust(self, delta):
+        """見積もりと実績の差分を反映します（負の値で追加消費）"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + delta)
+
+class RateLimiter:
+    """RPMとTPMの両方を満たすまで待機するリミッター"""
+
+    def __init__(self, rpm=None, tpm=None):
+        self.requests = TokenBucket(rpm or OPENAI_RPM_LIMIT)
+        self.tokens = TokenBucket(tpm or OPENAI_TPM_LIMIT)
+
+    async def acquire(self, estimated_tokens):
+        await self.requests.acquire(1)
+        await self.tokens.acquire(estimated_tokens)
+
+    def record_usage(self, estimated_tokens, actual_tokens):
+        """レスポンスの実トークン数で見積もりを補正します"""
+        if actual_tokens is not None:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+
+def parse_jobs(specs):
+    """
+    "ID:COUNT" 形式の文字列のリストをジョブに変換します。
+
+    Args:
+        specs (list): "3:20" のような文字列のリスト
+
+    Returns:
+        list: GenerationJobのリスト
+    """
+    jobs = []
+    for spec in specs:
+        spec = spec.strip()
+        if not spec:
+            continue
+        exam_categories_id, _, count = spec.partition(":")
+        jobs.append(GenerationJob(int(exam_categories_id), int(count or generation.NUM_QUESTIONS)))
+    return jobs
+
+def split_count(count, per_request):
+    """問題数を1リクエストあたりの上限ごとに分割します"""
+    return [min(per_request, count - start) for start in range(0, count, per_request)]
+
+def retry_delay(attempt, error=None):
+    """
+    リトライまでの待機秒数を計算します（Full Jitter）。
+    RateLimitErrorにretry-afterヘッダーがあればその値を下限とします。
+    """
+    delay = random.uniform(0, min(RUNNER_RETRY_MAX_DELAY, RUNNER_RETRY_BASE_DELAY * (2 ** attempt)))
+    response = getattr(error, "response", None)
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        try:
+            delay = max(delay, float(retry_after))
+        except (TypeError, ValueError):
+            pass
+    return delay
+
+async def create_with_retry(client, limiter, request, estimated_tokens, label):
+    """
+    レート制限を守りながら client.responses.create を実行します。
+
+    Raises:
+        openai.RateLimitError / openai.APIConnectionError: リトライ回数を超えた場合
+    """
+    for attempt in range(RUNNER_MAX_RETRIES + 1):
+        await limiter.acquire(estimated_tokens)
+        try:
+            response = await client.responses.create(**request)
+        except (openai.RateLimitError, openai.APIConnectionError) as e:
+            if attempt >= RUNNER_MAX_RETRIES:
+                raise
+            delay = retry_delay(attempt, e)
+            print(f"⏳ {label}: {type(e).__name__} のため {delay:.1f}秒後にリトライします ({attempt + 1}/{RUNNER_MAX_RETRIES})")
+            await asyncio.sleep(delay)
+            continue
+        usage = getattr(response, "usage", None)
+        limiter.record_usage(estimated_tokens, getattr(usage, "total_tokens", None))
+        return response
+
+async def generate_batch(client, limiter, semaphore, job, category_info, num_questions, auto_insert_db):
+    """
+    1リクエスト分の問題を生成し、必要に応じてデータベースに挿入します。
+
+    Returns:
+        int: 生成（挿入）できた問題数
+    """
+    exam_name, category_name, exam_code, category_description = category_info
+    label = f"EXAM_CATEGORIES_ID {job.exam_categories_id} ({num_questions}問)"
+    user_prompt = generation.build_user_prompt(exam_name, exam_code, category_name, category_description, num_questions)
+    estimated_tokens = ESTIMATED_PROMPT_TOKENS + ESTIMATED_TOKENS_PER_QUESTION * num_questions
+
+    async with semaphore:
+        response = await create_with_retry(
+            client, limiter, generation.build_response_request(user_prompt), estimated_tokens, label
+        )
+
+    quiz_list = generation.normalize_quiz_list(json.loads(response.output_text))
+    if not quiz_list:
+        print(f"❌ {label}: 予期しないJSON形式のレスポンスです。")
+        return 0
+
+    if auto_insert_db:
+        # DB操作は同期APIのためスレッドで実行し、イベントループを塞がない
+        insert_success = await asyncio.to_thread(database.insert_questions_to_db, quiz_list, job.exam_categories_id)
+        if not insert_success:
+            print(f"⚠️  {label}: データベースへの挿入に失敗しました。")
+            return 0
+    print(f"✅ {label}: {len(quiz_list)}問を生成しました。")
+    return len(quiz_list)
+
+async def run_jobs(jobs, max_concurrency=None, auto_insert_db=None, client=None):
+    """
+    ジョブ一覧を並行に実行します。
+
+    Args:
+        jobs (list): GenerationJobのリスト
+        max_concurrency (int): OpenAI APIの同時リクエスト数の上限
+        auto_insert_db (bool): 生成した問題をデータベースに挿入するかどうか
+        client: openai.AsyncOpenAI互換のクライアント（テスト用に差し替え可能）
+
+    Returns:
+        dict: exam_categories_idごとの生成問題数
+    """
+    if max_concurrency is None:
+        max_concurrency = RUNNER_MAX_CONCURRENCY
+    if auto_insert_db is None:
+        auto_insert_db = generation.AUTO_INSERT_DB
+    if client is None:
+        # リトライはこのランナーで制御するため、クライアント側のリトライは無効にする
+        client = openai.AsyncOpenAI(api_key=generation.OPENAI_API_KEY, base_url=OPENAI_BASE_URL or None, max_retries=0)
+
+    limiter = RateLimiter()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    # 試験名・カテゴリ名はジョブごとに1回だけ取得する
+    category_infos = await asyncio.gather(
+        *(asyncio.to_thread(database.get_exam_category_info, job.exam_categories_id) for job in jobs)
+    )
+
+    tasks = []
+    task_jobs = []
+    for job, category_info in zip(jobs, category_infos):
+        if not category_info[0] or not category_info[1]:
+            print(f"❌ EXAM_CATEGORIES_ID {job.exam_categories_id} の試験名またはカテゴリ名の取得に失敗しました。")
+            continue
+        for num_questions in split_count(job.count, QUESTIONS_PER_REQUEST):
+            tasks.append(generate_batch(client, limiter, semaphore, job, category_info, num_questions, auto_insert_db))
+            task_jobs.append(job)
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    generated = {job.exam_categories_id: 0 for job in jobs}
+    for job, result in zip(task_jobs, results):
+        if isinstance(result, Exception):
+            print(f"❌ EXAM_CATEGORIES_ID {job.exam_categories_id}: 生成に失敗しました - {type(result).__name__}: {result}")
+            continue
+        generated[job.exam_categories_id] += result
+    return generated
+
+def main(argv=None):
+    specs = (argv if argv is not None else sys.argv[1:]) or GENERATION_JOBS.split(",")
+    jobs = parse_jobs(specs)
+    if not jobs:
+        print("エラー: ジョブが指定されていません。例: python runner.py 3:20 4:20")
+        return 1
+
+    started_at = time.monotonic()
+    generated = asyncio.run(run_jobs(jobs))
+    elapsed = time.monotonic() - started_at
+
+    print(f"\n--- 生成結果 ({elapsed:.1f}秒) ---")
+    for job in jobs:
+        print(f"  EXAM_CATEGORIES_ID {job.exam_categories_id}: {generated.get(job.exam_categories_id, 0)}/{job.count}問")
+    return 0 if all(generated.get(job.exam_categories_id, 0) >= job.count for job in jobs) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""
+ストリーミングでクイズを生成し、生成中に逐次データベースへ挿入するモジュール
+
+OpenAI APIのレスポンスをストリームで受け取り、"questions" 配列の要素を
+1問分のJSONオブジェクトが閉じた時点でパースして挿入パイプラインに流します。
+モデルの生成待ちとDB書き込みが並行して進み、途中でストリームが切れても
+それまでに完成した問題は保存されます。
+"""
+
+import json
+import os
+import queue
+import threading
+
+import openai
+
+import database
+import generation
+
+# ストリーミング挿入設定
+STREAM_INSERT_BATCH_SIZE = int(os.getenv("STREAM_INSERT_BATCH_SIZE", "10"))
+# 挿入待ちの問題数の上限。DB書き込みが追いつかない場合は生成側を待たせる
+STREAM_QUEUE_MAX_SIZE = int(os.getenv("STREAM_QUEUE_MAX_SIZE", "100"))
+
+# 問題オブジェクト自身が持つ配列のキー。単一の問題がトップレベルで返ってきた場合に
+# これらの配列を問題の配列と誤認しないようにする
+QUESTION_ARRAY_FIELDS = ("choices", "correct_choices")
+
+class QuestionStreamParser:
+    """
+    クイズJSONをチャンク単位で受け取り、問題オブジェクトが完成するたびに返すパーサー
+
+    トップレベルが配列の場合はその要素を、オブジェクトの場合は最初に現れる
+    配列（通常は "questions"）の要素を問題として扱います。
+    バッファに保持するのは組み立て中の問題1問分のみです。
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._array_depth = None
+        self._array_closed = False
+        self._item = None
+        self._key = None
+        self._last_key = None
+        # 配列が見つからなかった場合（単一オブジェクトのレスポンス）のフォールバック用
+        self._prefix = []
+        self.emitted = 0
+
+    def feed(self, text):
+        """
+        テキストの断片を追加します。
+
+        Returns:
+            list: この断片で完成した問題（dict）のリスト
+        """
+        completed = []
+        if self._array_depth is None:
+            self._prefix.append(text)
+        for char in text:
+            if self._item is not None:
+                self._item.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key is not None:
+                        self._last_key = ''.join(self._key)
+                        self._key = None
+                elif self._key is not None:
+                    self._key.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._array_depth is None:
+                    self._key = []
+            elif char in '{[':
+                self._depth += 1
+                if (self._array_depth is None and char == '[' and self._depth <= 2
+                        and not (self._depth == 2 and self._last_key in QUESTION_ARRAY_FIELDS)):
+                    self._array_depth = self._depth
+                    self._prefix = []
+                elif (not self._array_closed and self._array_depth is not None
+                        and char == '{' and self._depth == self._array_depth + 1):
+                    self._item = [char]
+            elif char in '}]':
+                if self._item is not None and char == '}' and self._depth == self._array_depth + 1:
+                    question = self._parse_item(''.join(self._item))
+                    self._item = None
+                    if question is not None:
+                        completed.append(question)
+                self._depth -= 1
+                if self._array_depth is not None and self._depth < self._array_depth:
+                    self._array_closed = True
+        self.emitted += len(completed)
+        return completed
+
+    def finish(self):
+        """
+        ストリームの終了時に呼び出します。
+        配列が見つからなかった場合は、全文を通常のJSONとして解釈します。
+
+        Returns:
+            list: 追加で得られた問題のリスト
+        """
+        if self._array_depth is not None or not self._prefix:
+            return []
+        try:
+            quiz_list = generation.normalize_quiz_list(json.loads(''.join(self._prefix)))
+        except json.JSONDecodeError:
+            return []
+        self._prefix = []
+        quiz_list = quiz_list or []
+        self.emitted += len(quiz_list)
+        return quiz_list
+
+    @staticmethod
+    def _parse_item(item_text):
+        try:
+            question = json.loads(item_text)
+        except json.JSONDecodeError as e:
+            print(f"⚠️  問題オブジェクトのパースに失敗したためスキップします: {e}")
+            return None
+        return question if isinstance(question, dict) else None
+
+class StreamingInsertPipeline:
+    """
+    問題を受け取り、バッチ単位でバックグラウンドスレッドから挿入するパイプライン
+
+    put() は生成側（ストリーム受信ループ）から呼び出し、close() で残りを
+    書き込んでからスレッドの終了を待ちます。
+    ワーカースレッドが例外で終了した場合は、put()・close() がその例外を送出します
+    （キューが満杯のまま待ち続けないように）。
+    """
+
+    _STOP = object()
+    # キューの空きを待つ間に、ワーカースレッドの終了を確認する間隔（秒）
+    _PUT_POLL_SECONDS = 0.1
+
+    def __init__(self, exam_categories_id, batch_size=None, max_queue_size=None):
+        self.exam_categories_id = exam_categories_id
+        self.batch_size = batch_size or STREAM_INSERT_BATCH_SIZE
+        self.inserted = 0
+        self.skipped = 0
+        self.failed = 0
+        self._error = None
+        self._queue = queue.Queue(maxsize=max_queue_size or STREAM_QUEUE_MAX_SIZE)
+        self._thread = threading.Thread(target=self._run, name="quiz-insert-pipeline", daemon=True)
+        self._thread.start()
+
+    def put(self, question):
+        self._put(question)
+
+    def close(self):
+        """キューに残った問題を挿入し、ワーカースレッドの終了を待ちます"""
+        self._put(self._STOP)
+        self._thread.join()
+        self._raise_if_failed()
+
+    def _put(self, item):
+        while True:
+            self._raise_if_failed()
+            try:
+                self._queue.put(item, timeout=self._PUT_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _raise_if_failed(self):
+        """ワーカースレッドが例外で終了していれば、キューに残った問題を失敗として数えてその例外を送出します"""
+        if self._error is None or self._thread.is_alive():
+            return
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not self._STOP:
+                self.failed += 1
+        raise self._error
+
+    def _run(self):
+        batch = []
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._STOP:
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self._flush(batch)
+                    batch = []
+            if batch:
+                self._flush(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            self._error = e
+
+    def _flush(self, batch):
+        inserted, skipped, success = database.insert_questions(
+            batch, self.exam_categories_id, bulk=True, chunk_size=self.batch_size
+        )
+        # 重複として除外された問題は挿入数に含めない
+        self.inserted += inserted
+        self.skipped += skipped
+        if not success:
+            self.failed += len(batch) - inserted - skipped
+
+def print_question(index, question):
+    """生成された問題を1問分表示します"""
+    correct_choices = question.get('correct_choices', [])
+    print(f"  問題 {index}: {question.get('body')}")
+    for choice in question.get('choices', []):
+        choice_id = choice.get('choice_id')
+        print(f"    選択肢 {choice_id}: {choice.get('choice_text')} (正解: {choice_id in correct_choices})")
+    print(f"    正解番号: {correct_choices}")
+    print(f"    解説: {question.get('explanation')}\n")
+
+def stream_quiz_from_openai(num_questions=None, exam_categories_id=None, auto_insert_db=None):
+    """
+    OpenAI APIのストリーミングレスポンスからクイズを生成し、完成した問題から順に挿入します。
+
+    Args:
+        num_questions (int): 生成する問題の数。デフォルトは環境変数から取得。
+        exam_categories_id (int): 試験カテゴリID。デフォルトは環境変数から取得。
+        auto_insert_db (bool): 自動でデータベースに挿入するかどうか。デフォルトは環境変数から取得。
+
+    Returns:
+        int: 生成できた問題数。生成を開始できなかった場合はNoneを返します。
+    """
+    if num_questions is None:
+        num_questions = generation.NUM_QUESTIONS
+    if exam_categories_id is None:
+        exam_categories_id = generation.EXAM_CATEGORIES_ID
+    if auto_insert_db is None:
+        auto_insert_db = generation.AUTO_INSERT_DB
+
+    exam_name, category_name, exam_code, category_description = database.get_exam_category_info(exam_categories_id)
+    if not exam_name or not category_name:
+        print("❌ 試験名またはカテゴリ名の取得に失敗しました。")
+        return None
+
+    if not generation.OPENAI_API_KEY:
+        print("エラー: 環境変数 OPENAI_API_KEY が設定されていません。")
+        return None
+
+    client = openai.OpenAI(api_key=generation.OPENAI_API_KEY)
+    user_prompt = generation.build_user_prompt(exam_name, exam_code, category_name, category_description, num_questions)
+    parser = QuestionStreamParser()
+    pipeline = StreamingInsertPipeline(exam_categories_id) if auto_insert_db else None
+
+    def handle(questions):
+        for index, question in enumerate(questions, start=parser.emitted - len(questions) + 1):
+            print_question(index, question)
+            if pipeline is not None:
+                pipeline.put(question)
+
+    print(f"OpenAI APIにストリーミングリクエストを送信中 ({num_questions}問、試験名: {exam_name}、カテゴリ: {category_name})...")
+    try:
+        stream = client.responses.create(**generation.build_response_request(user_prompt), stream=True)
+        for event in stream:
+            if event.type == "response.output_text.delta":
+                handle(parser.feed(event.delta))
+            elif event.type in ("response.failed", "error"):
+                print(f"❌ ストリーミング中にエラーが発生しました: {event}")
+                break
+        handle(parser.finish())
+    except openai.APIConnectionError as e:
+        print(f"OpenAI APIへの接続に失敗しました: {e}")
+    except openai.RateLimitError as e:
+        print(f"OpenAI APIのレート制限に達しました: {e}")
+    except openai.APIStatusError as e:
+        print(f"OpenAI APIエラーが発生しました (ステータスコード: {e.status_code}): {e.response}")
+    except Exception as e:
+        print(f"予期せぬエラーが発生しました: {e}")
+    finally:
+        # 途中で失敗しても、完成済みの問題は必ず書き込む
+        if pipeline is not None:
+            try:
+                pipeline.close()
+            except Exception as e:
+                print(f"❌ データベースへの挿入処理が異常終了しました: {type(e).__name__}: {e}")
+
+    print(f"📝 {parser.emitted}問を生成しました。")
+    if pipeline is not None:
+        print(f"   データベース挿入: 成功 {pipeline.inserted}問 / 重複のため除外 {pipeline.skipped}問 / 失敗 {pipeline.failed}問")
+    else:
+        print("💾 データベースへの挿入はスキップされました（AUTO_INSERT_DB=false）。")
+    return parser.emitted
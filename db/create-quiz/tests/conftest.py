@@ -0,0 +1,9 @@
+import os
+import sys
+
+# generation.py はインポート時に必須の設定を読み込むため、テスト用の値を先に設定する
+os.environ.setdefault("NUM_QUESTIONS", "10")
+os.environ.setdefault("EXAM_CATEGORIES_ID", "1")
+
+# db/create-quiz のモジュール（runner.py・streaming.py など）をインポートできるようにする
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,219 @@
+import json
+import threading
+
+import pytest
+
+import database
+import dedup
+from dedup import MinHasher, QuestionDedupIndex, estimate_similarity, normalize_text, question_text, shingles
+
+
+def question(body, *choice_texts):
+    return {
+        "body": body,
+        "choices": [{"choice_id": i, "choice_text": text} for i, text in enumerate(choice_texts, start=1)],
+    }
+
+
+LAMBDA_QUESTION = question("AWS Lambdaの同時実行数の上限を引き上げるにはどうすればよいですか？",
+                           "サービスクォータの引き上げをリクエストする", "メモリを増やす", "VPCに配置する")
+S3_QUESTION = question("S3バケットのオブジェクトを誤って削除されないよう保護する方法はどれですか？",
+                       "バージョニングを有効にする", "MFA Deleteを有効にする", "ライフサイクルルールを設定する")
+
+
+@pytest.fixture
+def index_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(dedup, "DEDUP_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(dedup, "_indexes", {})
+    monkeypatch.setattr(dedup, "_load_locks", {})
+    return tmp_path
+
+
+class FakeQuestions:
+    """database.fetch_questions_after の代わりに、exam_categories_id ごとの既存問題をid順に返す"""
+
+    def __init__(self, rows_by_category):
+        self.rows_by_category = rows_by_category
+        self.calls = []
+
+    def __call__(self, exam_categories_id, after_id, limit):
+        self.calls.append((exam_categories_id, after_id, limit))
+        rows = [row for row in self.rows_by_category.get(exam_categories_id, []) if row["id"] > after_id]
+        return rows[:limit]
+
+
+def stored(question_id, q):
+    return dict(q, id=question_id)
+
+
+# ---- 正規化・シングル ----
+
+def test_normalize_text_unifies_width_case_and_kana():
+    # 全角英数字・半角カナはNFKCで統一し、カタカナはひらがなに寄せる
+    assert normalize_text("ＡＷＳ　Ｌａｍｂｄａ") == normalize_text("aws lambda") == "awslambda"
+    assert normalize_text("ｻｰﾊﾞｰﾚｽ") == normalize_text("サーバーレス") == normalize_text("さーばーれす")
+
+
+def test_normalize_text_drops_punctuation_and_whitespace():
+    assert normalize_text("「S3」の\nバケット、です。？") == "s3のばけっとです"
+    assert normalize_text(None) == ""
+
+
+def test_question_text_ignores_choice_order_and_accepts_json_string():
+    reordered = question(LAMBDA_QUESTION["body"], "VPCに配置する", "メモリを増やす", "サービスクォータの引き上げをリクエストする")
+    as_string = dict(LAMBDA_QUESTION, choices=json.dumps(LAMBDA_QUESTION["choices"], ensure_ascii=False))
+
+    assert question_text(reordered) == question_text(LAMBDA_QUESTION) == question_text(as_string)
+
+
+def test_shingles():
+    assert shingles("abcd", 3) == {"abc", "bcd"}
+    assert shingles("ab", 3) == {"ab"}
+    assert shingles("", 3) == set()
+
+
+def test_minhash_similarity_tracks_jaccard():
+    hasher = MinHasher(128)
+    a = shingles(normalize_text(LAMBDA_QUESTION["body"]))
+    b = shingles(normalize_text(S3_QUESTION["body"]))
+
+    assert estimate_similarity(hasher.signature(a), hasher.signature(a)) == 1.0
+    assert estimate_similarity(hasher.signature(a), hasher.signature(b)) < 0.2
+
+
+# ---- MinHash/LSH の候補検索 ----
+
+def test_filter_novel_skips_near_duplicates_of_stored_questions():
+    index = QuestionDedupIndex(1)
+    index.add_stored(10, LAMBDA_QUESTION)
+    # 表記ゆれ（全角・半角カナ・句読点）だけが異なる問題
+    variant = question("ＡＷＳ Ｌａｍｂｄａの同時実行数の上限を引き上げるには、どうすればよいですか",
+                       "ｻｰﾋﾞｽｸｫｰﾀの引き上げをリクエストする", "メモリを増やす", "VPCに配置する")
+
+    novel, keys = index.filter_novel([variant, S3_QUESTION])
+
+    assert novel == [S3_QUESTION]
+    assert keys == ["new-1"]
+    assert index.find_duplicate(index.signature_of(variant))[0] == 10
+
+
+def test_filter_novel_skips_duplicates_within_the_same_batch():
+    index = QuestionDedupIndex(1)
+
+    novel, keys = index.filter_novel([LAMBDA_QUESTION, S3_QUESTION, dict(LAMBDA_QUESTION)])
+
+    assert novel == [LAMBDA_QUESTION, S3_QUESTION]
+    assert len(index) == 2
+
+
+def test_discard_forgets_provisional_keys():
+    index = QuestionDedupIndex(1)
+    _, keys = index.filter_novel([LAMBDA_QUESTION])
+
+    index.discard(keys)
+
+    assert len(index) == 0
+    assert index.filter_novel([LAMBDA_QUESTION])[0] == [LAMBDA_QUESTION]
+
+
+def test_bands_must_divide_num_perm():
+    with pytest.raises(ValueError):
+        QuestionDedupIndex(1, num_perm=128, bands=30)
+
+
+# ---- 索引の保存・復元 ----
+
+def test_round_trip_keeps_stored_signatures_and_watermark():
+    index = QuestionDedupIndex(3)
+    index.add_stored(5, LAMBDA_QUESTION)
+    index.filter_novel([S3_QUESTION])
+
+    data = json.loads(json.dumps(index.to_dict()))
+    restored = QuestionDedupIndex.from_dict(data)
+
+    # 仮キーの問題は保存しない（次回ウォーターマーク以降として取り込まれる）
+    assert list(data["signatures"]) == ["5"]
+    assert restored.exam_categories_id == 3
+    assert restored.watermark == 5
+    assert len(restored) == 1
+    assert restored.find_duplicate(restored.signature_of(LAMBDA_QUESTION)) == (5, 1.0)
+
+
+def test_from_dict_rejects_other_signature_parameters():
+    data = QuestionDedupIndex(1).to_dict()
+
+    assert QuestionDedupIndex.from_dict(dict(data, num_perm=64)) is None
+    assert QuestionDedupIndex.from_dict(dict(data, shingle_size=data["shingle_size"] + 1)) is None
+    assert QuestionDedupIndex.from_dict(dict(data, version=0)) is None
+
+
+def test_load_index_resyncs_only_questions_after_the_watermark(index_dir, monkeypatch):
+    fetch = FakeQuestions({1: [stored(1, LAMBDA_QUESTION), stored(2, S3_QUESTION)]})
+    monkeypatch.setattr(database, "fetch_questions_after", fetch)
+    monkeypatch.setattr(dedup, "DEDUP_FETCH_SIZE", 1)
+
+    index = dedup.load_index(1)
+    dedup.save_index(index)
+
+    # 1件ずつ取得し、件数が取得サイズ未満になるまで続ける
+    assert [after_id for _, after_id, _ in fetch.calls] == [0, 1, 2]
+    assert index.watermark == 2
+    assert (index_dir / "exam_categories_1.json").exists()
+
+    ec2_question = question("EC2インスタンスの起動時にスクリプトを実行するには？", "ユーザーデータ", "タグ", "AMI")
+    fetch.rows_by_category[1].append(stored(7, ec2_question))
+    fetch.calls.clear()
+
+    reloaded = dedup.load_index(1)
+
+    assert fetch.calls[0][1] == 2
+    assert reloaded.watermark == 7
+    assert len(reloaded) == 3
+    assert reloaded.find_duplicate(reloaded.signature_of(ec2_question))[0] == 7
+
+
+def test_load_index_fails_when_questions_cannot_be_fetched(index_dir, monkeypatch):
+    monkeypatch.setattr(database, "fetch_questions_after", lambda *args: None)
+
+    with pytest.raises(RuntimeError):
+        dedup.load_index(1)
+
+
+def test_get_index_loads_categories_concurrently(index_dir, monkeypatch):
+    # 2つのカテゴリーの取得が同時に進まないとバリアがタイムアウトする
+    barrier = threading.Barrier(2, timeout=5)
+    fetched = FakeQuestions({})
+
+    def fetch(exam_categories_id, after_id, limit):
+        if after_id == 0:
+            barrier.wait()
+        return fetched(exam_categories_id, after_id, limit)
+    monkeypatch.setattr(database, "fetch_questions_after", fetch)
+    monkeypatch.setattr(dedup.atexit, "register", lambda func: None)
+
+    results = {}
+    threads = [threading.Thread(target=lambda ecid=ecid: results.setdefault(ecid, dedup.get_index(ecid)))
+               for ecid in (1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not barrier.broken
+    assert results[1] is dedup.get_index(1)
+    assert results[2].exam_categories_id == 2
+
+
+# ---- 挿入との連携 ----
+
+def test_partial_insert_failure_discards_only_uncommitted_keys(index_dir, monkeypatch):
+    index = QuestionDedupIndex(1)
+    monkeypatch.setitem(dedup._indexes, 1, index)
+    monkeypatch.setattr(dedup, "DEDUP_ENABLED", True)
+    # 先頭の1問だけコミットされた時点で失敗した
+    monkeypatch.setattr(database, "_insert_questions", lambda quiz_list, *args: (1, False))
+
+    assert database.insert_questions_to_db([LAMBDA_QUESTION, S3_QUESTION], 1) is False
+
+    assert index.filter_novel([LAMBDA_QUESTION])[0] == []
+    assert index.filter_novel([S3_QUESTION])[0] == [S3_QUESTION]
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+import runner
+from runner import TokenBucket, parse_jobs, retry_delay, split_count
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+
+    # asyncio.sleep で待つ代わりに時計を進める
+    async def sleep(seconds):
+        clock.now += seconds
+    monkeypatch.setattr(runner.asyncio, "sleep", sleep)
+    return clock
+
+
+# ---- TokenBucket ----
+
+def test_token_bucket_starts_full_and_consumes(clock):
+    bucket = TokenBucket(per_minute=60, clock=clock)
+
+    asyncio.run(bucket.acquire(60))
+
+    assert bucket.tokens == 0
+    assert clock.now == 0
+
+
+def test_token_bucket_waits_for_refill(clock):
+    bucket = TokenBucket(per_minute=60, clock=clock)
+    asyncio.run(bucket.acquire(60))
+
+    # 1秒あたり1トークン補充されるため、5トークンは5秒待つ
+    asyncio.run(bucket.acquire(5))
+
+    assert clock.now == pytest.approx(5)
+    assert bucket.tokens == pytest.approx(0)
+
+
+def test_token_bucket_caps_requests_larger_than_capacity(clock):
+    bucket = TokenBucket(per_minute=60, capacity=10, clock=clock)
+
+    asyncio.run(bucket.acquire(1000))
+
+    assert bucket.tokens == 0
+    assert clock.now == 0
+
+
+def test_token_bucket_refill_is_capped(clock):
+    bucket = TokenBucket(per_minute=60, clock=clock)
+    asyncio.run(bucket.acquire(30))
+    clock.now += 3600
+
+    bucket.adjust(0)
+
+    assert bucket.tokens == 60
+
+
+def test_token_bucket_adjust_applies_actual_usage(clock):
+    bucket = TokenBucket(per_minute=1000, clock=clock)
+    asyncio.run(bucket.acquire(600))
+
+    # 見積もり600に対して実績が800だった場合
+    bucket.adjust(600 - 800)
+    assert bucket.tokens == 200
+    bucket.adjust(5000)
+    assert bucket.tokens == 1000
+
+
+# ---- split_count・parse_jobs ----
+
+@pytest.mark.parametrize("count, per_request, expected", [
+    (25, 10, [10, 10, 5]),
+    (20, 10, [10, 10]),
+    (3, 10, [3]),
+    (0, 10, []),
+])
+def test_split_count(count, per_request, expected):
+    assert split_count(count, per_request) == expected
+
+
+def test_parse_jobs_uses_default_count():
+    jobs = parse_jobs(["3:20", " 4 ", "", "5:1"])
+
+    assert [(job.exam_categories_id, job.count) for job in jobs] == [(3, 20), (4, runner.generation.NUM_QUESTIONS), (5, 1)]
+
+
+# ---- retry_delay ----
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class FakeRateLimitError(Exception):
+    def __init__(self, retry_after):
+        super().__init__("rate limited")
+        self.response = FakeResponse({"retry-after": retry_after} if retry_after is not None else {})
+
+
+def test_retry_delay_grows_exponentially_with_full_jitter(monkeypatch):
+    monkeypatch.setattr(runner, "RUNNER_RETRY_BASE_DELAY", 1.0)
+    monkeypatch.setattr(runner, "RUNNER_RETRY_MAX_DELAY", 60.0)
+    monkeypatch.setattr(runner.random, "uniform", lambda low, high: high)
+
+    assert [retry_delay(attempt) for attempt in range(8)] == [1, 2, 4, 8, 16, 32, 60, 60]
+
+
+def test_retry_delay_is_randomized_below_cap(monkeypatch):
+    monkeypatch.setattr(runner, "RUNNER_RETRY_BASE_DELAY", 1.0)
+    monkeypatch.setattr(runner, "RUNNER_RETRY_MAX_DELAY", 60.0)
+
+    delays = [retry_delay(3) for _ in range(200)]
+
+    assert all(0 <= delay <= 8 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.parametrize("retry_after, expected", [("30", 30.0), ("0.5", 2.0), ("soon", 2.0), (None, 2.0)])
+def test_retry_delay_respects_retry_after(monkeypatch, retry_after, expected):
+    monkeypatch.setattr(runner, "RUNNER_RETRY_BASE_DELAY", 1.0)
+    monkeypatch.setattr(runner.random, "uniform", lambda low, high: high)
+
+    assert retry_delay(1, FakeRateLimitError(retry_after)) == expected
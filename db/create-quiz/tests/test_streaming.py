@@ -0,0 +1,139 @@
+import json
+import threading
+
+import pytest
+
+import database
+from streaming import QuestionStreamParser, StreamingInsertPipeline
+
+
+def question(number):
+    return {
+        "body": f"問題{number} {{括弧}} と \"引用符\" を含む",
+        "explanation": "解説 [配列のような文字列]",
+        "choices": [{"choice_id": 1, "choice_text": "A"}, {"choice_id": 2, "choice_text": "B"}],
+        "correct_choices": [2],
+    }
+
+
+def feed_in_chunks(parser, text, size):
+    completed = []
+    for start in range(0, len(text), size):
+        completed.extend(parser.feed(text[start:start + size]))
+    return completed + parser.finish()
+
+
+@pytest.mark.parametrize("size", [1, 3, 17, 10000])
+def test_parses_questions_object_in_any_chunk_size(size):
+    questions = [question(1), question(2), question(3)]
+    text = json.dumps({"questions": questions}, ensure_ascii=False, indent=2)
+    parser = QuestionStreamParser()
+
+    assert feed_in_chunks(parser, text, size) == questions
+    assert parser.emitted == 3
+
+
+def test_emits_each_question_as_soon_as_it_closes():
+    text = json.dumps({"questions": [question(1), question(2)]}, ensure_ascii=False)
+    second_start = text.index('{"body": "問題2')
+    parser = QuestionStreamParser()
+
+    assert parser.feed(text[:second_start]) == [question(1)]
+    assert parser.feed(text[second_start:]) == [question(2)]
+
+
+def test_parses_top_level_array():
+    parser = QuestionStreamParser()
+
+    assert feed_in_chunks(parser, json.dumps([question(1), question(2)]), 5) == [question(1), question(2)]
+
+
+def test_single_question_object_falls_back_to_full_parse():
+    # choices・correct_choices の配列を問題の配列と誤認しない
+    parser = QuestionStreamParser()
+
+    assert feed_in_chunks(parser, json.dumps(question(1)), 4) == [question(1)]
+    assert parser.emitted == 1
+
+
+def test_ignores_arrays_after_questions_array():
+    text = json.dumps({"questions": [question(1)], "notes": [{"body": "問題ではない"}]})
+    parser = QuestionStreamParser()
+
+    assert feed_in_chunks(parser, text, 7) == [question(1)]
+
+
+def test_truncated_stream_keeps_completed_questions():
+    text = json.dumps({"questions": [question(1), question(2)]})
+    parser = QuestionStreamParser()
+
+    assert feed_in_chunks(parser, text[:-40], 9) == [question(1)]
+
+
+def test_unparseable_fallback_returns_nothing():
+    parser = QuestionStreamParser()
+
+    assert feed_in_chunks(parser, '{"body": "途中で切れた', 4) == []
+
+
+# ---- StreamingInsertPipeline ----
+
+def run_with_timeout(func, timeout=5):
+    """func を別スレッドで実行し、戻り値または例外を返す（待ち続けた場合はテストを失敗させる）"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = func()
+        except Exception as e:
+            outcome["error"] = e
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline blocked"
+    return outcome
+
+
+def test_pipeline_counts_only_inserted_questions(monkeypatch):
+    calls = []
+
+    def insert_questions(batch, exam_categories_id, bulk, chunk_size):
+        calls.append(len(batch))
+        # 各バッチの1問は重複として除外された
+        return len(batch) - 1, 1, True
+    monkeypatch.setattr(database, "insert_questions", insert_questions)
+    pipeline = StreamingInsertPipeline(1, batch_size=2)
+
+    for number in range(5):
+        pipeline.put(question(number))
+    pipeline.close()
+
+    assert calls == [2, 2, 1]
+    assert (pipeline.inserted, pipeline.skipped, pipeline.failed) == (2, 3, 0)
+
+
+def test_pipeline_counts_uncommitted_questions_as_failed(monkeypatch):
+    monkeypatch.setattr(database, "insert_questions", lambda batch, *args, **kwargs: (1, 0, False))
+    pipeline = StreamingInsertPipeline(1, batch_size=3)
+
+    for number in range(3):
+        pipeline.put(question(number))
+    pipeline.close()
+
+    assert (pipeline.inserted, pipeline.failed) == (1, 2)
+
+
+def test_pipeline_raises_worker_error_instead_of_blocking(monkeypatch):
+    def insert_questions(batch, *args, **kwargs):
+        raise RuntimeError("connection lost")
+    monkeypatch.setattr(database, "insert_questions", insert_questions)
+    pipeline = StreamingInsertPipeline(1, batch_size=1, max_queue_size=1)
+
+    # ワーカーが終了した後は、キューが満杯でも put() が例外で戻る
+    outcome = run_with_timeout(lambda: [pipeline.put(question(number)) for number in range(10)])
+    assert isinstance(outcome.get("error"), RuntimeError)
+
+    outcome = run_with_timeout(pipeline.close)
+    assert str(outcome.get("error")) == "connection lost"
+    assert pipeline.inserted == 0
+    assert pipeline.failed >= 1
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+データベーススキーマ差分・マイグレーションDDL生成スクリプト
+
+2つのスキーマ（main.py が出力したJSONスナップショット、または接続先の現在のスキーマ）を比較し、
+差分をJSON形式で出力します。また、変更前のスキーマを変更後に合わせるための
+最小限のマイグレーションDDL（ALTER TABLE / CREATE INDEX / DROP など）を生成し、
+大きなテーブルのロックや再構築を伴う変更に警告を付けます。
+
+使い方:
+    python diff.py database_schema_A.json database_schema_B.json       # ファイル同士を比較
+    python diff.py live database_schema_B.json --sql migration.sql     # 接続先（.envのDB_*）をBに合わせるDDLを出力
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Dict, Any, List, Optional
+from dotenv import load_dotenv
+
+from main import column_definition
+
+
+# 変更の影響（MySQL 8.0 InnoDBのオンラインDDLに基づく）
+# none   : メタデータのみの変更（INSTANTなど）
+# online : インプレースで実行され、実行中も読み書き可能（インデックス作成などの処理量はテーブルサイズに比例）
+# rebuild: インプレースでテーブル全体を再構築（読み書きは可能だが、時間とI/O・一時領域がかかる）
+# lock   : COPYアルゴリズム（テーブルのコピー中は書き込みがブロックされる）
+RISK_LEVELS = ['none', 'online', 'rebuild', 'lock']
+
+# この行数以上のテーブルを大きなテーブルとして扱う
+LARGE_TABLE_ROWS = int(os.getenv('LARGE_TABLE_ROWS', '1000000'))
+
+# 整数型の大きさの順序（拡大かどうかの判定用）
+INTEGER_TYPES = ['TINYINT', 'SMALLINT', 'MEDIUMINT', 'INTEGER', 'BIGINT']
+
+
+def load_schema(source: str) -> Dict[str, Any]:
+    """
+    比較対象のスキーマを読み込む
+
+    Args:
+        source: JSONスナップショットのパス、または live（.envの接続先から取得）
+
+    Returns:
+        スキーマ情報（テーブルサイズを取得できた場合は 'table_sizes' を含む）
+    """
+    if source != 'live':
+        with open(source, encoding='utf-8') as f:
+            return json.load(f)
+
+    from main import DatabaseSchemaExporter
+    load_dotenv()
+    connection_string = (
+        f"mysql+pymysql://{os.getenv('DB_USER', 'root')}:{os.getenv('DB_PASSWORD', 'password')}"
+        f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '3306')}/{os.getenv('DB_NAME', 'aws_quiz')}"
+    )
+    exporter = DatabaseSchemaExporter(connection_string)
+    schema_info = exporter.get_all_tables_schema()
+    schema_info['table_sizes'] = exporter.get_table_sizes()
+    return schema_info
+
+
+def _by_name(items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {item['name']: item for item in items}
+
+
+def _diff_named(before: List[Dict[str, Any]], after: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """名前をキーに、追加・削除・変更された要素を求める"""
+    before_map = _by_name(before)
+    after_map = _by_name(after)
+    changed = []
+    for name in after_map.keys() & before_map.keys():
+        if before_map[name] != after_map[name]:
+            fields = sorted(key for key in before_map[name].keys() | after_map[name].keys()
+                            if before_map[name].get(key) != after_map[name].get(key))
+            changed.append({'name': name, 'from': before_map[name], 'to': after_map[name], 'fields': fields})
+    return {
+        'added': [after_map[name] for name in after_map if name not in before_map],
+        'removed': [before_map[name] for name in before_map if name not in after_map],
+        'changed': sorted(changed, key=lambda item: item['name'])
+    }
+
+
+def _is_empty(diff: Dict[str, Any]) -> bool:
+    return not (diff['added'] or diff['removed'] or diff['changed'])
+
+
+def diff_schemas(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    2つのスキーマ情報の差分を求める
+
+    Args:
+        before: 変更前（マイグレーションを適用する側）のスキーマ情報
+        after: 変更後（目標）のスキーマ情報
+
+    Returns:
+        構造化された差分（テーブルの追加・削除と、テーブルごとのカラム・インデックス・制約の差分）
+    """
+    before_tables = before['tables']
+    after_tables = after['tables']
+    changed_tables = {}
+    for table_name in sorted(after_tables.keys() & before_tables.keys()):
+        old = before_tables[table_name]
+        new = after_tables[table_name]
+        table_diff = {
+            'columns': _diff_named(old['columns'], new['columns']),
+            'indexes': _diff_named(old['indexes'], new['indexes']),
+            'foreign_keys': _diff_named(old['foreign_keys'], new['foreign_keys']),
+            'constraints': _diff_named(old['constraints'], new['constraints']),
+        }
+        table_diff = {key: value for key, value in table_diff.items() if not _is_empty(value)}
+        if old['primary_keys'] != new['primary_keys']:
+            table_diff['primary_keys'] = {'from': old['primary_keys'], 'to': new['primary_keys']}
+        if table_diff:
+            changed_tables[table_name] = table_diff
+
+    return {
+        'from_database': before.get('database_name'),
+        'to_database': after.get('database_name'),
+        'tables_added': sorted(after_tables.keys() - before_tables.keys()),
+        'tables_removed': sorted(before_tables.keys() - after_tables.keys()),
+        'tables_changed': changed_tables
+    }
+
+
+def _base_type(type_str: str) -> str:
+    return re.split(r"[ (]", type_str, maxsplit=1)[0].upper()
+
+
+def _length(type_str: str) -> Optional[int]:
+    match = re.match(r"^\w+\((\d+)\)", type_str)
+    return int(match.group(1)) if match else None
+
+
+def _without_collation(type_str: str) -> str:
+    return type_str.split(' COLLATE ')[0]
+
+
+def column_change_risk(old: Dict[str, Any], new: Dict[str, Any]) -> tuple:
+    """
+    カラム定義の変更（MODIFY COLUMN）の影響を判定
+
+    Returns:
+        (影響, 理由)
+    """
+    if old['type'] == new['type'] and old['nullable'] == new['nullable'] \
+            and old['autoincrement'] == new['autoincrement']:
+        # デフォルト値・コメントのみの変更
+        return 'none', 'デフォルト値・コメントのみの変更（メタデータのみ）'
+
+    if old['type'] != new['type']:
+        old_base, new_base = _base_type(old['type']), _base_type(new['type'])
+        old_type, new_type = _without_collation(old['type']), _without_collation(new['type'])
+        if old_base == new_base == 'ENUM' and new_type.startswith(old_type[:-1]):
+            return 'none', 'ENUMの末尾への値の追加（メタデータのみ）'
+        if old_base == new_base == 'VARCHAR' and old['type'].partition(' COLLATE ')[2] == new['type'].partition(' COLLATE ')[2]:
+            old_length, new_length = _length(old['type']), _length(new['type'])
+            # 長さのバイト数（1バイト: 255バイト以下 / 2バイト）が変わらない拡張はインプレース
+            # 文字数ではなくバイト数で決まるため、utf8mb4（最大4バイト）で判定する
+            if old_length and new_length and new_length >= old_length and \
+                    (old_length * 4 > 255 or new_length * 4 <= 255):
+                return 'none', 'VARCHARの拡張（長さのバイト数が変わらないためインプレース）'
+        return 'lock', f"型の変更 {old['type']} → {new['type']}（COPYアルゴリズムで書き込みをブロック）"
+
+    if old['nullable'] != new['nullable']:
+        return 'rebuild', 'NULL制約の変更（テーブルの再構築）'
+    return 'rebuild', 'AUTO_INCREMENTの変更（テーブルの再構築）'
+
+
+def _type_narrowing(old: Dict[str, Any], new: Dict[str, Any]) -> bool:
+    """型の変更でデータが失われる可能性があるか（縮小・別の型への変換）"""
+    if old['type'] == new['type']:
+        return False
+    old_base, new_base = _base_type(old['type']), _base_type(new['type'])
+    if old_base in INTEGER_TYPES and new_base in INTEGER_TYPES:
+        return INTEGER_TYPES.index(new_base) < INTEGER_TYPES.index(old_base)
+    if old_base == new_base and _length(old['type']) and _length(new['type']):
+        return _length(new['type']) < _length(old['type'])
+    if old_base == new_base == 'ENUM':
+        return not _without_collation(new['type']).startswith(_without_collation(old['type'])[:-1])
+    return old_base != new_base
+
+
+def _index_sql(table_name: str, index: Dict[str, Any]) -> str:
+    index_cols = "`, `".join(index['column_names'])
+    index_type = "UNIQUE INDEX" if index['unique'] else "INDEX"
+    return f"CREATE {index_type} `{index['name']}` ON `{table_name}` (`{index_cols}`);"
+
+
+def _foreign_key_sql(table_name: str, fk: Dict[str, Any]) -> str:
+    constrained_cols = "`, `".join(fk['constrained_columns'])
+    referred_cols = "`, `".join(fk['referred_columns'])
+    sql = f"ALTER TABLE `{table_name}` ADD CONSTRAINT `{fk['name']}` "
+    sql += f"FOREIGN KEY (`{constrained_cols}`) REFERENCES `{fk['referred_table']}` (`{referred_cols}`)"
+    options = fk.get('options') or {}
+    if options.get('ondelete'):
+        sql += f" ON DELETE {options['ondelete']}"
+    if options.get('onupdate'):
+        sql += f" ON UPDATE {options['onupdate']}"
+    return sql + ";"
+
+
+def _create_table_sql(table_name: str, table_info: Dict[str, Any]) -> str:
+    definitions = [f"  {column_definition(column)}" for column in table_info['columns']]
+    if table_info['primary_keys']:
+        pk_cols = "`, `".join(table_info['primary_keys'])
+        definitions.append(f"  PRIMARY KEY (`{pk_cols}`)")
+    for constraint in table_info['constraints']:
+        definitions.append(f"  CONSTRAINT `{constraint['name']}` CHECK ({constraint['sqltext']})")
+    return f"CREATE TABLE `{table_name}` (\n" + ",\n".join(definitions) + "\n);"
+
+
+class MigrationPlanner:
+    """差分からマイグレーションDDLを生成し、各文の影響を判定するクラス"""
+
+    def __init__(self, before: Dict[str, Any], after: Dict[str, Any], large_table_rows: int = LARGE_TABLE_ROWS):
+        """
+        初期化
+
+        Args:
+            before: 変更前のスキーマ情報（'table_sizes' があればテーブルサイズの判定に使う）
+            after: 変更後のスキーマ情報
+            large_table_rows: 大きなテーブルとみなす行数
+        """
+        self.before = before
+        self.after = after
+        self.table_sizes = before.get('table_sizes')
+        self.large_table_rows = large_table_rows
+        # 実行順ごとのステップ（外部キー削除 → インデックス削除 → テーブル作成 → カラム変更 → インデックス作成 → 外部キー追加 → テーブル削除）
+        self.phases: Dict[str, List[Dict[str, Any]]] = {
+            phase: [] for phase in ('drop_foreign_keys', 'drop_indexes', 'create_tables', 'alter_tables',
+                                    'create_indexes', 'add_foreign_keys', 'drop_tables')
+        }
+
+    def _table_size(self, table_name: str) -> Optional[Dict[str, int]]:
+        if self.table_sizes is None:
+            return None
+        return self.table_sizes.get(table_name, {'rows': 0, 'bytes': 0})
+
+    def _add(self, phase: str, table_name: str, sql: str, risk: str, reason: str, destructive: bool = False):
+        size = self._table_size(table_name)
+        large = None if size is None else size['rows'] >= self.large_table_rows
+        # サイズが不明な場合は、影響のある変更をすべて警告対象にする
+        flagged = risk in ('rebuild', 'lock') and large is not False
+        if risk == 'online' and large:
+            flagged = True
+        self.phases[phase].append({
+            'table': table_name,
+            'sql': sql,
+            'risk': risk,
+            'reason': reason,
+            'destructive': destructive,
+            'estimated_rows': None if size is None else size['rows'],
+            'large_table': large,
+            'flagged': flagged
+        })
+
+    def plan(self, diff: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        差分からマイグレーションのステップ（実行順）を生成
+
+        Returns:
+            ステップのリスト（sql, risk, reason, destructive, large_table, flagged など）
+        """
+        after_tables = self.after['tables']
+
+        for table_name in diff['tables_added']:
+            table_info = after_tables[table_name]
+            self._add('create_tables', table_name, _create_table_sql(table_name, table_info),
+                      'none', '新しいテーブルの作成')
+            for index in table_info['indexes']:
+                self._add('create_indexes', table_name, _index_sql(table_name, index),
+                          'none', '新しいテーブルへのインデックス作成')
+            for fk in table_info['foreign_keys']:
+                self._add('add_foreign_keys', table_name, _foreign_key_sql(table_name, fk),
+                          'none', '新しいテーブルへの外部キー追加')
+
+        for table_name, table_diff in diff['tables_changed'].items():
+            self._plan_table(table_name, table_diff, after_tables[table_name])
+
+        for table_name in diff['tables_removed']:
+            self._add('drop_tables', table_name, f"DROP TABLE `{table_name}`;",
+                      'none', 'テーブルの削除（データは失われる）', destructive=True)
+
+        return [step for steps in self.phases.values() for step in steps]
+
+    def _plan_table(self, table_name: str, table_diff: Dict[str, Any], new_table: Dict[str, Any]):
+        empty = {'added': [], 'removed': [], 'changed': []}
+        columns = table_diff.get('columns', empty)
+        indexes = table_diff.get('indexes', empty)
+        foreign_keys = table_diff.get('foreign_keys', empty)
+        constraints = table_diff.get('constraints', empty)
+
+        for fk in foreign_keys['removed'] + [change['from'] for change in foreign_keys['changed']]:
+            self._add('drop_foreign_keys', table_name,
+                      f"ALTER TABLE `{table_name}` DROP FOREIGN KEY `{fk['name']}`;", 'none', '外部キーの削除')
+
+        for index in indexes['removed'] + [change['from'] for change in indexes['changed']]:
+            self._add('drop_indexes', table_name, f"DROP INDEX `{index['name']}` ON `{table_name}`;",
+                      'none', 'インデックスの削除（メタデータのみ）')
+
+        # カラム・主キー・CHECK制約の変更は1つのALTER TABLEにまとめる（再構築を1回で済ませる）
+        clauses = []
+        risks = []
+        destructive = False
+        new_column_names = [column['name'] for column in new_table['columns']]
+        added_names = {column['name'] for column in columns['added']}
+        for column in columns['added']:
+            position = new_column_names.index(column['name'])
+            after = f" AFTER `{new_column_names[position - 1]}`" if position > 0 else " FIRST"
+            clauses.append(f"ADD COLUMN {column_definition(column)}{after}")
+            # 末尾への追加はINSTANT（8.0.12以降）、途中への追加は8.0.29以降でINSTANT
+            if all(name in added_names for name in new_column_names[position + 1:]):
+                risks.append(('none', f"カラム {column['name']} の末尾への追加（INSTANT）"))
+            else:
+                risks.append(('rebuild', f"カラム {column['name']} の途中への追加（8.0.29未満ではテーブルの再構築）"))
+        for change in columns['changed']:
+            clauses.append(f"MODIFY COLUMN {column_definition(change['to'])}")
+            risks.append(column_change_risk(change['from'], change['to']))
+            destructive = destructive or _type_narrowing(change['from'], change['to'])
+        for column in columns['removed']:
+            clauses.append(f"DROP COLUMN `{column['name']}`")
+            risks.append(('rebuild', f"カラム {column['name']} の削除（8.0.29未満ではテーブルの再構築）"))
+            destructive = True
+        if 'primary_keys' in table_diff:
+            if table_diff['primary_keys']['from']:
+                clauses.append("DROP PRIMARY KEY")
+            if table_diff['primary_keys']['to']:
+                pk_cols = "`, `".join(table_diff['primary_keys']['to'])
+                clauses.append(f"ADD PRIMARY KEY (`{pk_cols}`)")
+            risks.append(('rebuild', '主キーの変更（クラスタインデックスの再構築）'))
+        for constraint in constraints['removed'] + [change['from'] for change in constraints['changed']]:
+            clauses.append(f"DROP CHECK `{constraint['name']}`")
+            risks.append(('none', f"CHECK制約 {constraint['name']} の削除"))
+        for constraint in constraints['added'] + [change['to'] for change in constraints['changed']]:
+            clauses.append(f"ADD CONSTRAINT `{constraint['name']}` CHECK ({constraint['sqltext']})")
+            risks.append(('lock', f"CHECK制約 {constraint['name']} の追加（既存行の検証のためCOPYアルゴリズム）"))
+
+        if clauses:
+            risk = max((risk for risk, _ in risks), key=RISK_LEVELS.index)
+            reason = "; ".join(reason for _, reason in risks)
+            sql = f"ALTER TABLE `{table_name}`\n  " + ",\n  ".join(clauses) + ";"
+            self._add('alter_tables', table_name, sql, risk, reason, destructive)
+
+        for index in indexes['added'] + [change['to'] for change in indexes['changed']]:
+            self._add('create_indexes', table_name, _index_sql(table_name, index),
+                      'online', f"インデックス {index['name']} の作成（インプレース、処理量は行数に比例）")
+
+        for fk in foreign_keys['added'] + [change['to'] for change in foreign_keys['changed']]:
+            self._add('add_foreign_keys', table_name, _foreign_key_sql(table_name, fk),
+                      'lock', f"外部キー {fk['name']} の追加（foreign_key_checks=1ではCOPYアルゴリズム）")
+
+
+def generate_migration_sql(steps: List[Dict[str, Any]], diff: Dict[str, Any]) -> str:
+    """マイグレーションのステップをSQLファイルの内容に変換（影響のある文にはコメントで警告を付ける）"""
+    lines = [
+        f"-- Migration: {diff['from_database']} -> {diff['to_database']}",
+        ""
+    ]
+    for step in steps:
+        lines.append(f"-- [{step['risk']}] {step['reason']}")
+        if step['flagged']:
+            size = "サイズ不明" if step['estimated_rows'] is None else f"推定 {step['estimated_rows']} 行"
+            lines.append(f"-- WARNING: 大きなテーブルのロック・再構築を伴う可能性があります（{size}）")
+        if step['destructive']:
+            lines.append("-- WARNING: データが失われる可能性があります")
+        lines.append(step['sql'])
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="スキーマの差分とマイグレーションDDLを出力")
+    parser.add_argument("before", help="変更前のスキーマ（JSONスナップショットのパス、または live）")
+    parser.add_argument("after", help="変更後のスキーマ（JSONスナップショットのパス、または live）")
+    parser.add_argument("--output", help="差分とマイグレーション計画のJSONの出力先（省略時は標準出力）")
+    parser.add_argument("--sql", help="マイグレーションDDLの出力先")
+    parser.add_argument("--large-table-rows", type=int, default=LARGE_TABLE_ROWS,
+                        help="大きなテーブルとみなす行数")
+    parser.add_argument("--fail-on-flagged", action="store_true",
+                        help="警告対象の変更がある場合に終了コード1で終了する（CI用）")
+    args = parser.parse_args()
+
+    before = load_schema(args.before)
+    after = load_schema(args.after)
+
+    diff = diff_schemas(before, after)
+    steps = MigrationPlanner(before, after, args.large_table_rows).plan(diff)
+    result = {
+        'diff': diff,
+        'migration': steps,
+        'summary': {
+            'tables_added': len(diff['tables_added']),
+            'tables_removed': len(diff['tables_removed']),
+            'tables_changed': len(diff['tables_changed']),
+            'statements': len(steps),
+            'flagged': sum(1 for step in steps if step['flagged']),
+            'destructive': sum(1 for step in steps if step['destructive'])
+        }
+    }
+
+    content = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"Diff exported to JSON: {args.output}")
+    else:
+        print(content)
+
+    if args.sql:
+        with open(args.sql, 'w', encoding='utf-8') as f:
+            f.write(generate_migration_sql(steps, diff))
+        print(f"Migration exported to SQL: {args.sql}", file=sys.stderr if not args.output else sys.stdout)
+
+    if args.fail_on_flagged and result['summary']['flagged']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
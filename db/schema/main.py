@@ -3,29 +3,128 @@
 データベーススキーマ取得・保存スクリプト
 
 このスクリプトは指定されたMySQLデータベースの全テーブルのスキーマ情報を取得し、
-SQL DDL形式で保存します。
+SQL DDL形式とJSON形式（diff.py で比較するスナップショット）で保存します。
+
+スキーマ情報は INFORMATION_SCHEMA からテーブル横断の数回のクエリでまとめて取得します
+（SCHEMA_REFLECTION_MODE=inspector でテーブルごとにSQLAlchemyのInspectorを使う従来の方式）。
+DB_NAMES にカンマ区切りで複数のデータベースを指定すると、並行してエクスポートします。
 """
 
+import json
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from sqlalchemy import create_engine, MetaData, inspect, text
 from dotenv import load_dotenv
 
 
+# 文字列型（照合順序を型に含める型）
+STRING_TYPES = {'char', 'varchar', 'tinytext', 'text', 'mediumtext', 'longtext'}
+
+# INFORMATION_SCHEMAのデータ型名からSQLAlchemyの型表記への変換（記載のないものは大文字にするだけ）
+TYPE_NAMES = {'int': 'INTEGER'}
+
+
+def normalize_column_type(data_type: str, column_type: str, collation: Optional[str]) -> str:
+    """
+    INFORMATION_SCHEMA.COLUMNS の型情報を、Inspectorで取得した場合と同じ表記に変換
+
+    Args:
+        data_type: DATA_TYPE（例: varchar）
+        column_type: COLUMN_TYPE（例: varchar(100), enum('a','b'), int unsigned）
+        collation: COLLATION_NAME
+
+    Returns:
+        型の文字列表現（例: VARCHAR(100) COLLATE "utf8mb4_0900_ai_ci"）
+    """
+    data_type = data_type.lower()
+    type_name = TYPE_NAMES.get(data_type, data_type.upper())
+
+    if data_type in ('enum', 'set'):
+        values_str = column_type[column_type.find("(") + 1:column_type.rfind(")")]
+        values = [value.replace("''", "'") for value in re.findall(r"'((?:[^']|'')*)'", values_str)]
+        return f"{type_name}('" + "', '".join(values) + "')"
+
+    match = re.match(r"^[a-z ]+\(([^)]*)\)", column_type.lower())
+    type_str = type_name
+    if match:
+        args = ", ".join(arg.strip() for arg in match.group(1).split(","))
+        type_str += f"({args})"
+    if 'unsigned' in column_type.lower():
+        type_str += " UNSIGNED"
+    if 'zerofill' in column_type.lower():
+        type_str += " ZEROFILL"
+    if data_type in STRING_TYPES and collation:
+        type_str += f' COLLATE "{collation}"'
+    return type_str
+
+
+def normalize_column_default(default: Optional[str], extra: str) -> Optional[str]:
+    """
+    INFORMATION_SCHEMA.COLUMNS のデフォルト値を、Inspectorで取得した場合と同じ表記に変換
+    （リテラルは引用符付き、式のデフォルトは括弧付き、CURRENT_TIMESTAMPはそのまま）
+    """
+    if default is None:
+        return None
+    if 'DEFAULT_GENERATED' in (extra or '').upper():
+        if default.upper().startswith('CURRENT_TIMESTAMP'):
+            return default
+        return f"({default})"
+    return "'" + default.replace("'", "''") + "'"
+
+
+def column_definition(column: Dict[str, Any]) -> str:
+    """
+    スキーマ情報のカラム1件からカラム定義（CREATE TABLE / ALTER TABLE用）を生成
+    
+    Args:
+        column: カラム情報
+        
+    Returns:
+        カラム定義文字列（例: `id` INTEGER NOT NULL AUTO_INCREMENT）
+    """
+    col_def = f"`{column['name']}` {column['type']}"
+    
+    if not column['nullable']:
+        col_def += " NOT NULL"
+    
+    if column['default'] is not None and column['default'] != 'None':
+        col_def += f" DEFAULT {column['default']}"
+    
+    if column['autoincrement']:
+        col_def += " AUTO_INCREMENT"
+    
+    if column['comment']:
+        col_def += f" COMMENT '{column['comment']}'"
+    
+    return col_def
+
+
 class DatabaseSchemaExporter:
     """データベーススキーマを取得・エクスポートするクラス"""
     
-    def __init__(self, connection_string: str):
+    def __init__(self, connection_string: str, reflection_mode: str = 'information_schema'):
         """
         初期化
         
         Args:
             connection_string: データベース接続文字列
+            reflection_mode: スキーマ情報の取得方式（information_schema または inspector）
         """
         self.engine = create_engine(connection_string)
+        self.reflection_mode = reflection_mode
         self.metadata = MetaData()
-        self.inspector = inspect(self.engine)
+        self._inspector = None
+        self._database_name = None
+    
+    @property
+    def inspector(self):
+        """SQLAlchemyのInspector（従来の方式でのみ使用するため、初回参照時に作成）"""
+        if self._inspector is None:
+            self._inspector = inspect(self.engine)
+        return self._inspector
     
     def get_table_schema(self, table_name: str) -> Dict[str, Any]:
         """
@@ -150,6 +249,9 @@ class DatabaseSchemaExporter:
         Returns:
             全テーブルのスキーマ情報
         """
+        if self.reflection_mode != 'inspector':
+            return self.get_all_tables_schema_fast()
+        
         table_names = self.inspector.get_table_names()
         
         database_schema = {
@@ -172,9 +274,160 @@ class DatabaseSchemaExporter:
         Returns:
             データベース名
         """
+        if self._database_name is None:
+            with self.engine.connect() as conn:
+                result = conn.execute(text("SELECT DATABASE()"))
+                self._database_name = result.scalar()
+        return self._database_name
+    
+    def get_all_tables_schema_fast(self, database_name: str = None) -> Dict[str, Any]:
+        """
+        INFORMATION_SCHEMA から全テーブルのスキーマ情報をまとめて取得
+        テーブル数に関係なく、1つの接続で数回のクエリだけを実行する
+        
+        Args:
+            database_name: データベース名（Noneの場合は接続先のデータベース）
+            
+        Returns:
+            全テーブルのスキーマ情報（get_all_tables_schema と同じ形式）
+        """
+        database_name = database_name or self.get_database_name()
+        params = {"db_name": database_name}
+        
         with self.engine.connect() as conn:
-            result = conn.execute(text("SELECT DATABASE()"))
-            return result.scalar()
+            table_rows = conn.execute(text("""
+            SELECT TABLE_NAME
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = :db_name AND TABLE_TYPE = 'BASE TABLE'
+            ORDER BY TABLE_NAME
+            """), params).fetchall()
+            column_rows = conn.execute(text("""
+            SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, COLUMN_TYPE, COLLATION_NAME,
+                   IS_NULLABLE, COLUMN_DEFAULT, EXTRA, COLUMN_COMMENT
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = :db_name
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+            """), params).fetchall()
+            index_rows = conn.execute(text("""
+            SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME, NON_UNIQUE
+            FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = :db_name
+            ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+            """), params).fetchall()
+            foreign_key_rows = conn.execute(text("""
+            SELECT k.TABLE_NAME, k.CONSTRAINT_NAME, k.COLUMN_NAME,
+                   k.REFERENCED_TABLE_NAME, k.REFERENCED_COLUMN_NAME,
+                   r.UPDATE_RULE, r.DELETE_RULE
+            FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE k
+            INNER JOIN INFORMATION_SCHEMA.REFERENTIAL_CONSTRAINTS r
+                ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+            WHERE k.TABLE_SCHEMA = :db_name AND k.REFERENCED_TABLE_NAME IS NOT NULL
+            ORDER BY k.TABLE_NAME, k.CONSTRAINT_NAME, k.ORDINAL_POSITION
+            """), params).fetchall()
+            try:
+                # CHECK_CONSTRAINTSはMySQL 8.0.16以降
+                check_rows = conn.execute(text("""
+                SELECT t.TABLE_NAME, t.CONSTRAINT_NAME, c.CHECK_CLAUSE
+                FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS t
+                INNER JOIN INFORMATION_SCHEMA.CHECK_CONSTRAINTS c
+                    ON c.CONSTRAINT_SCHEMA = t.CONSTRAINT_SCHEMA AND c.CONSTRAINT_NAME = t.CONSTRAINT_NAME
+                WHERE t.TABLE_SCHEMA = :db_name AND t.CONSTRAINT_TYPE = 'CHECK'
+                ORDER BY t.TABLE_NAME, t.CONSTRAINT_NAME
+                """), params).fetchall()
+            except Exception as e:
+                print(f"CHECK制約情報取得エラー ({database_name}): {e}")
+                check_rows = []
+        
+        tables = {}
+        for (table_name,) in table_rows:
+            tables[table_name] = {
+                'table_name': table_name,
+                'columns': [],
+                'primary_keys': [],
+                'foreign_keys': [],
+                'indexes': [],
+                'constraints': []
+            }
+        
+        for row in column_rows:
+            table_info = tables.get(row.TABLE_NAME)
+            if table_info is None:
+                continue
+            table_info['columns'].append({
+                'name': row.COLUMN_NAME,
+                'type': normalize_column_type(row.DATA_TYPE, row.COLUMN_TYPE, row.COLLATION_NAME),
+                'nullable': row.IS_NULLABLE == 'YES',
+                'default': normalize_column_default(row.COLUMN_DEFAULT, row.EXTRA),
+                'autoincrement': 'auto_increment' in (row.EXTRA or '').lower(),
+                'comment': row.COLUMN_COMMENT or None
+            })
+        
+        indexes = {}
+        for row in index_rows:
+            table_info = tables.get(row.TABLE_NAME)
+            if table_info is None:
+                continue
+            if row.INDEX_NAME == 'PRIMARY':
+                table_info['primary_keys'].append(row.COLUMN_NAME)
+                continue
+            key = (row.TABLE_NAME, row.INDEX_NAME)
+            if key not in indexes:
+                indexes[key] = {'name': row.INDEX_NAME, 'column_names': [], 'unique': not int(row.NON_UNIQUE)}
+                table_info['indexes'].append(indexes[key])
+            # 関数インデックスの式部分はCOLUMN_NAMEがNULLになる
+            if row.COLUMN_NAME is not None:
+                indexes[key]['column_names'].append(row.COLUMN_NAME)
+        
+        foreign_keys = {}
+        for row in foreign_key_rows:
+            table_info = tables.get(row.TABLE_NAME)
+            if table_info is None:
+                continue
+            key = (row.TABLE_NAME, row.CONSTRAINT_NAME)
+            if key not in foreign_keys:
+                options = {}
+                # 既定の動作（RESTRICT / NO ACTION）以外の場合のみ、Inspectorと同様にoptionsに含める
+                if row.UPDATE_RULE not in ('RESTRICT', 'NO ACTION'):
+                    options['onupdate'] = row.UPDATE_RULE
+                if row.DELETE_RULE not in ('RESTRICT', 'NO ACTION'):
+                    options['ondelete'] = row.DELETE_RULE
+                foreign_keys[key] = {
+                    'name': row.CONSTRAINT_NAME,
+                    'constrained_columns': [],
+                    'referred_table': row.REFERENCED_TABLE_NAME,
+                    'referred_columns': [],
+                    'options': options
+                }
+                table_info['foreign_keys'].append(foreign_keys[key])
+            foreign_keys[key]['constrained_columns'].append(row.COLUMN_NAME)
+            foreign_keys[key]['referred_columns'].append(row.REFERENCED_COLUMN_NAME)
+        
+        for row in check_rows:
+            table_info = tables.get(row.TABLE_NAME)
+            if table_info is not None:
+                table_info['constraints'].append({'name': row.CONSTRAINT_NAME, 'sqltext': row.CHECK_CLAUSE})
+        
+        return {
+            'database_name': database_name,
+            'export_timestamp': datetime.now().isoformat(),
+            'tables_count': len(tables),
+            'tables': tables
+        }
+    
+    def export_schemas(self, database_names: List[str], max_workers: int = 4) -> Dict[str, Dict[str, Any]]:
+        """
+        複数のデータベースのスキーマ情報を並行して取得（INFORMATION_SCHEMA方式）
+        
+        Args:
+            database_names: データベース名のリスト
+            max_workers: 同時に使用する接続数
+            
+        Returns:
+            データベース名をキーとするスキーマ情報の辞書
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(self.get_all_tables_schema_fast, database_names)
+            return dict(zip(database_names, results))
     
     def generate_ddl(self, schema_info: Dict[str, Any]) -> str:
         """
@@ -206,21 +459,7 @@ class DatabaseSchemaExporter:
             # カラム定義
             column_definitions = []
             for column in table_info['columns']:
-                col_def = f"  `{column['name']}` {column['type']}"
-                
-                if not column['nullable']:
-                    col_def += " NOT NULL"
-                
-                if column['default'] is not None and column['default'] != 'None':
-                    col_def += f" DEFAULT {column['default']}"
-                
-                if column['autoincrement']:
-                    col_def += " AUTO_INCREMENT"
-                
-                if column['comment']:
-                    col_def += f" COMMENT '{column['comment']}'"
-                
-                column_definitions.append(col_def)
+                column_definitions.append(f"  {column_definition(column)}")
             
             ddl_statements.append(",\n".join(column_definitions))
             
@@ -259,6 +498,46 @@ class DatabaseSchemaExporter:
         
         return "\n".join(ddl_statements)
     
+    def get_table_sizes(self, database_name: str = None) -> Dict[str, Dict[str, int]]:
+        """
+        テーブルごとの推定行数とサイズを取得（マイグレーションの影響の見積もり用）
+        
+        Args:
+            database_name: データベース名（Noneの場合は接続先のデータベース）
+            
+        Returns:
+            テーブル名をキーとする {'rows': 推定行数, 'bytes': データ＋インデックスのバイト数}
+        """
+        with self.engine.connect() as conn:
+            rows = conn.execute(text("""
+            SELECT TABLE_NAME, TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = :db_name AND TABLE_TYPE = 'BASE TABLE'
+            """), {"db_name": database_name or self.get_database_name()}).fetchall()
+        return {
+            row.TABLE_NAME: {
+                'rows': int(row.TABLE_ROWS or 0),
+                'bytes': int(row.DATA_LENGTH or 0) + int(row.INDEX_LENGTH or 0)
+            }
+            for row in rows
+        }
+    
+    def export_to_json(self, output_file: str, schema_info: Dict[str, Any] = None):
+        """
+        スキーマ情報をJSON形式で出力（diff.py で比較するスナップショット）
+        
+        Args:
+            output_file: 出力ファイルパス
+            schema_info: スキーマ情報（Noneの場合は新規取得）
+        """
+        if schema_info is None:
+            schema_info = self.get_all_tables_schema()
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(schema_info, f, ensure_ascii=False, indent=2)
+        
+        print(f"Schema exported to JSON: {output_file}")
+    
     def export_to_sql(self, output_file: str, schema_info: Dict[str, Any] = None):
         """
         スキーマ情報をSQL DDL形式で出力
@@ -289,31 +568,45 @@ def main():
     db_name = os.getenv('DB_NAME', 'aws_quiz')
     db_user = os.getenv('DB_USER', 'root')
     db_password = os.getenv('DB_PASSWORD', 'password')
+    # 複数のデータベースをエクスポートする場合はカンマ区切りで指定（省略時はDB_NAMEのみ）
+    db_names = [name.strip() for name in os.getenv('DB_NAMES', '').split(',') if name.strip()]
+    reflection_mode = os.getenv('SCHEMA_REFLECTION_MODE', 'information_schema')
+    max_workers = int(os.getenv('EXPORT_MAX_WORKERS', '4'))
     
     # 接続文字列作成
     connection_string = f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
     
     try:
         # エクスポーター初期化
-        exporter = DatabaseSchemaExporter(connection_string)
+        exporter = DatabaseSchemaExporter(connection_string, reflection_mode)
         
         # 出力ファイル名（タイムスタンプ付き）
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        sql_output = f"database_schema_{timestamp}.sql"
         
-        print(f"Connecting to database: {db_name} at {db_host}:{db_port}")
+        print(f"Connecting to database: {', '.join(db_names) or db_name} at {db_host}:{db_port}")
         print("Exporting database schema...")
         
         # スキーマ情報を取得
-        schema_info = exporter.get_all_tables_schema()
+        if db_names:
+            schemas = exporter.export_schemas(db_names, max_workers)
+        else:
+            schemas = {db_name: exporter.get_all_tables_schema()}
         
-        # SQL DDL形式でエクスポート
-        exporter.export_to_sql(sql_output, schema_info)
+        outputs = []
+        for name, schema_info in schemas.items():
+            # SQL DDL形式でエクスポート（複数の場合はデータベース名をファイル名に含める）
+            base_name = f"database_schema_{name}_{timestamp}" if db_names else f"database_schema_{timestamp}"
+            exporter.export_to_sql(f"{base_name}.sql", schema_info)
+            exporter.export_to_json(f"{base_name}.json", schema_info)
+            outputs.append((name, schema_info['tables_count'], base_name))
         
         print(f"\nExport completed successfully!")
-        print(f"Tables exported: {schema_info['tables_count']}")
+        for name, tables_count, _ in outputs:
+            print(f"Tables exported ({name}): {tables_count}")
         print(f"Output files:")
-        print(f"  - SQL DDL: {sql_output}")
+        for _, _, base_name in outputs:
+            print(f"  - SQL DDL: {base_name}.sql")
+            print(f"  - JSON: {base_name}.json")
         
     except Exception as e:
         print(f"Error occurred: {str(e)}")
@@ -0,0 +1,22 @@
+-- Migration: exam_categories.question_count（試験カテゴリーごとの論理削除されていない問題数）
+--
+-- lambdas（adapters/repositories/exam_repo.py）と db/create-quiz（database.py）は
+-- このカラムを NOT NULL で参照・更新するため、コードのデプロイ前に適用すること。
+-- デプロイ順序:
+--   1. このファイルを適用する（カラムの追加はメタデータのみの変更、続けて既存の問題数を集計）
+--   2. lambdas・db/create-quiz をデプロイする
+--   3. lambdas/src で python -m jobs.question_counts を実行し、1〜2の間に旧コードが挿入した問題の分のずれを修復する
+--
+-- ALTER TABLE は diff.py で生成:
+--   python diff.py database_schema_20250702_095211.json database_schema_20261017_101204.json
+
+-- [none] カラム question_count の末尾への追加（INSTANT）
+ALTER TABLE `exam_categories`
+  ADD COLUMN `question_count` INTEGER NOT NULL DEFAULT '0' COMMENT '論理削除されていない問題数' AFTER `category_id`;
+
+-- 既存の問題数を集計（論理削除された問題は数えない）
+UPDATE `exam_categories` ec
+  SET ec.`question_count` = (
+    SELECT COUNT(*) FROM `questions` q
+    WHERE q.`exam_categories_id` = ec.`id` AND q.`deleted_at` IS NULL
+  );
@@ -0,0 +1,68 @@
+-- Migration: 統計ロールアップテーブル（stats_*、question_responses の集計結果）
+--
+-- lambdas の統計APIと集計ジョブ（adapters/repositories/stats_repo.py・jobs/stats_rollup.py）が参照する。
+-- デプロイ順序:
+--   1. このファイルを適用する（新しいテーブルの作成のみで、既存のテーブルはロックしない）
+--   2. lambdas をデプロイする
+--   3. lambdas/src で python -m jobs.stats_rollup --mode rebuild を実行し、既存の回答をすべて集計する
+--      （以降は EventBridge のスケジュールから差分集計する）
+--
+-- DDL は diff.py で生成:
+--   python diff.py database_schema_20261017_101204.json database_schema_20261017_114027.json
+
+-- [none] 新しいテーブルの作成
+CREATE TABLE `stats_exam_category` (
+  `exam_categories_id` INTEGER NOT NULL,
+  `exam_id` INTEGER NOT NULL,
+  `category_id` INTEGER NOT NULL,
+  `response_count` INTEGER NOT NULL,
+  `correct_count` INTEGER NOT NULL,
+  PRIMARY KEY (`exam_categories_id`)
+);
+
+-- [none] 新しいテーブルの作成
+CREATE TABLE `stats_pending_attempts` (
+  `attempt_id` INTEGER NOT NULL,
+  `started_at` DATETIME NOT NULL,
+  PRIMARY KEY (`attempt_id`)
+);
+
+-- [none] 新しいテーブルの作成
+CREATE TABLE `stats_question` (
+  `question_id` INTEGER NOT NULL,
+  `response_count` INTEGER NOT NULL,
+  `correct_count` INTEGER NOT NULL,
+  PRIMARY KEY (`question_id`)
+);
+
+-- [none] 新しいテーブルの作成
+CREATE TABLE `stats_user_exam` (
+  `user_id` INTEGER NOT NULL,
+  `exam_id` INTEGER NOT NULL,
+  `answered_questions` INTEGER NOT NULL,
+  `correct_answers` INTEGER NOT NULL,
+  `last_answered_at` DATETIME,
+  PRIMARY KEY (`user_id`, `exam_id`)
+);
+
+-- [none] 新しいテーブルの作成
+CREATE TABLE `stats_user_question_latest` (
+  `user_id` INTEGER NOT NULL,
+  `question_id` INTEGER NOT NULL,
+  `exam_id` INTEGER NOT NULL,
+  `response_id` BIGINT NOT NULL,
+  `answered_at` DATETIME NOT NULL,
+  `is_correct` TINYINT NOT NULL,
+  PRIMARY KEY (`user_id`, `question_id`)
+);
+
+-- [none] 新しいテーブルの作成
+CREATE TABLE `stats_watermarks` (
+  `name` VARCHAR(64) COLLATE "utf8mb4_0900_ai_ci" NOT NULL,
+  `last_id` BIGINT NOT NULL,
+  `updated_at` DATETIME,
+  PRIMARY KEY (`name`)
+);
+
+-- [none] 新しいテーブルへのインデックス作成
+CREATE INDEX `ix_stats_exam_category_exam_id` ON `stats_exam_category` (`exam_id`);
@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""
+クエリ実行計画アドバイザー
+
+アプリケーション（aws-quiz-app/src/lib/quiz-service.ts など）の頻出クエリの一覧を保持し、
+対象データベースで EXPLAIN FORMAT=JSON / EXPLAIN ANALYZE を実行して、
+フルスキャン・filesort・一時テーブル・絞り込みの弱いインデックスアクセスを検出します。
+問題が検出されたテーブルについて、クエリの絞り込み・並び替えのカラムから複合インデックスを組み立てて
+既存のインデックスで満たされない場合に提案し、--apply を指定するとインデックスを作成して前後の実行時間を比較します。
+
+使い方（.env の DB_* に db/docker-compose.yml のローカルMySQLなどを指定）:
+    python query_advisor.py                          # 実行計画の確認とインデックスの提案のみ
+    python query_advisor.py --apply --output report.json   # 提案したインデックスを作成して前後を比較（比較後に削除）
+    python query_advisor.py --apply --keep           # 作成したインデックスを残す
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+from typing import Dict, Any, List, Optional
+from sqlalchemy import create_engine, bindparam, text
+from dotenv import load_dotenv
+
+
+# 頻出クエリの一覧
+# params: 実データから取得したサンプル値の名前（ParameterSampler.sample のキー）
+# expanding: IN句に展開するパラメータ
+# access: テーブルごとのアクセスパターン。aliases は実行計画上の名前（別名、サブクエリ内では実テーブル名）
+#   equality（等価・結合キー・IS NULL）、order（並び替え・PARTITION BY）、range（範囲・IN）のカラムから
+#   等価 → 並び替え → 範囲 の順にインデックスのカラムを組み立てる
+HOT_QUERIES: List[Dict[str, Any]] = [
+    {
+        'name': 'exam_categories_with_counts',
+        'source': 'quiz-service.ts getExamCategories',
+        'sql': """
+            SELECT c.id, c.category_name, c.description, c.created_at, COUNT(q.id) AS question_count
+            FROM categories c
+            INNER JOIN exam_categories ec ON c.id = ec.category_id
+            LEFT JOIN questions q ON ec.id = q.exam_categories_id AND q.deleted_at IS NULL
+            WHERE ec.exam_id = :exam_id
+            GROUP BY c.id, c.category_name, c.description, c.created_at
+            ORDER BY c.category_name
+        """,
+        'params': ['exam_id'],
+        'access': [
+            {'table': 'questions', 'aliases': ['q'], 'equality': ['exam_categories_id', 'deleted_at'],
+             'reason': 'exam_categories_idの等価結合とdeleted_at IS NULLをインデックスだけで判定（COUNT(q.id)もカバー）'},
+        ],
+    },
+    {
+        'name': 'random_questions',
+        'source': 'quiz-service.ts getRandomQuestions',
+        'sql': """
+            SELECT q.id, q.body, q.explanation, q.choices, q.correct_key, q.exam_categories_id
+            FROM questions q
+            INNER JOIN exam_categories ec ON q.exam_categories_id = ec.id
+            WHERE ec.exam_id = :exam_id
+              AND ec.category_id IN :category_ids
+              AND q.deleted_at IS NULL
+            ORDER BY RAND()
+            LIMIT 10
+        """,
+        'params': ['exam_id', 'category_ids'],
+        'expanding': ['category_ids'],
+        'access': [
+            {'table': 'exam_categories', 'aliases': ['ec'], 'equality': ['exam_id'], 'range': ['category_id'],
+             'reason': 'exam_idの等価とcategory_idのINを1つのインデックスで絞り込む'},
+            {'table': 'questions', 'aliases': ['q'], 'equality': ['exam_categories_id', 'deleted_at'],
+             'reason': '結合キーとdeleted_at IS NULLで絞り込む（ORDER BY RAND()のfilesortは抽出件数に比例して残る）'},
+        ],
+    },
+    {
+        'name': 'category_question_counts',
+        'source': 'quiz-service.ts getCategoryQuestionCounts',
+        'sql': """
+            SELECT ec.category_id, COUNT(q.id) AS question_count
+            FROM questions q
+            INNER JOIN exam_categories ec ON q.exam_categories_id = ec.id
+            WHERE ec.exam_id = :exam_id
+              AND ec.category_id IN :category_ids
+              AND q.deleted_at IS NULL
+            GROUP BY ec.category_id
+        """,
+        'params': ['exam_id', 'category_ids'],
+        'expanding': ['category_ids'],
+        'access': [
+            {'table': 'exam_categories', 'aliases': ['ec'], 'equality': ['exam_id'], 'range': ['category_id'],
+             'reason': 'exam_idの等価とcategory_idのINを1つのインデックスで絞り込む'},
+            {'table': 'questions', 'aliases': ['q'], 'equality': ['exam_categories_id', 'deleted_at'],
+             'reason': '件数をインデックスだけで数える（カバリングインデックス）'},
+        ],
+    },
+    {
+        'name': 'exam_attempt_by_user',
+        'source': 'quiz-service.ts getExamAttempt',
+        'sql': "SELECT * FROM exam_attempts WHERE id = :attempt_id AND user_id = :user_id",
+        'params': ['attempt_id', 'user_id'],
+    },
+    {
+        'name': 'attempt_questions',
+        'source': 'api/exam-attempts/[id]/questions',
+        'sql': """
+            SELECT q.id, q.body, q.choices, q.exam_categories_id
+            FROM questions q
+            WHERE q.id IN :question_ids AND q.deleted_at IS NULL
+        """,
+        'params': ['question_ids'],
+        'expanding': ['question_ids'],
+    },
+    {
+        'name': 'latest_responses_for_results',
+        'source': 'quiz-service.ts getQuizResults',
+        'sql': """
+            SELECT qr.id, qr.attempt_id, qr.question_id, qr.answer_ids, qr.is_correct, qr.answered_at, qr.feedback
+            FROM question_responses qr
+            INNER JOIN (
+              SELECT question_id, MAX(answered_at) AS max_answered_at
+              FROM question_responses
+              WHERE attempt_id = :attempt_id
+              GROUP BY question_id
+            ) latest ON qr.question_id = latest.question_id
+                    AND qr.answered_at = latest.max_answered_at
+            WHERE qr.attempt_id = :attempt_id
+            ORDER BY qr.answered_at
+        """,
+        'params': ['attempt_id'],
+        'access': [
+            {'table': 'question_responses', 'aliases': ['qr', 'question_responses'],
+             'equality': ['attempt_id', 'question_id'], 'order': ['answered_at'],
+             'reason': '試験ごと・問題ごとの最新の回答をインデックス順に読み、GROUP BYの一時テーブルを避ける'},
+        ],
+    },
+    {
+        'name': 'user_exam_stats',
+        'source': 'api/exams/stats',
+        'sql': """
+            SELECT
+              COALESCE(SUM(CASE WHEN latest_qr.is_correct = 1 THEN 1 ELSE 0 END), 0) AS correct_answers,
+              COALESCE(COUNT(latest_qr.id), 0) AS total_answers
+            FROM (
+              SELECT qr.id, qr.question_id, qr.is_correct,
+                     ROW_NUMBER() OVER (PARTITION BY qr.question_id ORDER BY qr.answered_at DESC) AS rn
+              FROM question_responses qr
+              INNER JOIN exam_attempts ea ON qr.attempt_id = ea.id
+              INNER JOIN questions q ON qr.question_id = q.id
+              INNER JOIN exam_categories ec ON q.exam_categories_id = ec.id
+              WHERE ea.user_id = :user_id
+                AND ec.exam_id = :exam_id
+                AND ea.finished_at IS NOT NULL
+            ) latest_qr
+            WHERE latest_qr.rn = 1
+        """,
+        'params': ['user_id', 'exam_id'],
+        'access': [
+            {'table': 'exam_attempts', 'aliases': ['ea'], 'equality': ['user_id'], 'range': ['finished_at'],
+             'reason': 'ユーザーの完了した試験だけをインデックスで絞り込む'},
+            {'table': 'question_responses', 'aliases': ['qr'], 'equality': ['attempt_id'],
+             'order': ['question_id', 'answered_at'],
+             'reason': '試験ごとの回答を問題・回答日時の順に読む（ROW_NUMBERの並び替えを避ける）'},
+        ],
+    },
+]
+
+# 問題として扱う実行計画の検出条件（この行数未満のフルスキャンは小さなマスタテーブルとして無視する）
+FULL_SCAN_MIN_ROWS = int(os.getenv('ADVISOR_FULL_SCAN_MIN_ROWS', '1000'))
+# インデックスで読んだ行のうち、条件で残る割合（filtered）がこの値以下なら絞り込みの弱いアクセスとして扱う（%）
+FILTERED_SCAN_MAX_PCT = float(os.getenv('ADVISOR_FILTERED_SCAN_MAX_PCT', '50'))
+
+
+class ParameterSampler:
+    """頻出クエリのパラメータに使うサンプル値を実データから取得するクラス"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        問題数の多い試験と、直近の回答のうち回答数の多い試験記録をサンプルとして選ぶ
+
+        Returns:
+            パラメータ名をキーとするサンプル値
+        """
+        params: Dict[str, Any] = {}
+        row = self.conn.execute(text("""
+            SELECT ec.exam_id, COUNT(*) AS question_count
+            FROM questions q
+            INNER JOIN exam_categories ec ON q.exam_categories_id = ec.id
+            GROUP BY ec.exam_id
+            ORDER BY question_count DESC
+            LIMIT 1
+        """)).fetchone()
+        params['exam_id'] = row.exam_id if row else 1
+        params['category_ids'] = [
+            r.category_id for r in self.conn.execute(
+                text("SELECT category_id FROM exam_categories WHERE exam_id = :exam_id LIMIT 5"),
+                {'exam_id': params['exam_id']}
+            )
+        ] or [1]
+
+        row = self.conn.execute(text("""
+            SELECT qr.attempt_id, ea.user_id, COUNT(*) AS response_count
+            FROM question_responses qr
+            INNER JOIN exam_attempts ea ON qr.attempt_id = ea.id
+            WHERE qr.id > (SELECT COALESCE(MAX(id), 0) - 100000 FROM question_responses)
+            GROUP BY qr.attempt_id, ea.user_id
+            ORDER BY response_count DESC
+            LIMIT 1
+        """)).fetchone()
+        params['attempt_id'] = row.attempt_id if row else 1
+        params['user_id'] = row.user_id if row else 1
+
+        row = self.conn.execute(
+            text("SELECT question_ids FROM exam_attempts WHERE id = :attempt_id"),
+            {'attempt_id': params['attempt_id']}
+        ).fetchone()
+        raw = row.question_ids if row else None
+        question_ids = json.loads(raw) if isinstance(raw, str) else raw
+        params['question_ids'] = question_ids or [1]
+        return params
+
+
+def plan_tables(plan: Any, tables: Optional[List[str]] = None) -> List[str]:
+    """実行計画の部分木に含まれるテーブル名（別名）を出現順に取得"""
+    if tables is None:
+        tables = []
+    if isinstance(plan, list):
+        for item in plan:
+            plan_tables(item, tables)
+    elif isinstance(plan, dict):
+        if 'table_name' in plan and plan['table_name'] not in tables:
+            tables.append(plan['table_name'])
+        for value in plan.values():
+            if isinstance(value, (dict, list)):
+                plan_tables(value, tables)
+    return tables
+
+
+def find_plan_issues(plan: Any, issues: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    EXPLAIN FORMAT=JSON の実行計画からフルスキャン・filesort・一時テーブル・絞り込みの弱いアクセスを検出
+
+    Args:
+        plan: EXPLAIN FORMAT=JSON の結果（query_block以下）
+
+    Returns:
+        検出した問題のリスト（type, table または tables, key, rows など）
+        filesort・一時テーブルの tables は、並び替え・集計の対象になる部分木のテーブル
+    """
+    if issues is None:
+        issues = []
+    if isinstance(plan, list):
+        for item in plan:
+            find_plan_issues(item, issues)
+        return issues
+    if not isinstance(plan, dict):
+        return issues
+
+    if plan.get('using_filesort'):
+        issues.append({'type': 'filesort', 'tables': plan_tables(plan)})
+    if plan.get('using_temporary_table'):
+        issues.append({'type': 'temporary_table', 'tables': plan_tables(plan)})
+
+    # テーブルへのアクセス（"table": {"table_name": ..., "access_type": ...}）
+    if 'access_type' in plan:
+        rows = int(plan.get('rows_examined_per_scan', 0) or 0)
+        filtered = float(plan.get('filtered', 100) or 100)
+        if plan['access_type'] == 'ALL' and rows >= FULL_SCAN_MIN_ROWS:
+            issues.append({'type': 'full_scan', 'table': plan.get('table_name'), 'rows': rows})
+        elif plan['access_type'] == 'index' and rows >= FULL_SCAN_MIN_ROWS:
+            issues.append({'type': 'full_index_scan', 'table': plan.get('table_name'),
+                           'key': plan.get('key'), 'rows': rows})
+        elif (plan['access_type'] in ('ref', 'range') and rows >= FULL_SCAN_MIN_ROWS
+              and filtered <= FILTERED_SCAN_MAX_PCT):
+            # インデックスで読んだ行の多くを、インデックスに無いカラムの条件で捨てている
+            issues.append({'type': 'filtered_scan', 'table': plan.get('table_name'), 'key': plan.get('key'),
+                           'rows': rows, 'filtered': filtered})
+
+    for value in plan.values():
+        if isinstance(value, (dict, list)):
+            find_plan_issues(value, issues)
+    return issues
+
+
+def parse_analyze_time(analyze_output: str) -> Optional[float]:
+    """EXPLAIN ANALYZE の最上位ノードの実測時間（ミリ秒）を取得"""
+    match = re.search(r"actual time=[\d.]+\.\.([\d.]+) rows=[\d.]+ loops=(\d+)", analyze_output)
+    if not match:
+        return None
+    return float(match.group(1)) * int(match.group(2))
+
+
+def issue_tables(issue: Dict[str, Any]) -> List[str]:
+    """問題が関係するテーブル名（別名）"""
+    if issue.get('tables'):
+        return issue['tables']
+    return [issue['table']] if issue.get('table') else []
+
+
+def describe_issue(issue: Dict[str, Any]) -> str:
+    """問題の要約（提案の理由・表示用）"""
+    text = f"{issue['type']}({', '.join(issue_tables(issue))})"
+    if issue.get('key'):
+        text += f" key={issue['key']}"
+    if issue.get('rows'):
+        text += f" rows={issue['rows']}"
+    if 'filtered' in issue:
+        text += f" filtered={issue['filtered']:g}%"
+    return text
+
+
+def index_columns(access: Dict[str, Any]) -> List[str]:
+    """アクセスパターンから、等価 → 並び替え → 範囲 の順にインデックスのカラムを組み立てる"""
+    columns: List[str] = []
+    for column in access.get('equality', []) + access.get('order', []) + access.get('range', []):
+        if column not in columns:
+            columns.append(column)
+    return columns
+
+
+def index_name(table: str, columns: List[str]) -> str:
+    """提案するインデックスの名前（MySQLの識別子の上限64文字に収める）"""
+    return f"idx_{table}_{'_'.join(columns)}"[:64]
+
+
+class QueryAdvisor:
+    """頻出クエリの実行計画を調べてインデックスを提案するクラス"""
+
+    def __init__(self, connection_string: str, queries: List[Dict[str, Any]] = None, runs: int = 5):
+        """
+        初期化
+
+        Args:
+            connection_string: データベース接続文字列
+            queries: 調べるクエリの一覧（Noneの場合はHOT_QUERIES）
+            runs: 実行時間の計測回数（中央値を採用）
+        """
+        self.engine = create_engine(connection_string)
+        self.queries = queries if queries is not None else HOT_QUERIES
+        self.runs = runs
+
+    def _statement(self, query: Dict[str, Any], prefix: str = ''):
+        stmt = text(prefix + query['sql'])
+        for name in query.get('expanding', []):
+            stmt = stmt.bindparams(bindparam(name, expanding=True))
+        return stmt
+
+    def _params(self, query: Dict[str, Any], samples: Dict[str, Any]) -> Dict[str, Any]:
+        return {name: samples[name] for name in query['params']}
+
+    def existing_indexes(self, conn) -> Dict[str, List[List[str]]]:
+        """テーブルごとの既存のインデックス（主キーを含む）のカラム構成"""
+        rows = conn.execute(text("""
+            SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME
+            FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE()
+            ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+        """)).fetchall()
+        indexes: Dict[tuple, List[str]] = {}
+        for row in rows:
+            indexes.setdefault((row.TABLE_NAME, row.INDEX_NAME), []).append(row.COLUMN_NAME)
+        result: Dict[str, List[List[str]]] = {}
+        for (table, _), columns in indexes.items():
+            result.setdefault(table, []).append(columns)
+        return result
+
+    def measure(self, conn, query: Dict[str, Any], samples: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        1つのクエリの実行計画と実行時間を取得
+
+        Returns:
+            issues（検出した問題）, analyze（EXPLAIN ANALYZEの出力）, median_ms など
+        """
+        stmt = self._statement(query)
+        params = self._params(query, samples)
+
+        plan = json.loads(conn.execute(self._statement(query, "EXPLAIN FORMAT=JSON "), params).scalar())
+        analyze = "\n".join(row[0] for row in conn.execute(self._statement(query, "EXPLAIN ANALYZE "), params))
+
+        # 1回目はバッファプールの読み込みを含むため捨てる
+        conn.execute(stmt, params).fetchall()
+        timings = []
+        for _ in range(self.runs):
+            started = time.perf_counter()
+            conn.execute(stmt, params).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return {
+            'issues': find_plan_issues(plan.get('query_block', plan)),
+            'analyze': analyze,
+            'analyze_ms': parse_analyze_time(analyze),
+            'median_ms': round(statistics.median(timings), 3),
+            'min_ms': round(min(timings), 3),
+        }
+
+    def propose(self, existing: Dict[str, List[List[str]]],
+                issues: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        実行計画で問題が検出されたテーブルについて、アクセスパターンから組み立てたインデックスのうち
+        既存のインデックスの先頭カラムで満たされていないものを提案
+
+        Args:
+            existing: テーブルごとの既存のインデックスのカラム構成
+            issues: クエリ名 -> 検出した問題のリスト
+
+        Returns:
+            提案のリスト（table, columns, name, ddl, reasons, queries）
+        """
+        proposals: Dict[tuple, Dict[str, Any]] = {}
+        for query in self.queries:
+            for access in query.get('access', []):
+                aliases = set(access.get('aliases', [access['table']]))
+                matched = [issue for issue in issues.get(query['name'], []) if aliases & set(issue_tables(issue))]
+                if not matched:
+                    continue
+                columns = index_columns(access)
+                if any(index[:len(columns)] == columns for index in existing.get(access['table'], [])):
+                    continue
+                key = (access['table'], tuple(columns))
+                name = index_name(access['table'], columns)
+                proposal = proposals.setdefault(key, {
+                    'table': access['table'],
+                    'columns': columns,
+                    'name': name,
+                    'ddl': f"CREATE INDEX `{name}` ON `{access['table']}` (`{'`, `'.join(columns)}`) "
+                           f"ALGORITHM=INPLACE LOCK=NONE;",
+                    'reasons': [],
+                    'queries': [],
+                })
+                proposal['reasons'].append(
+                    f"{query['name']}: {'; '.join(describe_issue(issue) for issue in matched)} - {access['reason']}")
+                proposal['queries'].append(query['name'])
+        return list(proposals.values())
+
+    def unaddressed_issues(self, issues: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """アクセスパターンが登録されていないテーブルの問題（インデックスを提案できないため個別に確認する）"""
+        unaddressed = []
+        for query in self.queries:
+            aliases = {alias for access in query.get('access', []) for alias in access.get('aliases', [access['table']])}
+            for issue in issues.get(query['name'], []):
+                if not aliases & set(issue_tables(issue)):
+                    unaddressed.append({'query': query['name'], 'issue': describe_issue(issue)})
+        return unaddressed
+
+    def run(self, apply: bool = False, keep: bool = False) -> Dict[str, Any]:
+        """
+        全クエリを調べ、インデックスを提案する（applyの場合は作成して前後を比較）
+
+        Args:
+            apply: 提案したインデックスを作成して再計測する
+            keep: 作成したインデックスを比較後も残す
+
+        Returns:
+            レポート（samples, queries, proposals）
+        """
+        with self.engine.connect() as conn:
+            samples = ParameterSampler(conn).sample()
+            report = {'database': conn.execute(text("SELECT DATABASE()")).scalar(),
+                      'samples': samples, 'queries': [], 'proposals': [], 'unaddressed_issues': []}
+
+            before = {}
+            for query in self.queries:
+                print(f"Analyzing query: {query['name']}")
+                before[query['name']] = self.measure(conn, query, samples)
+
+            issues = {name: measured['issues'] for name, measured in before.items()}
+            proposals = self.propose(self.existing_indexes(conn), issues)
+            report['proposals'] = proposals
+            report['unaddressed_issues'] = self.unaddressed_issues(issues)
+
+            after = {}
+            if apply and proposals:
+                # 途中のインデックス作成・再計測で失敗した場合も、作成済みのインデックスだけは削除する
+                created = []
+                try:
+                    for proposal in proposals:
+                        print(f"Creating index: {proposal['name']}")
+                        conn.execute(text(proposal['ddl']))
+                        created.append(proposal)
+                    conn.execute(text("ANALYZE TABLE " + ", ".join(
+                        f"`{table}`" for table in sorted({proposal['table'] for proposal in proposals}))))
+                    for query in self.queries:
+                        print(f"Re-analyzing query: {query['name']}")
+                        after[query['name']] = self.measure(conn, query, samples)
+                finally:
+                    if not keep:
+                        for proposal in reversed(created):
+                            print(f"Dropping index: {proposal['name']}")
+                            conn.execute(text(f"DROP INDEX `{proposal['name']}` ON `{proposal['table']}`"))
+
+            for query in self.queries:
+                entry = {'name': query['name'], 'source': query['source'], 'before': before[query['name']]}
+                if query['name'] in after:
+                    entry['after'] = after[query['name']]
+                    before_ms = entry['before']['median_ms']
+                    entry['speedup'] = round(before_ms / entry['after']['median_ms'], 2) \
+                        if entry['after']['median_ms'] else None
+                report['queries'].append(entry)
+            conn.commit()
+        return report
+
+
+def print_summary(report: Dict[str, Any]):
+    """レポートの要約を表示"""
+    print(f"\nDatabase: {report['database']}")
+    for entry in report['queries']:
+        issues = ", ".join(sorted({describe_issue(issue) for issue in entry['before']['issues']})) or "-"
+        line = f"  {entry['name']:<32} {entry['before']['median_ms']:>10.3f} ms  issues: {issues}"
+        if 'after' in entry:
+            line += f"  → {entry['after']['median_ms']:.3f} ms (x{entry['speedup']})"
+        print(line)
+    if report['proposals']:
+        print("\nProposed indexes:")
+        for proposal in report['proposals']:
+            print(f"  {proposal['ddl']}  -- {', '.join(proposal['queries'])}")
+    else:
+        print("\nNo index proposals.")
+    if report.get('unaddressed_issues'):
+        print("\nIssues without an index proposal:")
+        for item in report['unaddressed_issues']:
+            print(f"  {item['query']}: {item['issue']}")
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="頻出クエリの実行計画を調べてインデックスを提案")
+    parser.add_argument("--apply", action="store_true", help="提案したインデックスを作成して前後の実行時間を比較")
+    parser.add_argument("--keep", action="store_true", help="--apply で作成したインデックスを残す")
+    parser.add_argument("--runs", type=int, default=5, help="実行時間の計測回数")
+    parser.add_argument("--output", help="レポート（JSON）の出力先")
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_host = os.getenv('DB_HOST', 'localhost')
+    db_port = os.getenv('DB_PORT', '3306')
+    db_name = os.getenv('DB_NAME', 'aws_quiz')
+    db_user = os.getenv('DB_USER', 'root')
+    db_password = os.getenv('DB_PASSWORD', 'password')
+    connection_string = f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+    print(f"Connecting to database: {db_name} at {db_host}:{db_port}")
+    report = QueryAdvisor(connection_string, runs=args.runs).run(apply=args.apply, keep=args.keep)
+    print_summary(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        print(f"\nReport exported to JSON: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import copy
+import json
+import os
+
+import pytest
+
+from diff import MigrationPlanner, column_change_risk, diff_schemas, generate_migration_sql
+
+SCHEMA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_snapshot(name):
+    with open(os.path.join(SCHEMA_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def base_snapshot():
+    return load_snapshot("database_schema_20250702_095211.json")
+
+
+@pytest.fixture(scope="module")
+def question_count_snapshot():
+    return load_snapshot("database_schema_20261017_101204.json")
+
+
+@pytest.fixture(scope="module")
+def stats_snapshot():
+    return load_snapshot("database_schema_20261017_114027.json")
+
+
+@pytest.fixture
+def schema(question_count_snapshot):
+    return copy.deepcopy(question_count_snapshot)
+
+
+def plan(before, after, **kwargs):
+    diff = diff_schemas(before, after)
+    return diff, MigrationPlanner(before, after, **kwargs).plan(diff)
+
+
+def column(schema, table_name, column_name):
+    return next(c for c in schema["tables"][table_name]["columns"] if c["name"] == column_name)
+
+
+def modified(schema, table_name, column_name, **changes):
+    after = copy.deepcopy(schema)
+    column(after, table_name, column_name).update(changes)
+    return after
+
+
+# ---- スナップショット同士の差分 ----
+
+def test_snapshot_column_addition(base_snapshot, question_count_snapshot):
+    diff, steps = plan(base_snapshot, question_count_snapshot)
+
+    assert (diff["tables_added"], diff["tables_removed"]) == ([], [])
+    assert list(diff["tables_changed"]) == ["exam_categories"]
+    assert [c["name"] for c in diff["tables_changed"]["exam_categories"]["columns"]["added"]] == ["question_count"]
+    [step] = steps
+    assert step["sql"] == ("ALTER TABLE `exam_categories`\n  ADD COLUMN `question_count` INTEGER NOT NULL DEFAULT '0' "
+                           "COMMENT '論理削除されていない問題数' AFTER `category_id`;")
+    # 末尾への追加はINSTANTのため、サイズ不明でも警告しない
+    assert (step["risk"], step["destructive"], step["flagged"]) == ("none", False, False)
+
+
+def test_snapshot_column_removal_is_destructive(base_snapshot, question_count_snapshot):
+    _, [step] = plan(question_count_snapshot, base_snapshot)
+
+    assert step["sql"] == "ALTER TABLE `exam_categories`\n  DROP COLUMN `question_count`;"
+    assert (step["risk"], step["destructive"], step["flagged"]) == ("rebuild", True, True)
+
+
+def test_snapshot_table_creation_matches_migration(question_count_snapshot, stats_snapshot):
+    diff, steps = plan(question_count_snapshot, stats_snapshot)
+
+    assert diff["tables_added"] == ["stats_exam_category", "stats_pending_attempts", "stats_question",
+                                    "stats_user_exam", "stats_user_question_latest", "stats_watermarks"]
+    assert diff["tables_changed"] == {}
+    # テーブルをすべて作成してからインデックスを作成する
+    assert [step["sql"].split(" `")[0] for step in steps] == ["CREATE TABLE"] * 6 + ["CREATE INDEX"]
+    assert {step["risk"] for step in steps} == {"none"}
+    assert not any(step["flagged"] or step["destructive"] for step in steps)
+
+    with open(os.path.join(SCHEMA_DIR, "migrations", "002_stats_rollups.sql"), encoding="utf-8") as f:
+        migration = f.read()
+    generated = generate_migration_sql(steps, diff)
+    assert [line for line in migration.splitlines() if not line.startswith("--")] == \
+        [line for line in generated.splitlines() if not line.startswith("--")]
+
+
+def test_identical_schemas_have_no_steps(schema):
+    diff, steps = plan(schema, copy.deepcopy(schema))
+
+    assert diff["tables_changed"] == {}
+    assert steps == []
+
+
+# ---- カラムの変更 ----
+
+def test_column_added_in_the_middle_rebuilds(schema):
+    after = copy.deepcopy(schema)
+    after["tables"]["questions"]["columns"].insert(2, dict(column(schema, "questions", "body"), name="title",
+                                                          nullable=True))
+
+    _, [step] = plan(schema, after)
+
+    assert step["sql"].endswith("AFTER `body`;")
+    assert step["risk"] == "rebuild"
+
+
+@pytest.mark.parametrize("old_type, new_type, risk", [
+    # utf8mb4で255バイト以下のまま（63文字まで）・256バイト超のままの拡張はインプレース
+    ('VARCHAR(20) COLLATE "utf8mb4_0900_ai_ci"', 'VARCHAR(60) COLLATE "utf8mb4_0900_ai_ci"', "none"),
+    ('VARCHAR(100) COLLATE "utf8mb4_0900_ai_ci"', 'VARCHAR(255) COLLATE "utf8mb4_0900_ai_ci"', "none"),
+    # 長さのバイト数が1バイトから2バイトに変わる
+    ('VARCHAR(20) COLLATE "utf8mb4_0900_ai_ci"', 'VARCHAR(100) COLLATE "utf8mb4_0900_ai_ci"', "lock"),
+    ('VARCHAR(100) COLLATE "utf8mb4_0900_ai_ci"', 'VARCHAR(100) COLLATE "utf8mb4_bin"', "lock"),
+    ("ENUM('user', 'admin')", "ENUM('user', 'admin', 'owner')", "none"),
+    ("ENUM('user', 'admin')", "ENUM('admin', 'user')", "lock"),
+    ("INTEGER", "BIGINT", "lock"),
+])
+def test_column_type_change_risk(old_type, new_type, risk):
+    old = {"name": "c", "type": old_type, "nullable": False, "default": None, "autoincrement": False}
+
+    assert column_change_risk(old, dict(old, type=new_type))[0] == risk
+
+
+def test_column_attribute_change_risk():
+    old = {"name": "c", "type": "INTEGER", "nullable": False, "default": None, "autoincrement": False,
+           "comment": None}
+
+    assert column_change_risk(old, dict(old, default="'0'", comment="件数"))[0] == "none"
+    assert column_change_risk(old, dict(old, nullable=True))[0] == "rebuild"
+    assert column_change_risk(old, dict(old, autoincrement=True))[0] == "rebuild"
+
+
+@pytest.mark.parametrize("table_name, column_name, new_type, destructive", [
+    ("questions", "exam_categories_id", "BIGINT", False),
+    ("question_responses", "id", "INTEGER", True),
+    ("exams", "exam_code", 'VARCHAR(10) COLLATE "utf8mb4_0900_ai_ci"', True),
+    ("users", "role", "ENUM('admin', 'user')", True),
+    ("exams", "description", "JSON", True),
+])
+def test_modify_column_marks_narrowing_as_destructive(schema, table_name, column_name, new_type, destructive):
+    _, [step] = plan(schema, modified(schema, table_name, column_name, type=new_type))
+
+    assert step["sql"].startswith(f"ALTER TABLE `{table_name}`\n  MODIFY COLUMN `{column_name}` ")
+    assert step["risk"] == "lock"
+    assert step["destructive"] is destructive
+
+
+def test_column_changes_are_combined_into_one_alter_with_the_highest_risk(schema):
+    after = modified(schema, "exams", "exam_code", type='VARCHAR(40) COLLATE "utf8mb4_0900_ai_ci"')
+    column(after, "exams", "updated_at")["comment"] = "更新日時"
+    column(after, "exams", "description")["nullable"] = False
+
+    diff, [step] = plan(schema, after)
+
+    assert [c["name"] for c in diff["tables_changed"]["exams"]["columns"]["changed"]] == \
+        ["description", "exam_code", "updated_at"]
+    assert step["sql"].count("MODIFY COLUMN") == 3
+    # VARCHARの拡張（none）とコメントの変更（none）より、NULL制約の変更（rebuild）が優先される
+    assert step["risk"] == "rebuild"
+    assert "NULL制約の変更" in step["reason"]
+
+
+# ---- インデックス・外部キー・主キー ----
+
+def test_index_changes(schema):
+    after = copy.deepcopy(schema)
+    tables = after["tables"]
+    tables["questions"]["indexes"].append(
+        {"name": "ix_questions_exam_categories_id_id", "column_names": ["exam_categories_id", "id"], "unique": False})
+    tables["categories"]["indexes"][0]["column_names"] = ["category_name", "id"]
+    tables["users"]["indexes"] = []
+
+    diff, steps = plan(schema, after)
+
+    assert [index["name"] for index in diff["tables_changed"]["questions"]["indexes"]["added"]] == \
+        ["ix_questions_exam_categories_id_id"]
+    assert diff["tables_changed"]["categories"]["indexes"]["changed"][0]["fields"] == ["column_names"]
+    # 削除（変更前の定義を含む）を先に、作成（変更後の定義を含む）を後に実行する
+    assert [(step["sql"], step["risk"]) for step in steps] == [
+        ("DROP INDEX `category_name` ON `categories`;", "none"),
+        ("DROP INDEX `subject_id` ON `users`;", "none"),
+        ("CREATE UNIQUE INDEX `category_name` ON `categories` (`category_name`, `id`);", "online"),
+        ("CREATE INDEX `ix_questions_exam_categories_id_id` ON `questions` (`exam_categories_id`, `id`);",
+         "online"),
+    ]
+
+
+def test_foreign_key_replacement_runs_in_phase_order(schema):
+    after = copy.deepcopy(schema)
+    fk = after["tables"]["questions"]["foreign_keys"][0]
+    fk["options"] = {"ondelete": "CASCADE"}
+
+    _, steps = plan(schema, after)
+
+    assert [step["sql"] for step in steps] == [
+        "ALTER TABLE `questions` DROP FOREIGN KEY `FK_questions_exam_categories`;",
+        "ALTER TABLE `questions` ADD CONSTRAINT `FK_questions_exam_categories` FOREIGN KEY (`exam_categories_id`) "
+        "REFERENCES `exam_categories` (`id`) ON DELETE CASCADE;",
+    ]
+    assert [step["risk"] for step in steps] == ["none", "lock"]
+
+
+def test_primary_key_change(schema):
+    after = copy.deepcopy(schema)
+    after["tables"]["exam_categories"]["primary_keys"] = ["exam_id", "category_id"]
+
+    diff, [step] = plan(schema, after)
+
+    assert diff["tables_changed"]["exam_categories"]["primary_keys"] == \
+        {"from": ["id"], "to": ["exam_id", "category_id"]}
+    assert step["sql"] == "ALTER TABLE `exam_categories`\n  DROP PRIMARY KEY,\n  ADD PRIMARY KEY (`exam_id`, `category_id`);"
+    assert step["risk"] == "rebuild"
+
+
+def test_dropped_table_is_destructive_and_runs_last(schema):
+    after = copy.deepcopy(schema)
+    del after["tables"]["users"]
+    after["tables"]["questions"]["indexes"].append(
+        {"name": "ix_questions_updated_at", "column_names": ["updated_at"], "unique": False})
+
+    diff, steps = plan(schema, after)
+
+    assert diff["tables_removed"] == ["users"]
+    assert steps[-1]["sql"] == "DROP TABLE `users`;"
+    assert steps[-1]["destructive"]
+    assert "WARNING: データが失われる可能性があります\nDROP TABLE `users`;" in generate_migration_sql(steps, diff)
+
+
+# ---- テーブルサイズによる警告 ----
+
+def test_flags_depend_on_table_size(schema):
+    before = dict(schema, table_sizes={"questions": {"rows": 5_000_000, "bytes": 0},
+                                       "exams": {"rows": 10, "bytes": 0}})
+    after = modified(schema, "exams", "description", nullable=False)
+    after["tables"]["questions"]["indexes"].append(
+        {"name": "ix_questions_updated_at", "column_names": ["updated_at"], "unique": False})
+
+    diff, steps = plan(before, after, large_table_rows=1_000_000)
+    by_table = {step["table"]: step for step in steps}
+
+    # 小さなテーブルの再構築は警告せず、大きなテーブルはオンラインのインデックス作成でも警告する
+    assert (by_table["exams"]["risk"], by_table["exams"]["large_table"], by_table["exams"]["flagged"]) == \
+        ("rebuild", False, False)
+    assert (by_table["questions"]["risk"], by_table["questions"]["estimated_rows"], by_table["questions"]["flagged"]) \
+        == ("online", 5_000_000, True)
+    assert "推定 5000000 行" in generate_migration_sql(steps, diff)
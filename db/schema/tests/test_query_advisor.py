@@ -0,0 +1,279 @@
+import pytest
+
+import query_advisor
+from query_advisor import QueryAdvisor, describe_issue, find_plan_issues, index_columns, index_name, parse_analyze_time
+
+
+# ---- find_plan_issues ----
+
+def test_find_plan_issues_detects_scans_filesort_and_temporary_table():
+    # EXPLAIN FORMAT=JSON の query_block 以下（ORDER BY・GROUP BY・JOIN を含む形）
+    plan = {
+        "select_id": 1,
+        "ordering_operation": {
+            "using_filesort": True,
+            "grouping_operation": {
+                "using_temporary_table": True,
+                "nested_loop": [
+                    {"table": {"table_name": "ec", "access_type": "ALL", "rows_examined_per_scan": 5000}},
+                    {"table": {"table_name": "q", "access_type": "index", "key": "FK_questions_exam_categories",
+                               "rows_examined_per_scan": 120000}},
+                    {"table": {"table_name": "c", "access_type": "eq_ref", "rows_examined_per_scan": 1}},
+                ],
+            },
+        },
+    }
+
+    issues = find_plan_issues(plan)
+
+    assert issues == [
+        {"type": "filesort", "tables": ["ec", "q", "c"]},
+        {"type": "temporary_table", "tables": ["ec", "q", "c"]},
+        {"type": "full_scan", "table": "ec", "rows": 5000},
+        {"type": "full_index_scan", "table": "q", "key": "FK_questions_exam_categories", "rows": 120000},
+    ]
+
+
+def test_find_plan_issues_ignores_small_full_scans(monkeypatch):
+    monkeypatch.setattr(query_advisor, "FULL_SCAN_MIN_ROWS", 1000)
+    plan = {"table": {"table_name": "categories", "access_type": "ALL", "rows_examined_per_scan": 12}}
+
+    assert find_plan_issues(plan) == []
+
+
+def test_find_plan_issues_handles_missing_rows_and_subqueries():
+    plan = {
+        "table": {"table_name": "exam_attempts", "access_type": "const", "rows_examined_per_scan": None},
+        "attached_subqueries": [
+            {"query_block": {"table": {"table_name": "question_responses", "access_type": "ALL",
+                                       "rows_examined_per_scan": "2500"}}},
+        ],
+    }
+
+    assert find_plan_issues(plan) == [{"type": "full_scan", "table": "question_responses", "rows": 2500}]
+
+
+def test_find_plan_issues_detects_weakly_filtered_index_access():
+    plan = {"nested_loop": [
+        {"table": {"table_name": "q", "access_type": "ref", "key": "FK_questions_exam_categories",
+                   "rows_examined_per_scan": 8000, "filtered": "10.00"}},
+        # 絞り込みの割合が高いアクセスは問題にしない
+        {"table": {"table_name": "qr", "access_type": "ref", "key": "FK_question_responses_exam_attempts",
+                   "rows_examined_per_scan": 8000, "filtered": "100.00"}},
+    ]}
+
+    issues = find_plan_issues(plan)
+
+    assert issues == [{"type": "filtered_scan", "table": "q", "key": "FK_questions_exam_categories",
+                       "rows": 8000, "filtered": 10.0}]
+    assert describe_issue(issues[0]) == "filtered_scan(q) key=FK_questions_exam_categories rows=8000 filtered=10%"
+
+
+def test_filesort_tables_are_limited_to_its_subtree():
+    plan = {"nested_loop": [
+        {"table": {"table_name": "ea", "access_type": "const"}},
+        {"table": {"table_name": "latest", "access_type": "ALL",
+                   "materialized_from_subquery": {"query_block": {"ordering_operation": {
+                       "using_filesort": True,
+                       "table": {"table_name": "question_responses", "access_type": "ref"}}}}}},
+    ]}
+
+    assert find_plan_issues(plan) == [{"type": "filesort", "tables": ["question_responses"]}]
+
+
+# ---- parse_analyze_time ----
+
+ANALYZE_OUTPUT = """-> Sort: qr.answered_at  (actual time=3.105..3.412 rows=40 loops=1)
+    -> Nested loop inner join  (cost=52.1 rows=40) (actual time=0.410..2.998 rows=40 loops=1)
+        -> Index lookup on qr using idx (attempt_id=1)  (actual time=0.101..0.250 rows=40 loops=1)
+"""
+
+
+def test_parse_analyze_time_uses_top_node():
+    assert parse_analyze_time(ANALYZE_OUTPUT) == pytest.approx(3.412)
+
+
+def test_parse_analyze_time_multiplies_loops():
+    output = "-> Index lookup on q using PRIMARY (id=ea.id)  (actual time=0.020..0.025 rows=1 loops=8)"
+
+    assert parse_analyze_time(output) == pytest.approx(0.2)
+
+
+@pytest.mark.parametrize("output", ["", "-> Table scan on c  (cost=0.35 rows=1)", "-> Limit: 10 row(s)  (never executed)"])
+def test_parse_analyze_time_without_timing(output):
+    assert parse_analyze_time(output) is None
+
+
+# ---- propose ----
+
+def make_advisor(queries):
+    # propose は接続しないため、エンジンは作成するだけのSQLiteでよい
+    return QueryAdvisor("sqlite://", queries=queries)
+
+
+QUERIES = [
+    {"name": "a", "source": "test", "access": [
+        {"table": "questions", "aliases": ["q"], "equality": ["exam_categories_id", "deleted_at"], "reason": "count"},
+        {"table": "exam_categories", "aliases": ["ec"], "equality": ["exam_id"], "range": ["category_id"],
+         "reason": "filter"},
+    ]},
+    {"name": "b", "source": "test", "access": [
+        {"table": "questions", "equality": ["exam_categories_id", "deleted_at"], "reason": "join"},
+    ]},
+    {"name": "c", "source": "test"},
+]
+
+FULL_SCAN_Q = {"type": "full_scan", "table": "q", "rows": 5000}
+SORT_ALL = {"type": "filesort", "tables": ["q", "ec"]}
+
+
+def test_index_columns_orders_equality_sort_range():
+    access = {"equality": ["attempt_id"], "order": ["question_id", "answered_at"], "range": ["answered_at", "x"]}
+
+    assert index_columns(access) == ["attempt_id", "question_id", "answered_at", "x"]
+
+
+def test_propose_only_for_tables_with_issues():
+    advisor = make_advisor(QUERIES)
+
+    assert advisor.propose({}, {}) == []
+    proposals = advisor.propose({}, {"a": [FULL_SCAN_Q]})
+
+    # 問題の無い exam_categories は提案しない
+    assert [(p["table"], p["columns"]) for p in proposals] == [("questions", ["exam_categories_id", "deleted_at"])]
+    assert proposals[0]["reasons"] == ["a: full_scan(q) rows=5000 - count"]
+
+
+def test_propose_merges_candidates_shared_by_queries():
+    issues = {"a": [SORT_ALL], "b": [{"type": "full_index_scan", "table": "questions", "key": "PRIMARY", "rows": 9000}]}
+
+    proposals = make_advisor(QUERIES).propose({"questions": [["id"], ["exam_categories_id"]]}, issues)
+
+    assert [(p["table"], p["columns"]) for p in proposals] == [
+        ("questions", ["exam_categories_id", "deleted_at"]),
+        ("exam_categories", ["exam_id", "category_id"]),
+    ]
+    questions = proposals[0]
+    assert questions["name"] == "idx_questions_exam_categories_id_deleted_at"
+    assert questions["ddl"] == ("CREATE INDEX `idx_questions_exam_categories_id_deleted_at` ON `questions` "
+                                "(`exam_categories_id`, `deleted_at`) ALGORITHM=INPLACE LOCK=NONE;")
+    assert questions["reasons"] == ["a: filesort(q, ec) - count",
+                                    "b: full_index_scan(questions) key=PRIMARY rows=9000 - join"]
+    assert questions["queries"] == ["a", "b"]
+
+
+def test_propose_skips_candidates_covered_by_existing_index_prefix():
+    existing = {
+        "questions": [["exam_categories_id", "deleted_at", "id"]],
+        "exam_categories": [["category_id", "exam_id"]],
+    }
+
+    proposals = make_advisor(QUERIES).propose(existing, {"a": [SORT_ALL]})
+
+    # カラムの順序が違うインデックスでは満たされない
+    assert [(p["table"], p["columns"]) for p in proposals] == [("exam_categories", ["exam_id", "category_id"])]
+
+
+def test_unaddressed_issues_lists_tables_without_access_patterns():
+    issues = {"a": [FULL_SCAN_Q, {"type": "full_scan", "table": "c", "rows": 2000}],
+              "c": [{"type": "temporary_table", "tables": ["exam_attempts"]}]}
+
+    assert make_advisor(QUERIES).unaddressed_issues(issues) == [
+        {"query": "a", "issue": "full_scan(c) rows=2000"},
+        {"query": "c", "issue": "temporary_table(exam_attempts)"},
+    ]
+
+
+def test_index_name_fits_mysql_identifier_limit():
+    name = index_name("question_responses", ["attempt_id", "question_id", "answered_at", "is_correct", "feedback"])
+
+    assert len(name) == 64
+    assert name.startswith("idx_question_responses_attempt_id_")
+
+
+# ---- run（--apply）のインデックスの後始末 ----
+
+class FakeResult:
+    def scalar(self):
+        return "aws_quiz"
+
+
+class FakeConnection:
+    """実行したSQLを記録し、fail_on を含む文で失敗する接続"""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError(f"failed: {sql}")
+        self.executed.append(sql)
+        return FakeResult()
+
+    def commit(self):
+        pass
+
+
+@pytest.fixture
+def advisor(monkeypatch):
+    advisor = make_advisor(QUERIES[:1])
+    monkeypatch.setattr(query_advisor.ParameterSampler, "sample", lambda self: {})
+    monkeypatch.setattr(advisor, "measure", lambda conn, query, samples: {"issues": [SORT_ALL], "median_ms": 1.0})
+    monkeypatch.setattr(advisor, "existing_indexes", lambda conn: {})
+    return advisor
+
+
+def dropped(connection):
+    return [sql for sql in connection.executed if sql.startswith("DROP INDEX")]
+
+
+def test_run_drops_created_indexes_when_creation_fails(advisor, monkeypatch):
+    connection = FakeConnection(fail_on="CREATE INDEX `idx_exam_categories_exam_id_category_id`")
+    monkeypatch.setattr(advisor.engine, "connect", lambda: connection)
+
+    with pytest.raises(RuntimeError):
+        advisor.run(apply=True)
+
+    # 作成できたインデックスだけを削除する
+    assert dropped(connection) == ["DROP INDEX `idx_questions_exam_categories_id_deleted_at` ON `questions`"]
+
+
+def test_run_drops_indexes_after_comparison(advisor, monkeypatch):
+    connection = FakeConnection()
+    monkeypatch.setattr(advisor.engine, "connect", lambda: connection)
+
+    report = advisor.run(apply=True)
+
+    assert report["queries"][0]["speedup"] == 1.0
+    assert dropped(connection) == [
+        "DROP INDEX `idx_exam_categories_exam_id_category_id` ON `exam_categories`",
+        "DROP INDEX `idx_questions_exam_categories_id_deleted_at` ON `questions`",
+    ]
+
+
+def test_run_keeps_indexes_with_keep(advisor, monkeypatch):
+    connection = FakeConnection()
+    monkeypatch.setattr(advisor.engine, "connect", lambda: connection)
+
+    advisor.run(apply=True, keep=True)
+
+    assert dropped(connection) == []
+
+
+def test_run_without_plan_issues_creates_no_indexes(advisor, monkeypatch):
+    connection = FakeConnection()
+    monkeypatch.setattr(advisor.engine, "connect", lambda: connection)
+    monkeypatch.setattr(advisor, "measure", lambda conn, query, samples: {"issues": [], "median_ms": 1.0})
+
+    report = advisor.run(apply=True)
+
+    assert report["proposals"] == []
+    assert not any(sql.startswith("CREATE INDEX") for sql in connection.executed)
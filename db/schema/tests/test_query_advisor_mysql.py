@@ -0,0 +1,119 @@
+"""
+query_advisor.py をMySQL（db/docker-compose.yml のローカルMySQL）に対して実行する結合テスト
+
+テーブルを作成・削除するため、空のテスト用データベースを QUERY_ADVISOR_TEST_DATABASE_URL で指定した場合のみ実行します。
+    docker compose -f db/docker-compose.yml up -d
+    docker exec mysql-local mysql -uroot -p<MYSQL_ROOT_PASSWORD> -e "CREATE DATABASE advisor_test"
+    QUERY_ADVISOR_TEST_DATABASE_URL="mysql+pymysql://root:<MYSQL_ROOT_PASSWORD>@127.0.0.1:3306/advisor_test" \
+        python -m pytest db/schema/tests
+"""
+
+import glob
+import os
+import re
+
+import pytest
+
+from query_advisor import QueryAdvisor
+
+DATABASE_URL = os.getenv("QUERY_ADVISOR_TEST_DATABASE_URL")
+# 最新のスキーマスナップショット（ファイル名のタイムスタンプ順）
+SCHEMA_SQL = sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                           "database_schema_*.sql")))[-1]
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="QUERY_ADVISOR_TEST_DATABASE_URL is not set")
+
+
+def schema_statements():
+    """スナップショットのDDLからテーブル・インデックスの作成文を取り出す（データベースの作成・切り替えは除く）"""
+    with open(SCHEMA_SQL, encoding="utf-8") as f:
+        content = re.sub(r"^--.*$", "", f.read(), flags=re.MULTILINE)
+    return [
+        statement.strip() for statement in content.split(";")
+        if statement.strip() and not statement.strip().startswith(("CREATE DATABASE", "USE "))
+    ]
+
+
+@pytest.fixture(autouse=True)
+def detect_small_scans(monkeypatch):
+    # テストデータは小さいため、行数に関係なくフルスキャン・絞り込みの弱いアクセスを問題として扱う
+    import query_advisor
+    monkeypatch.setattr(query_advisor, "FULL_SCAN_MIN_ROWS", 0)
+    monkeypatch.setattr(query_advisor, "FILTERED_SCAN_MAX_PCT", 100)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.exc import OperationalError
+
+    engine = create_engine(DATABASE_URL, connect_args={"connect_timeout": 3})
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except OperationalError as e:
+        pytest.skip(f"MySQL is not available: {e}")
+
+    with engine.begin() as conn:
+        if conn.execute(text("SHOW TABLES")).fetchall():
+            pytest.skip("QUERY_ADVISOR_TEST_DATABASE_URL must point to an empty database")
+        for statement in schema_statements():
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO users (id, provider, subject_id, name) VALUES (1, 'google', 's1', 'tester')"))
+        conn.execute(text("INSERT INTO exams (id, exam_name, exam_code) VALUES (1, 'SAA', 'SAA-C03')"))
+        conn.execute(text("INSERT INTO categories (id, category_name) VALUES (1, 'compute'), (2, 'storage')"))
+        conn.execute(text("INSERT INTO exam_categories (id, exam_id, category_id) VALUES (1, 1, 1), (2, 1, 2)"))
+        for qid in range(1, 41):
+            conn.execute(text(
+                "INSERT INTO questions (id, body, explanation, choices, correct_key, exam_categories_id) "
+                "VALUES (:id, 'body', 'explanation', '[]', '[1]', :exam_categories_id)"
+            ), {"id": qid, "exam_categories_id": qid % 2 + 1})
+        conn.execute(text(
+            "INSERT INTO exam_attempts (id, user_id, exam_id, finished_at, question_ids) "
+            "VALUES (1, 1, 1, NOW(), '[1, 2, 3]')"
+        ))
+        for qid in (1, 2, 3):
+            conn.execute(text(
+                "INSERT INTO question_responses (attempt_id, question_id, answer_ids, is_correct) "
+                "VALUES (1, :question_id, '[1]', 1)"
+            ), {"question_id": qid})
+    yield engine
+
+    with engine.begin() as conn:
+        conn.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
+        for (table,) in conn.execute(text("SHOW TABLES")).fetchall():
+            conn.execute(text(f"DROP TABLE `{table}`"))
+        conn.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
+    engine.dispose()
+
+
+def index_names(engine):
+    from sqlalchemy import text
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text(
+            "SELECT DISTINCT INDEX_NAME FROM INFORMATION_SCHEMA.STATISTICS WHERE TABLE_SCHEMA = DATABASE()"))}
+
+
+def test_apply_measures_before_and_after_and_drops_indexes(engine):
+    before = index_names(engine)
+
+    report = QueryAdvisor(DATABASE_URL, runs=1).run(apply=True)
+
+    assert report["proposals"]
+    assert all("before" in entry and "after" in entry for entry in report["queries"])
+    assert all(entry["after"]["median_ms"] >= 0 for entry in report["queries"])
+    assert index_names(engine) == before
+
+
+def test_keep_leaves_proposed_indexes(engine):
+    from sqlalchemy import text
+
+    report = QueryAdvisor(DATABASE_URL, runs=1).run(apply=True, keep=True)
+    try:
+        assert {proposal["name"] for proposal in report["proposals"]} <= index_names(engine)
+        # 作成したインデックスは既存として扱われ、再提案されない
+        assert QueryAdvisor(DATABASE_URL, runs=1).run()["proposals"] == []
+    finally:
+        with engine.begin() as conn:
+            for proposal in report["proposals"]:
+                conn.execute(text(f"DROP INDEX `{proposal['name']}` ON `{proposal['table']}`"))
@@ -0,0 +1,92 @@
+"""
+main.py の2つのスキーマ取得方式（INFORMATION_SCHEMA と SQLAlchemy Inspector）の結果を比較する結合テスト
+
+テーブルを作成・削除するため、空のテスト用データベースを SCHEMA_EXPORT_TEST_DATABASE_URL で指定した場合のみ実行します。
+    docker compose -f db/docker-compose.yml up -d
+    docker exec mysql-local mysql -uroot -p<MYSQL_ROOT_PASSWORD> -e "CREATE DATABASE schema_export_test"
+    SCHEMA_EXPORT_TEST_DATABASE_URL="mysql+pymysql://root:<MYSQL_ROOT_PASSWORD>@127.0.0.1:3306/schema_export_test" \
+        python -m pytest db/schema/tests
+"""
+
+import glob
+import os
+import re
+
+import pytest
+
+from main import DatabaseSchemaExporter
+
+DATABASE_URL = os.getenv("SCHEMA_EXPORT_TEST_DATABASE_URL")
+# 最新のスキーマスナップショット（ファイル名のタイムスタンプ順）
+SCHEMA_SQL = sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                           "database_schema_*.sql")))[-1]
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="SCHEMA_EXPORT_TEST_DATABASE_URL is not set")
+
+
+def schema_statements():
+    """スナップショットのDDLからテーブル・インデックスの作成文を取り出す（データベースの作成・切り替えは除く）"""
+    with open(SCHEMA_SQL, encoding="utf-8") as f:
+        content = re.sub(r"^--.*$", "", f.read(), flags=re.MULTILINE)
+    return [
+        statement.strip() for statement in content.split(";")
+        if statement.strip() and not statement.strip().startswith(("CREATE DATABASE", "USE "))
+    ]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.exc import OperationalError
+
+    engine = create_engine(DATABASE_URL, connect_args={"connect_timeout": 3})
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except OperationalError as e:
+        pytest.skip(f"MySQL is not available: {e}")
+
+    with engine.begin() as conn:
+        if conn.execute(text("SHOW TABLES")).fetchall():
+            pytest.skip("SCHEMA_EXPORT_TEST_DATABASE_URL must point to an empty database")
+        for statement in schema_statements():
+            conn.execute(text(statement))
+        # スナップショットにない形（複合外部キー・ON DELETE・CHECK制約・複合ユニークインデックス）も比較する
+        conn.execute(text(
+            "CREATE TABLE parity_parent (a INTEGER NOT NULL, b INTEGER NOT NULL, PRIMARY KEY (a, b))"))
+        conn.execute(text(
+            "CREATE TABLE parity_child ("
+            "  id BIGINT NOT NULL AUTO_INCREMENT,"
+            "  a INTEGER NOT NULL,"
+            "  b INTEGER NOT NULL,"
+            "  score SMALLINT NULL DEFAULT 0 COMMENT 'score',"
+            "  PRIMARY KEY (id),"
+            "  UNIQUE KEY ux_parity_child_a_b (a, b),"
+            "  CONSTRAINT ck_parity_child_score CHECK (score >= 0),"
+            "  CONSTRAINT fk_parity_child_parent FOREIGN KEY (a, b) REFERENCES parity_parent (a, b) ON DELETE CASCADE"
+            ")"))
+    yield engine
+
+    with engine.begin() as conn:
+        conn.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
+        for (table,) in conn.execute(text("SHOW TABLES")).fetchall():
+            conn.execute(text(f"DROP TABLE `{table}`"))
+        conn.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
+    engine.dispose()
+
+
+def comparable(table_info):
+    """取得方式で順序が決まらない要素（インデックス・外部キー・制約）を名前順にそろえる"""
+    return dict(table_info, **{key: sorted(table_info[key], key=lambda item: item["name"])
+                               for key in ("indexes", "foreign_keys", "constraints")})
+
+
+def test_information_schema_matches_inspector(engine):
+    fast = DatabaseSchemaExporter(DATABASE_URL).get_all_tables_schema()
+    reflected = DatabaseSchemaExporter(DATABASE_URL, reflection_mode="inspector").get_all_tables_schema()
+
+    assert fast["database_name"] == reflected["database_name"]
+    assert sorted(fast["tables"]) == sorted(reflected["tables"])
+    for table_name in fast["tables"]:
+        assert comparable(fast["tables"][table_name]) == comparable(reflected["tables"][table_name]), table_name
+
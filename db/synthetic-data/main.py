@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+負荷・スケールテスト用の合成データ生成スクリプト
+
+db/schema のスナップショットにある全テーブル（users, exams, categories, exam_categories,
+questions, exam_attempts, question_responses）に、本番に近い偏りを持つデータを投入します。
+- 一部の試験に受験が集中する（試験の人気はZipf分布）
+- 試験内の問題の出題頻度もZipf分布（よく出る問題に回答が集中する）
+- ユーザーの受験回数もZipf分布
+
+同じシード・スケールなら常に同じデータを生成します。
+CSVをチャンクごとに書き出して LOAD DATA LOCAL INFILE で読み込むか（既定）、複数行INSERTで投入します。
+SCALE_FACTOR=1 で question_responses は約1,000万行です。
+
+使い方（.env の DB_* に db/docker-compose.yml のローカルMySQLなどを指定）:
+    python main.py --truncate                    # 既存データを削除してから投入
+    python main.py --scale 0.1 --seed 42         # 1/10の規模で投入
+    python main.py --method insert               # LOAD DATA LOCAL INFILE が使えない環境向け
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, Any, Iterator, List, Tuple
+import pymysql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# データベース接続設定
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = int(os.getenv("DB_PORT", "3306"))
+DB_NAME = os.getenv("DB_NAME", "aws_quiz")
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "password")
+
+# 生成設定
+SCALE_FACTOR = float(os.getenv("SCALE_FACTOR", "1"))
+SEED = int(os.getenv("SEED", "42"))
+# infile: LOAD DATA LOCAL INFILE / insert: 複数行INSERT
+LOAD_METHOD = os.getenv("LOAD_METHOD", "infile")
+# 1回のLOAD DATA / INSERTのコミット単位の行数
+CHUNK_ROWS = int(os.getenv("CHUNK_ROWS", "200000"))
+
+# SCALE_FACTOR=1 のときの件数
+BASE_USERS = 50_000
+BASE_QUESTIONS = 30_000
+BASE_ATTEMPTS = 500_000
+NUM_EXAMS = 20
+NUM_CATEGORIES = 120
+
+# 偏りの強さ（Zipf分布の指数）
+EXAM_SKEW = 1.3
+QUESTION_SKEW = 0.9
+USER_SKEW = 1.1
+
+# 1回の受験の問題数と、その出現比率（平均20問）
+ATTEMPT_SIZES = [10, 20, 30, 65]
+ATTEMPT_SIZE_WEIGHTS = [35, 40, 20, 5]
+
+# 完了した受験の割合・論理削除された問題の割合
+FINISHED_RATIO = 0.9
+DELETED_QUESTION_RATIO = 0.02
+
+# データの基準日時（受験は基準日から180日間に分布）
+BASE_TIME = datetime(2025, 1, 1)
+ATTEMPT_PERIOD_SECONDS = 180 * 24 * 3600
+
+LEVELS = ['Foundational', 'Associate', 'Professional', 'Specialty']
+WORDS = ("Amazon S3 EC2 VPC Lambda DynamoDB RDS Aurora CloudFront IAM KMS SQS SNS Kinesis Route53 "
+         "スケーラビリティ 可用性 耐久性 コスト 最適化 セキュリティ 暗号化 レプリケーション バックアップ "
+         "リージョン アベイラビリティゾーン ロードバランサー オートスケーリング キャッシュ 監視 ログ").split()
+
+
+class ZipfSampler:
+    """順位 r の重みを 1 / r^s とする離散Zipf分布からの抽出（累積重みを事前計算して二分探索）"""
+
+    def __init__(self, n: int, s: float):
+        self.n = n
+        self.population = range(n)
+        self.cum_weights = list(accumulate(1.0 / (rank + 1) ** s for rank in range(n)))
+
+    def sample(self, rng: random.Random, k: int = 1) -> List[int]:
+        return rng.choices(self.population, cum_weights=self.cum_weights, k=k)
+
+    def sample_unique(self, rng: random.Random, k: int) -> List[int]:
+        """重複なしでk個抽出（人気の高い要素ほど選ばれやすい）"""
+        k = min(k, self.n)
+        picked = dict.fromkeys(self.sample(rng, k))
+        while len(picked) < k:
+            picked.update(dict.fromkeys(self.sample(rng, k - len(picked))))
+        return list(picked)[:k]
+
+
+def scaled(base: int, scale: float, minimum: int = 1) -> int:
+    return max(minimum, int(base * scale))
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def format_time(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class DatasetPlan:
+    """
+    生成するデータの構成（件数・試験とカテゴリーの対応・問題の割り当て）
+    行データは各テーブルのジェネレーターでストリームとして生成し、ここでは保持しない
+    """
+
+    def __init__(self, scale: float, seed: int):
+        self.scale = scale
+        self.seed = seed
+        self.num_users = scaled(BASE_USERS, scale)
+        self.num_exams = NUM_EXAMS
+        self.num_categories = NUM_CATEGORIES
+        self.num_questions = scaled(BASE_QUESTIONS, scale, minimum=self.num_exams * 10)
+        self.num_attempts = scaled(BASE_ATTEMPTS, scale)
+
+        rng = random.Random(seed)
+        # 試験ごとのカテゴリー（5〜15個）
+        self.exam_categories: List[Tuple[int, int, int]] = []  # (exam_categories_id, exam_id, category_id)
+        for exam_id in range(1, self.num_exams + 1):
+            for category_id in sorted(rng.sample(range(1, self.num_categories + 1), rng.randint(5, 15))):
+                self.exam_categories.append((len(self.exam_categories) + 1, exam_id, category_id))
+
+        # 問題を試験カテゴリーに割り当てる（人気の試験ほど問題が多い）
+        exam_weights = [1.0 / (rank + 1) ** (EXAM_SKEW / 2) for rank in range(self.num_exams)]
+        ec_weights = [exam_weights[exam_id - 1] for _, exam_id, _ in self.exam_categories]
+        assignments = rng.choices(range(len(self.exam_categories)), weights=ec_weights, k=self.num_questions)
+        # 全試験カテゴリーに最低1問
+        assignments[:len(self.exam_categories)] = range(len(self.exam_categories))
+        assignments.sort()
+        self.question_exam_categories = [self.exam_categories[index][0] for index in assignments]
+
+        # 試験ごとの問題id（出題の偏りのため、試験内でシャッフルした順を人気順とする）
+        self.exam_questions: Dict[int, List[int]] = {exam_id: [] for exam_id in range(1, self.num_exams + 1)}
+        exam_of_ec = {ec_id: exam_id for ec_id, exam_id, _ in self.exam_categories}
+        for question_id, ec_id in enumerate(self.question_exam_categories, start=1):
+            self.exam_questions[exam_of_ec[ec_id]].append(question_id)
+        for questions in self.exam_questions.values():
+            rng.shuffle(questions)
+
+        # 問題ごとの選択肢数と正解（回答の answer_ids を正解と一致させるため、問題の生成より先に決める）
+        key_rng = self.rng('question_keys')
+        self.question_choice_counts: List[int] = []
+        self.question_correct_keys: List[List[int]] = []
+        for _ in range(self.num_questions):
+            num_choices = 4 if key_rng.random() < 0.85 else 5
+            self.question_choice_counts.append(num_choices)
+            self.question_correct_keys.append(
+                sorted(key_rng.sample(range(1, num_choices + 1), 1 if key_rng.random() < 0.8 else 2)))
+
+        # 問題ごとの正答率（0.3〜0.95）と論理削除
+        self.question_difficulty = [rng.uniform(0.3, 0.95) for _ in range(self.num_questions)]
+        self.deleted_questions = {question_id for question_id in range(1, self.num_questions + 1)
+                                  if rng.random() < DELETED_QUESTION_RATIO}
+
+    def rng(self, table: str) -> random.Random:
+        # テーブルごとに独立した乱数列（投入方法やチャンクサイズに関係なく同じデータになる）
+        return random.Random(f"{self.seed}:{table}")
+
+
+def generate_categories(plan: DatasetPlan) -> Iterator[tuple]:
+    rng = plan.rng('categories')
+    for category_id in range(1, plan.num_categories + 1):
+        yield (category_id, f"Category {category_id:03d}", sentence(rng, 12), format_time(BASE_TIME))
+
+
+def generate_exams(plan: DatasetPlan) -> Iterator[tuple]:
+    rng = plan.rng('exams')
+    for exam_id in range(1, plan.num_exams + 1):
+        yield (exam_id, f"Synthetic Exam {exam_id:02d}", f"SYN-C{exam_id:02d}", rng.choice(LEVELS),
+               sentence(rng, 20), 1, format_time(BASE_TIME), None)
+
+
+def generate_exam_categories(plan: DatasetPlan) -> Iterator[tuple]:
+    counts: Dict[int, int] = {}
+    for question_id, ec_id in enumerate(plan.question_exam_categories, start=1):
+        if question_id not in plan.deleted_questions:
+            counts[ec_id] = counts.get(ec_id, 0) + 1
+    for ec_id, exam_id, category_id in plan.exam_categories:
+        yield (ec_id, exam_id, category_id, counts.get(ec_id, 0))
+
+
+def generate_users(plan: DatasetPlan) -> Iterator[tuple]:
+    rng = plan.rng('users')
+    for user_id in range(1, plan.num_users + 1):
+        created_at = BASE_TIME - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        yield (user_id, 'google' if rng.random() < 0.8 else 'apple', f"synthetic-{user_id:09d}",
+               f"User {user_id}", 'admin' if user_id == 1 else 'user', None, None,
+               format_time(created_at), format_time(BASE_TIME))
+
+
+def generate_questions(plan: DatasetPlan) -> Iterator[tuple]:
+    rng = plan.rng('questions')
+    for question_id, ec_id in enumerate(plan.question_exam_categories, start=1):
+        num_choices = plan.question_choice_counts[question_id - 1]
+        choices = [{"choice_id": choice_id, "choice_text": sentence(rng, 6)} for choice_id in range(1, num_choices + 1)]
+        correct_key = plan.question_correct_keys[question_id - 1]
+        created_at = BASE_TIME - timedelta(seconds=rng.randrange(90 * 24 * 3600))
+        deleted_at = format_time(created_at + timedelta(days=30)) if question_id in plan.deleted_questions else None
+        yield (question_id, sentence(rng, 40), sentence(rng, 60),
+               json.dumps(choices, ensure_ascii=False), json.dumps(correct_key),
+               ec_id, format_time(created_at), None, deleted_at)
+
+
+def answer_ids(plan: DatasetPlan, question_id: int, is_correct: bool, rng: random.Random) -> List[int]:
+    """回答で選んだ選択肢（正解なら問題の正解、不正解なら正解に含まれない選択肢を1つ）"""
+    correct_key = plan.question_correct_keys[question_id - 1]
+    if is_correct:
+        return correct_key
+    wrong_choices = [choice_id for choice_id in range(1, plan.question_choice_counts[question_id - 1] + 1)
+                     if choice_id not in correct_key]
+    return [rng.choice(wrong_choices)]
+
+
+def generate_attempts_and_responses(plan: DatasetPlan) -> Iterator[Tuple[str, tuple]]:
+    """受験記録と回答を同時に生成（受験ごとに選んだ問題を回答でそのまま使うため）"""
+    rng = plan.rng('exam_attempts')
+    exam_sampler = ZipfSampler(plan.num_exams, EXAM_SKEW)
+    user_sampler = ZipfSampler(plan.num_users, USER_SKEW)
+    # ユーザーの人気順（id順だと小さいidに偏るため並べ替える）
+    user_order = list(range(1, plan.num_users + 1))
+    rng.shuffle(user_order)
+    question_samplers = {exam_id: ZipfSampler(len(questions), QUESTION_SKEW)
+                         for exam_id, questions in plan.exam_questions.items() if questions}
+    exam_ids = sorted(question_samplers)
+
+    # 受験を開始日時の順に並べるため、開始日時を先に生成してソートする
+    start_offsets = sorted(rng.randrange(ATTEMPT_PERIOD_SECONDS) for _ in range(plan.num_attempts))
+    response_id = 0
+    for attempt_id, start_offset in enumerate(start_offsets, start=1):
+        exam_id = exam_ids[exam_sampler.sample(rng)[0] % len(exam_ids)]
+        user_id = user_order[user_sampler.sample(rng)[0]]
+        questions = plan.exam_questions[exam_id]
+        size = rng.choices(ATTEMPT_SIZES, weights=ATTEMPT_SIZE_WEIGHTS)[0]
+        question_ids = [questions[index] for index in question_samplers[exam_id].sample_unique(rng, size)]
+        started_at = BASE_TIME + timedelta(seconds=start_offset)
+        finished = rng.random() < FINISHED_RATIO
+
+        # 未完了の受験は途中までの回答のみ
+        answered = question_ids if finished else question_ids[:rng.randrange(len(question_ids))]
+        correct_count = 0
+        answered_at = started_at
+        for question_id in answered:
+            answered_at += timedelta(seconds=rng.randint(10, 90))
+            is_correct = rng.random() < plan.question_difficulty[question_id - 1]
+            correct_count += is_correct
+            response_id += 1
+            yield 'question_responses', (response_id, attempt_id, question_id,
+                                         json.dumps(answer_ids(plan, question_id, is_correct, rng)), int(is_correct),
+                                         format_time(answered_at), None)
+
+        yield 'exam_attempts', (attempt_id, user_id, exam_id, format_time(started_at),
+                                format_time(answered_at) if finished else None,
+                                len(answered) if finished else None, correct_count if finished else None,
+                                json.dumps(question_ids))
+
+
+# テーブルごとのカラム（投入順）
+TABLE_COLUMNS: Dict[str, List[str]] = {
+    'categories': ['id', 'category_name', 'description', 'created_at'],
+    'exams': ['id', 'exam_name', 'exam_code', 'level', 'description', 'is_active', 'created_at', 'updated_at'],
+    'exam_categories': ['id', 'exam_id', 'category_id', 'question_count'],
+    'users': ['id', 'provider', 'subject_id', 'name', 'role', 'deleted_at', 'updated_at', 'created_at',
+              'last_login_at'],
+    'questions': ['id', 'body', 'explanation', 'choices', 'correct_key', 'exam_categories_id', 'created_at',
+                  'updated_at', 'deleted_at'],
+    'exam_attempts': ['id', 'user_id', 'exam_id', 'started_at', 'finished_at', 'answer_count', 'correct_count',
+                      'question_ids'],
+    'question_responses': ['id', 'attempt_id', 'question_id', 'answer_ids', 'is_correct', 'answered_at',
+                           'feedback'],
+}
+
+
+class TableLoader:
+    """行データをチャンクごとにまとめて投入するクラス（LOAD DATA LOCAL INFILE または複数行INSERT）"""
+
+    def __init__(self, connection, method: str, chunk_rows: int, existing_columns: Dict[str, set]):
+        self.connection = connection
+        self.method = method
+        self.chunk_rows = chunk_rows
+        self.existing_columns = existing_columns
+        self.buffers: Dict[str, List[tuple]] = {}
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _columns(self, table: str) -> Tuple[List[str], List[int]]:
+        # 対象のデータベースに存在するカラムのみ投入する（question_count 追加前のスキーマなど）
+        indexes = [index for index, column in enumerate(TABLE_COLUMNS[table])
+                   if column in self.existing_columns.get(table, ())]
+        return [TABLE_COLUMNS[table][index] for index in indexes], indexes
+
+    def add(self, table: str, row: tuple):
+        buffer = self.buffers.setdefault(table, [])
+        buffer.append(row)
+        if len(buffer) >= self.chunk_rows:
+            self.flush(table)
+
+    def flush(self, table: str = None):
+        tables = [table] if table else list(self.buffers)
+        for name in tables:
+            rows = self.buffers.get(name)
+            if not rows:
+                continue
+            started = time.perf_counter()
+            columns, indexes = self._columns(name)
+            rows = [tuple(row[index] for index in indexes) for row in rows]
+            if self.method == 'infile':
+                self._load_infile(name, columns, rows)
+            else:
+                self._insert(name, columns, rows)
+            self.connection.commit()
+            stats = self.stats.setdefault(name, {'rows': 0, 'seconds': 0.0})
+            stats['rows'] += len(rows)
+            stats['seconds'] += time.perf_counter() - started
+            self.buffers[name] = []
+
+    def _load_infile(self, table: str, columns: List[str], rows: List[tuple]):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', newline='', delete=False) as f:
+            writer = csv.writer(f, lineterminator='\n')
+            # NULLは \N で表す
+            writer.writerows(tuple('\\N' if value is None else value for value in row) for row in rows)
+            path = f.name
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE `{table}` CHARACTER SET utf8mb4 "
+                    f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+                    f"({', '.join(f'`{column}`' for column in columns)})",
+                    (path,)
+                )
+        finally:
+            os.unlink(path)
+
+    def _insert(self, table: str, columns: List[str], rows: List[tuple]):
+        sql = (f"INSERT INTO `{table}` ({', '.join(f'`{column}`' for column in columns)}) "
+               f"VALUES ({', '.join(['%s'] * len(columns))})")
+        with self.connection.cursor() as cursor:
+            # PyMySQLのexecutemanyは INSERT ... VALUES を max_allowed_packet に収まる複数行INSERTにまとめる
+            for start in range(0, len(rows), 5000):
+                cursor.executemany(sql, rows[start:start + 5000])
+
+
+def get_connection(method: str):
+    return pymysql.connect(host=DB_HOST, port=DB_PORT, user=DB_USER, password=DB_PASSWORD, database=DB_NAME,
+                           charset='utf8mb4', autocommit=False, local_infile=(method == 'infile'))
+
+
+def get_existing_columns(connection) -> Dict[str, set]:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT TABLE_NAME, COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA = DATABASE()")
+        columns: Dict[str, set] = {}
+        for table, column in cursor.fetchall():
+            columns.setdefault(table, set()).add(column)
+    missing = [table for table in TABLE_COLUMNS if table not in columns]
+    if missing:
+        raise RuntimeError(f"テーブルが存在しません: {', '.join(missing)}（db/schema のDDLを適用してください）")
+    return columns
+
+
+def prepare_database(connection, truncate: bool):
+    """一括投入用のセッション設定と、既存データの確認・削除"""
+    with connection.cursor() as cursor:
+        # 投入中は外部キー・一意性の確認を省略（生成データは整合している）
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        cursor.execute("SET SESSION unique_checks = 0")
+        for table in TABLE_COLUMNS:
+            if truncate:
+                cursor.execute(f"TRUNCATE TABLE `{table}`")
+            else:
+                cursor.execute(f"SELECT 1 FROM `{table}` LIMIT 1")
+                if cursor.fetchone():
+                    raise RuntimeError(f"{table} にデータがあります。--truncate を指定して削除してから投入してください。")
+    connection.commit()
+
+
+def load_dataset(scale: float, seed: int, method: str, chunk_rows: int, truncate: bool) -> Dict[str, Any]:
+    """
+    合成データを生成して投入する
+
+    Returns:
+        テーブルごとの行数・所要時間
+    """
+    plan = DatasetPlan(scale, seed)
+    connection = get_connection(method)
+    try:
+        existing_columns = get_existing_columns(connection)
+        prepare_database(connection, truncate)
+        loader = TableLoader(connection, method, chunk_rows, existing_columns)
+
+        started = time.perf_counter()
+        for table, generator in [('categories', generate_categories), ('exams', generate_exams),
+                                 ('exam_categories', generate_exam_categories), ('users', generate_users),
+                                 ('questions', generate_questions)]:
+            print(f"Loading {table}...")
+            for row in generator(plan):
+                loader.add(table, row)
+            loader.flush(table)
+
+        print("Loading exam_attempts and question_responses...")
+        for table, row in generate_attempts_and_responses(plan):
+            loader.add(table, row)
+        loader.flush()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE TABLE {', '.join(f'`{table}`' for table in TABLE_COLUMNS)}")
+            cursor.fetchall()
+        elapsed = time.perf_counter() - started
+    finally:
+        connection.close()
+
+    return {
+        'scale': scale,
+        'seed': seed,
+        'method': method,
+        'seconds': round(elapsed, 1),
+        'tables': {
+            table: {'rows': int(stats['rows']), 'seconds': round(stats['seconds'], 1),
+                    'rows_per_second': int(stats['rows'] / stats['seconds']) if stats['seconds'] else None}
+            for table, stats in loader.stats.items()
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="負荷・スケールテスト用の合成データを投入")
+    parser.add_argument("--scale", type=float, default=SCALE_FACTOR, help="規模（1で回答約1,000万行）")
+    parser.add_argument("--seed", type=int, default=SEED, help="乱数のシード")
+    parser.add_argument("--method", choices=["infile", "insert"], default=LOAD_METHOD, help="投入方法")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="1回の投入・コミットの行数")
+    parser.add_argument("--truncate", action="store_true", help="既存データを削除してから投入")
+    args = parser.parse_args()
+
+    print(f"Connecting to database: {DB_NAME} at {DB_HOST}:{DB_PORT}")
+    result = load_dataset(args.scale, args.seed, args.method, args.chunk_rows, args.truncate)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+コールドスタートのベンチマーク
+
+新しいPythonプロセスを毎回起動して、main モジュールのインポート時間と
+Mangum handler の最初のレスポンスまでの時間を計測します。
+中央値が予算を超えた場合は終了コード1で終了するため、CIで回帰を検出できます。
+
+使い方:
+    python lambdas/benchmarks/cold_start.py --runs 10 --path /openapi.json
+    python lambdas/benchmarks/cold_start.py --import-budget-ms 300 --first-response-budget-ms 800 --output cold_start.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from events import SRC_DIR
+
+# 子プロセスで実行する計測コード（親プロセスのインポート状態に影響されないよう毎回新規に起動する）
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {src_dir!r})
+sys.path.insert(0, {bench_dir!r})
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from events import api_gateway_event, LambdaContext
+response = main.handler(api_gateway_event("GET", {path!r}), LambdaContext())
+responded = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "first_response_ms": (responded - imported) * 1000,
+    "total_ms": (responded - started) * 1000,
+    "status_code": response["statusCode"],
+}}))
+"""
+
+
+def measure_once(path, env):
+    code = PROBE.format(src_dir=SRC_DIR, bench_dir=os.path.dirname(os.path.abspath(__file__)), path=path)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        # 子プロセスの例外（インポートの失敗など）を表示してから終了する
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"cold start probe failed with exit status {result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(values):
+    return {
+        "median": statistics.median(values),
+        "min": min(values),
+        "max": max(values),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quiz APIのコールドスタート計測")
+    parser.add_argument("--runs", type=int, default=int(os.environ.get("COLD_START_RUNS", "10")))
+    parser.add_argument("--path", default="/openapi.json", help="最初のリクエストのパス（DBに触れないパスを推奨）")
+    parser.add_argument("--init-mode", default=os.environ.get("LAMBDA_INIT_MODE", "lazy"), choices=["lazy", "eager"])
+    parser.add_argument("--import-budget-ms", type=float, default=float(os.environ.get("COLD_START_IMPORT_BUDGET_MS", "300")))
+    parser.add_argument("--first-response-budget-ms", type=float, default=float(os.environ.get("COLD_START_FIRST_RESPONSE_BUDGET_MS", "800")))
+    parser.add_argument("--output", help="結果をJSONで書き出すファイル")
+    args = parser.parse_args()
+
+    env = dict(os.environ, LAMBDA_INIT_MODE=args.init_mode)
+    samples = [measure_once(args.path, env) for _ in range(args.runs)]
+
+    report = {
+        "runs": args.runs,
+        "path": args.path,
+        "init_mode": args.init_mode,
+        "import_ms": summarize([s["import_ms"] for s in samples]),
+        "first_response_ms": summarize([s["first_response_ms"] for s in samples]),
+        "total_ms": summarize([s["total_ms"] for s in samples]),
+        "status_codes": sorted({s["status_code"] for s in samples}),
+        "budget": {
+            "import_ms": args.import_budget_ms,
+            "first_response_ms": args.first_response_budget_ms,
+        },
+    }
+    violations = []
+    if report["import_ms"]["median"] > args.import_budget_ms:
+        violations.append(f"import_ms median {report['import_ms']['median']:.1f} > budget {args.import_budget_ms:.1f}")
+    if report["first_response_ms"]["median"] > args.first_response_budget_ms:
+        violations.append(f"first_response_ms median {report['first_response_ms']['median']:.1f} > budget {args.first_response_budget_ms:.1f}")
+    failed_statuses = [code for code in report["status_codes"] if code >= 400]
+    if failed_statuses:
+        # エラーレスポンスまでの時間は計測として意味がないため、予算内でも失敗とする
+        violations.append(f"first response status {failed_statuses} (expected < 400)")
+    report["violations"] = violations
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
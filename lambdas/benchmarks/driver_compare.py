@@ -0,0 +1,189 @@
+"""
+DB接続方式（DB_DRIVER）のベンチマーク
+
+同じ参照系のワークロード（問題1件・問題20件・試験カテゴリー・統計・試験結果）を
+dataapi と pymysql のそれぞれで実行し、クエリごとのレイテンシ（p50/p95/p99）と
+同時実行時のスループットを比較してJSONで出力します。
+接続方式ごとに新しいPythonプロセスを起動します（infrastructure/db.py はインポート時に設定を読み込むため）。
+
+接続設定は lambdas/src と同じ環境変数で指定します（AURORA_* と DB_HOST/DB_USER/DB_PASSWORD の両方）。
+
+使い方:
+    python lambdas/benchmarks/driver_compare.py --iterations 200 --concurrency 4 --duration 10
+    python lambdas/benchmarks/driver_compare.py --drivers pymysql --question-ids 1-5000 --output drivers.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from events import SRC_DIR
+from load_test import parse_id_range, percentile
+
+
+def build_workload(args):
+    """計測するクエリ（名前 -> 関数(db, rng)）"""
+    from adapters.repositories.question_repo import SQLQuestionRepo
+    from adapters.repositories.exam_repo import SQLExamRepo
+    from adapters.repositories.stats_repo import SQLStatsRepo
+    from adapters.repositories.attempt_repo import SQLAttemptRepo
+
+    workload = {
+        "question_get": lambda db, rng: SQLQuestionRepo(db).get(rng.choice(args.question_ids)),
+        "question_get_many_20": lambda db, rng: SQLQuestionRepo(db).get_many(rng.sample(args.question_ids, min(20, len(args.question_ids)))),
+        "exam_categories": lambda db, rng: SQLExamRepo(db).get_categories(rng.choice(args.exam_ids)),
+        "user_exam_stats": lambda db, rng: SQLStatsRepo(db).get_user_exam_stats(rng.choice(args.user_ids)),
+    }
+    if args.attempt_ids:
+        workload["attempt_responses"] = lambda db, rng: SQLAttemptRepo(db).get_latest_responses(rng.choice(args.attempt_ids))
+    return workload
+
+
+def summarize(values):
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "mean_ms": statistics.fmean(values),
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+    }
+
+
+def run_child(args):
+    """子プロセス: 環境変数の DB_DRIVER でワークロードを実行して結果を出力"""
+    from infrastructure.db import DB_DRIVER, get_db_session
+
+    workload = build_workload(args)
+    rng = random.Random(args.seed)
+    result = {"driver": DB_DRIVER, "queries": {}}
+
+    # 接続の確立・初回のメタデータ取得を除くため、各クエリを数回実行してから計測する
+    db = get_db_session()
+    try:
+        for name, query in workload.items():
+            for _ in range(args.warmup):
+                query(db, rng)
+                db.rollback()
+            latencies = []
+            for _ in range(args.iterations):
+                started = time.perf_counter()
+                query(db, rng)
+                db.rollback()
+                latencies.append((time.perf_counter() - started) * 1000)
+            result["queries"][name] = summarize(latencies)
+    finally:
+        db.close()
+
+    # 同時実行時のスループット（スレッドごとにセッションを使い、ワークロードを順に繰り返す）
+    names = list(workload)
+    lock = threading.Lock()
+    latencies = []
+    deadline = time.monotonic() + args.duration
+
+    def worker(worker_id):
+        worker_rng = random.Random(args.seed + worker_id + 1)
+        session = get_db_session()
+        local = []
+        try:
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                workload[worker_rng.choice(names)](session, worker_rng)
+                session.rollback()
+                local.append((time.perf_counter() - started) * 1000)
+        finally:
+            session.close()
+        with lock:
+            latencies.extend(local)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(worker, range(args.concurrency)))
+    elapsed = time.monotonic() - started
+    result["concurrent"] = {
+        "concurrency": args.concurrency,
+        "duration_s": elapsed,
+        "throughput_qps": len(latencies) / elapsed,
+        **summarize(latencies),
+    }
+    print(json.dumps(result))
+
+
+def run_driver(driver, argv, concurrency):
+    # スループット計測の同時実行数分の接続をプールに保持する
+    env = dict(os.environ, DB_DRIVER=driver, DB_POOL_SIZE=str(concurrency), DB_MAX_OVERFLOW="0",
+               METRICS_ENABLED="false")
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", *argv],
+                               capture_output=True, text=True, env=env, cwd=SRC_DIR)
+    if completed.returncode != 0:
+        return {"driver": driver, "error": "\n".join(completed.stderr.strip().splitlines()[-5:])}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(results):
+    """pymysqlがdataapiの何倍速いか（p50・スループットの比）"""
+    if "dataapi" not in results or "pymysql" not in results:
+        return {}
+    dataapi, pymysql = results["dataapi"], results["pymysql"]
+    if "error" in dataapi or "error" in pymysql:
+        return {}
+    speedup = {
+        name: dataapi["queries"][name]["p50_ms"] / pymysql["queries"][name]["p50_ms"]
+        for name in dataapi["queries"] if name in pymysql["queries"]
+    }
+    speedup["throughput"] = pymysql["concurrent"]["throughput_qps"] / dataapi["concurrent"]["throughput_qps"]
+    return speedup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DB接続方式（dataapi / pymysql）のレイテンシ・スループット比較")
+    parser.add_argument("--drivers", default="dataapi,pymysql", help="比較する接続方式（カンマ区切り）")
+    parser.add_argument("--iterations", type=int, default=100, help="クエリごとの計測回数")
+    parser.add_argument("--warmup", type=int, default=5, help="クエリごとの計測前の実行回数")
+    parser.add_argument("--concurrency", type=int, default=4, help="スループット計測の同時実行数")
+    parser.add_argument("--duration", type=float, default=10, help="スループット計測の秒数")
+    parser.add_argument("--question-ids", type=parse_id_range, default="1-1000")
+    parser.add_argument("--exam-ids", type=parse_id_range, default="1")
+    parser.add_argument("--user-ids", type=parse_id_range, default="1-1000")
+    parser.add_argument("--attempt-ids", type=parse_id_range, default="", help="試験結果の取得に使う完了済みの試験id")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="結果をJSONで書き出すファイル")
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return 0
+
+    # 子プロセスには --drivers・--output 以外の引数をそのまま渡す
+    argv = []
+    skip = False
+    for arg in sys.argv[1:]:
+        if skip:
+            skip = False
+        elif arg in ("--drivers", "--output"):
+            skip = True
+        elif not arg.startswith(("--drivers=", "--output=")):
+            argv.append(arg)
+
+    results = {driver: run_driver(driver, argv, args.concurrency) for driver in args.drivers.split(",")}
+    report = {"drivers": results, "speedup_pymysql_over_dataapi": compare(results)}
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+    return 1 if any("error" in result for result in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+ベンチマーク用の合成API Gatewayイベント
+
+Mangumの handler を直接呼び出すために、API Gateway HTTP API (payload v2.0)
+形式のイベントとLambdaコンテキストを組み立てます。
+"""
+
+import json
+import os
+import sys
+import time
+import uuid
+from urllib.parse import urlencode
+
+# lambdas/src をインポートパスに追加（src配下のモジュールはsrcをルートとしてインポートされる）
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+class LambdaContext:
+    """handlerに渡す最小限のLambdaコンテキスト"""
+    function_name = "quiz-api-benchmark"
+    function_version = "$LATEST"
+    memory_limit_in_mb = 512
+    invoked_function_arn = "arn:aws:lambda:ap-northeast-1:000000000000:function:quiz-api-benchmark"
+
+    def __init__(self):
+        self.aws_request_id = str(uuid.uuid4())
+
+    def get_remaining_time_in_millis(self):
+        return 30000
+
+
+def api_gateway_event(method, path, query=None, body=None, headers=None):
+    """
+    API Gateway HTTP API (payload v2.0) 形式のイベントを作成します。
+
+    Args:
+        method: HTTPメソッド
+        path: リクエストパス（例: /questions/1）
+        query: クエリパラメータの辞書
+        body: リクエストボディ（dictの場合はJSONに変換）
+        headers: 追加のリクエストヘッダー
+    """
+    request_headers = {"host": "localhost", "user-agent": "quiz-api-benchmark"}
+    if body is not None and not isinstance(body, str):
+        body = json.dumps(body)
+        request_headers["content-type"] = "application/json"
+    request_headers.update(headers or {})
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": urlencode(query or {}, doseq=True),
+        "headers": request_headers,
+        "requestContext": {
+            "accountId": "000000000000",
+            "apiId": "benchmark",
+            "domainName": "localhost",
+            "domainPrefix": "localhost",
+            "http": {
+                "method": method,
+                "path": path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": "127.0.0.1",
+                "userAgent": "quiz-api-benchmark",
+            },
+            "requestId": str(uuid.uuid4()),
+            "routeKey": "$default",
+            "stage": "$default",
+            "time": time.strftime("%d/%b/%Y:%H:%M:%S +0000", time.gmtime()),
+            "timeEpoch": int(time.time() * 1000),
+        },
+        "body": body,
+        "isBase64Encoded": False,
+    }
@@ -0,0 +1,426 @@
+"""
+Quiz APIの負荷テスト
+
+試験当日の利用を想定したシナリオ（カテゴリー取得 → 出題 → 問題取得 → 回答送信 → 結果表示）を
+指定した同時実行数で繰り返し、エンドポイントごとのスループットとレイテンシ（p50/p95/p99）をJSONで出力します。
+ベースラインのJSONを指定すると比較し、回帰があれば終了コード1で終了するため、CIで回帰を検出できます。
+
+実行方式:
+    uvicorn : uvicornでアプリを起動し、HTTPでリクエストする
+    mangum  : Mangum の handler に合成API Gatewayイベントを直接渡す（同一プロセス内のスレッドで並行実行）
+
+DB接続は lambdas/src と同じ環境変数で設定します（db/synthetic-data などでデータを投入したDBを推奨）。
+APIには試験を開始するエンドポイントが無いため、回答送信の前に exam_attempts へ直接行を作成します（計測対象外）。
+
+使い方:
+    python lambdas/benchmarks/load_test.py --mode mangum --concurrency 8 --duration 30
+    python lambdas/benchmarks/load_test.py --mode uvicorn --workers 2 --scenario exam_session:1,browse:3 --output result.json
+    python lambdas/benchmarks/load_test.py --baseline baseline.json --max-regression-pct 20
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from events import SRC_DIR, LambdaContext, api_gateway_event
+
+
+def parse_id_range(value):
+    """'1-100' や '1,2,5' 形式のid指定をリストに変換"""
+    ids = []
+    for part in value.split(","):
+        part = part.strip()
+        if "-" in part:
+            start, end = part.split("-", 1)
+            ids.extend(range(int(start), int(end) + 1))
+        elif part:
+            ids.append(int(part))
+    return ids
+
+
+def parse_scenario_mix(value):
+    """'exam_session:1,browse:3' 形式のシナリオ比率を辞書に変換"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.strip().partition(":")
+        if name not in SCENARIOS:
+            raise ValueError(f"未知のシナリオです: {name}（{', '.join(SCENARIOS)}）")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class MangumClient:
+    """Mangum の handler を直接呼び出すクライアント"""
+
+    def __init__(self):
+        import main
+        self.handler = main.handler
+
+    def request(self, method, path, query=None, body=None):
+        response = self.handler(api_gateway_event(method, path, query=query, body=body), LambdaContext())
+        payload = response.get("body")
+        return response["statusCode"], json.loads(payload) if payload else None
+
+
+class HTTPClient:
+    """uvicornで起動したアプリにHTTPでリクエストするクライアント（スレッドごとにKeep-Alive接続を保持）"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.local = threading.local()
+
+    def _connection(self):
+        if getattr(self.local, "connection", None) is None:
+            self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        return self.local.connection
+
+    def request(self, method, path, query=None, body=None):
+        url = f"{path}?{urlencode(query, doseq=True)}" if query else path
+        headers = {"user-agent": "quiz-api-benchmark"}
+        if body is not None:
+            body = json.dumps(body)
+            headers["content-type"] = "application/json"
+        connection = self._connection()
+        try:
+            connection.request(method, url, body=body, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except (http.client.HTTPException, OSError):
+            # 切断された接続は作り直す
+            connection.close()
+            self.local.connection = None
+            raise
+        return response.status, json.loads(payload) if payload else None
+
+
+class UvicornServer:
+    """負荷テスト用にuvicornを子プロセスとして起動・停止する"""
+
+    def __init__(self, host, port, workers):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.process = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", self.host, "--port", str(self.port),
+             "--workers", str(self.workers), "--log-level", "warning"],
+            cwd=SRC_DIR,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"uvicornが終了しました（終了コード {self.process.returncode}）")
+            try:
+                connection = http.client.HTTPConnection(self.host, self.port, timeout=1)
+                connection.request("GET", "/openapi.json")
+                if connection.getresponse().status == 200:
+                    return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise RuntimeError("uvicornの起動がタイムアウトしました")
+
+    def __exit__(self, *exc):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def create_attempt(user_id, exam_id, question_ids):
+    """回答送信用の未完了の試験記録を作成してidを返す（APIに開始エンドポイントが無いため直接作成）"""
+    from infrastructure.db import get_db_session
+    from adapters.repositories.attempt_repo import ExamAttempts
+
+    db = get_db_session()
+    try:
+        attempt = ExamAttempts(user_id=user_id, exam_id=exam_id, question_ids=question_ids)
+        db.add(attempt)
+        db.commit()
+        return attempt.id
+    finally:
+        db.close()
+
+
+class Recorder:
+    """エンドポイントごとのレイテンシとエラーを記録する（計測開始前のウォームアップ分は捨てる）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.unexpected = {}
+        self.recording = False
+
+    def record(self, label, elapsed_ms, ok):
+        if not self.recording:
+            return
+        with self.lock:
+            self.latencies.setdefault(label, []).append(elapsed_ms)
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+    def record_unexpected(self, label):
+        """リクエスト以外（試験記録の作成・レスポンスの解釈など）で発生した例外を件数のみ記録する"""
+        if not self.recording:
+            return
+        with self.lock:
+            self.unexpected[label] = self.unexpected.get(label, 0) + 1
+
+
+class RequestFailed(Exception):
+    """シナリオを続行できないレスポンス（以降のステップは実行しない）"""
+
+
+class Session:
+    """1つの仮想ユーザー（スレッド）のリクエストを計測する"""
+
+    def __init__(self, client, recorder, rng, user_ids, exam_ids, question_count):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.user_ids = user_ids
+        self.exam_ids = exam_ids
+        self.question_count = question_count
+
+    def call(self, label, method, path, query=None, body=None):
+        started = time.perf_counter()
+        try:
+            status, payload = self.client.request(method, path, query=query, body=body)
+        except Exception as e:
+            self.recorder.record(label, (time.perf_counter() - started) * 1000, False)
+            raise RequestFailed(f"{label}: {e}") from e
+        self.recorder.record(label, (time.perf_counter() - started) * 1000, status < 400)
+        if status >= 400:
+            raise RequestFailed(f"{label}: HTTP {status}")
+        return payload
+
+    def start_quiz(self, exam_id):
+        categories = self.call("GET /exams/{exam_id}/categories", "GET", f"/exams/{exam_id}/categories")
+        category_ids = [category["category_id"] for category in categories["categories"]]
+        sample = self.call("POST /exams/{exam_id}/questions/sample", "POST", f"/exams/{exam_id}/questions/sample",
+                           body={"category_ids": category_ids, "count": self.question_count})
+        return [question["id"] for question in sample["questions"]]
+
+    def answer(self, question):
+        # 7割程度は正解する想定
+        if question["correct_key"] and self.rng.random() < 0.7:
+            return question["correct_key"]
+        return [self.rng.choice(question["choices"])["choice_id"]] if question["choices"] else []
+
+
+def scenario_exam_session(session):
+    """試験1回分: カテゴリー取得 → 出題 → 問題取得 → 回答送信 → 結果・統計の表示"""
+    user_id = session.rng.choice(session.user_ids)
+    exam_id = session.rng.choice(session.exam_ids)
+    question_ids = session.start_quiz(exam_id)
+    if not question_ids:
+        return
+    questions = session.call("GET /questions", "GET", "/questions",
+                             query={"ids": ",".join(map(str, question_ids))})
+    attempt_id = create_attempt(user_id, exam_id, question_ids)
+    answers = [{"question_id": question["id"], "answer_ids": session.answer(question)} for question in questions]
+    session.call("POST /exam-attempts/{attempt_id}/submit", "POST", f"/exam-attempts/{attempt_id}/submit",
+                 body={"user_id": user_id, "answers": answers})
+    session.call("GET /exam-attempts/{attempt_id}/results", "GET", f"/exam-attempts/{attempt_id}/results",
+                 query={"user_id": user_id})
+    session.call("GET /stats/users/{user_id}/exams", "GET", f"/stats/users/{user_id}/exams")
+
+
+def scenario_browse(session):
+    """問題の閲覧のみ（出題 → 1問ずつ取得）"""
+    exam_id = session.rng.choice(session.exam_ids)
+    for question_id in session.start_quiz(exam_id)[:5]:
+        session.call("GET /questions/{question_id}", "GET", f"/questions/{question_id}")
+        session.call("GET /stats/questions/{question_id}", "GET", f"/stats/questions/{question_id}")
+
+
+def scenario_stats(session):
+    """統計画面の表示"""
+    user_id = session.rng.choice(session.user_ids)
+    exam_id = session.rng.choice(session.exam_ids)
+    session.call("GET /stats/users/{user_id}/exams", "GET", f"/stats/users/{user_id}/exams")
+    session.call("GET /stats/exams/{exam_id}/categories", "GET", f"/stats/exams/{exam_id}/categories")
+
+
+SCENARIOS = {
+    "exam_session": scenario_exam_session,
+    "browse": scenario_browse,
+    "stats": scenario_stats,
+}
+
+
+def run_worker(worker_id, args, client, recorder, mix, deadline):
+    rng = random.Random(args.seed + worker_id)
+    session = Session(client, recorder, rng, args.user_ids, args.exam_ids, args.question_count)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    completed = failed = 0
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights=weights)[0]
+        try:
+            SCENARIOS[name](session)
+            completed += 1
+        except RequestFailed:
+            failed += 1
+        except Exception as e:
+            # 想定外の例外でワーカーを終了させると future.result() で計測全体が失われるため、記録して続行する
+            recorder.record_unexpected(f"{name}: {type(e).__name__}")
+            failed += 1
+    return completed, failed
+
+
+def percentile(sorted_values, q):
+    """最近傍順位法によるパーセンタイル"""
+    index = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, duration):
+    endpoints = {}
+    for label, values in sorted(latencies.items()):
+        values = sorted(values)
+        endpoints[label] = {
+            "count": len(values),
+            "errors": errors.get(label, 0),
+            "error_rate": errors.get(label, 0) / len(values),
+            "throughput_rps": len(values) / duration,
+            "mean_ms": statistics.fmean(values),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "max_ms": values[-1],
+        }
+    return endpoints
+
+
+def compare_baseline(report, baseline, max_regression_pct, min_count):
+    """ベースラインと比較し、レイテンシの悪化・スループットの低下を検出する"""
+    violations = []
+    limit = 1 + max_regression_pct / 100
+    for label, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(label)
+        # サンプル数が少ないエンドポイントはばらつきが大きいため比較しない
+        if not previous or current["count"] < min_count or previous["count"] < min_count:
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if current[key] > previous[key] * limit:
+                violations.append(f"{label} {key} {current[key]:.1f} > baseline {previous[key]:.1f} (+{max_regression_pct:.0f}%)")
+        if current["throughput_rps"] * limit < previous["throughput_rps"]:
+            violations.append(f"{label} throughput_rps {current['throughput_rps']:.1f} < baseline {previous['throughput_rps']:.1f} (-{max_regression_pct:.0f}%)")
+    return violations
+
+
+def check_error_rates(report, max_error_rate):
+    """リクエストのエラー率と、途中で失敗したシナリオの割合をしきい値と比較する"""
+    violations = []
+    if report["error_rate"] > max_error_rate:
+        violations.append(f"error_rate {report['error_rate']:.4f} > {max_error_rate:.4f}")
+    if report["scenario_error_rate"] > max_error_rate:
+        unexpected = ", ".join(f"{label} x{count}" for label, count in report["unexpected_errors"].items())
+        violations.append(f"scenario_error_rate {report['scenario_error_rate']:.4f} > {max_error_rate:.4f}"
+                          + (f" (unexpected: {unexpected})" if unexpected else ""))
+    return violations
+
+
+def run_load_test(args, client):
+    mix = parse_scenario_mix(args.scenario)
+    recorder = Recorder()
+    deadline = time.monotonic() + args.warmup + args.duration
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [executor.submit(run_worker, worker_id, args, client, recorder, mix, deadline)
+                   for worker_id in range(args.concurrency)]
+        time.sleep(args.warmup)
+        recorder.recording = True
+        started = time.monotonic()
+        results = [future.result() for future in futures]
+        duration = time.monotonic() - started
+
+    endpoints = summarize(recorder.latencies, recorder.errors, duration)
+    total_requests = sum(endpoint["count"] for endpoint in endpoints.values())
+    total_errors = sum(endpoint["errors"] for endpoint in endpoints.values())
+    scenarios_completed = sum(completed for completed, _ in results)
+    scenarios_failed = sum(failed for _, failed in results)
+    scenarios_total = scenarios_completed + scenarios_failed
+    return {
+        "mode": args.mode,
+        "scenario": mix,
+        "concurrency": args.concurrency,
+        "duration_s": duration,
+        "warmup_s": args.warmup,
+        "seed": args.seed,
+        "scenarios_completed": scenarios_completed,
+        "scenarios_failed": scenarios_failed,
+        # 途中で失敗したシナリオの割合（以降のステップは実行されず、エンドポイントのエラー率には表れない）
+        "scenario_error_rate": scenarios_failed / scenarios_total if scenarios_total else 0,
+        "unexpected_errors": dict(sorted(recorder.unexpected.items())),
+        "requests": total_requests,
+        "throughput_rps": total_requests / duration if duration else 0,
+        "error_rate": total_errors / total_requests if total_requests else 0,
+        "endpoints": endpoints,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quiz APIの負荷テスト")
+    parser.add_argument("--mode", choices=["uvicorn", "mangum"], default=os.environ.get("LOAD_TEST_MODE", "mangum"))
+    parser.add_argument("--scenario", default=os.environ.get("LOAD_TEST_SCENARIO", "exam_session:1,browse:2,stats:1"),
+                        help=f"シナリオ名:比率 のカンマ区切り（{', '.join(SCENARIOS)}）")
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("LOAD_TEST_CONCURRENCY", "8")))
+    parser.add_argument("--duration", type=float, default=float(os.environ.get("LOAD_TEST_DURATION", "30")), help="計測秒数")
+    parser.add_argument("--warmup", type=float, default=float(os.environ.get("LOAD_TEST_WARMUP", "5")), help="計測前のウォームアップ秒数")
+    parser.add_argument("--user-ids", type=parse_id_range, default=os.environ.get("LOAD_TEST_USER_IDS", "1-1000"))
+    parser.add_argument("--exam-ids", type=parse_id_range, default=os.environ.get("LOAD_TEST_EXAM_IDS", "1"))
+    parser.add_argument("--question-count", type=int, default=int(os.environ.get("LOAD_TEST_QUESTION_COUNT", "20")),
+                        help="1回の試験の問題数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicornのワーカー数")
+    parser.add_argument("--baseline", help="比較するベースラインのJSON")
+    parser.add_argument("--max-regression-pct", type=float,
+                        default=float(os.environ.get("LOAD_TEST_MAX_REGRESSION_PCT", "20")))
+    parser.add_argument("--max-error-rate", type=float, default=float(os.environ.get("LOAD_TEST_MAX_ERROR_RATE", "0.01")))
+    parser.add_argument("--min-count", type=int, default=50, help="ベースライン比較に必要な最小リクエスト数")
+    parser.add_argument("--output", help="結果をJSONで書き出すファイル（ベースラインとして保存する場合も同じ形式）")
+    args = parser.parse_args()
+
+    if args.mode == "uvicorn":
+        with UvicornServer(args.host, args.port, args.workers):
+            report = run_load_test(args, HTTPClient(args.host, args.port))
+    else:
+        report = run_load_test(args, MangumClient())
+
+    violations = check_error_rates(report, args.max_error_rate)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            violations += compare_baseline(report, json.load(f), args.max_regression_pct, args.min_count)
+    report["violations"] = violations
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
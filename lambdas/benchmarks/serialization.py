@@ -0,0 +1,155 @@
+"""
+問題レスポンスのシリアライズのベンチマーク
+
+問題1件・一括取得（20件・200件）のレスポンス本文を作るまでの時間を、次の方式で比較してJSONで出力します。
+    stdlib       : FastAPIの既定（response_model で検証 → 標準のjsonでエンコード）
+    orjson       : response_model で検証 → ORJSONResponse でエンコード（アプリの既定のレスポンスクラス）
+    preencoded   : エンコード済みの問題をつなげる（adapters/api/serialization.py、キャッシュ済みの状態）
+    preencoded_cold : 同上、キャッシュが空の状態（問題ごとに1回目のエンコードを含む）
+DBは使わず、本番に近い大きさの合成データの問題を使います。すべての方式の出力が同じJSONであることも検証します。
+
+使い方:
+    python lambdas/benchmarks/serialization.py
+    python lambdas/benchmarks/serialization.py --sizes 1,20,200 --iterations 2000 --output serialization.json
+"""
+
+import argparse
+import dataclasses
+import json
+import random
+import sys
+import time
+from datetime import datetime
+
+from events import SRC_DIR  # noqa: F401  lambdas/src をインポートパスに追加
+from load_test import percentile
+
+
+def make_questions(count, rng, first_id=1):
+    """
+    本番の問題に近い大きさ（問題文・解説は数百文字、選択肢は4〜6個）の合成データ
+    エンコード済みの問題はidとバージョンで再利用されるため、呼び出しごとに重ならないidを使う
+    """
+    from domain.models import Question
+
+    def text(length):
+        return "".join(rng.choice("あいうえおかきくけこAWS Lambda S3 EC2 VPC、。") for _ in range(length))
+
+    questions = []
+    for qid in range(first_id, first_id + count):
+        choices = [{"choice_id": i, "choice_text": text(rng.randint(20, 80))} for i in range(1, rng.randint(4, 6) + 1)]
+        questions.append(Question(
+            id=qid,
+            body=text(rng.randint(150, 400)),
+            explanation=text(rng.randint(200, 600)),
+            choices=choices,
+            correct_key=sorted(rng.sample([c["choice_id"] for c in choices], rng.choice([1, 1, 2]))),
+            exam_categories_id=rng.randint(1, 30),
+            updated_at=datetime(2024, 1, 1, 12, 0, qid % 60),
+        ))
+    return questions
+
+
+def build_methods():
+    """方式名 -> 関数(questions, single) -> bytes"""
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from pydantic import TypeAdapter
+    from domain.schemas import QuestionRead
+    from adapters.api.serialization import encode_question, encode_questions, question_payload_cache
+
+    single_adapter = TypeAdapter(QuestionRead)
+    many_adapter = TypeAdapter(list[QuestionRead])
+
+    def via_response_model(response_class):
+        # FastAPIの serialize_response と同じ手順（dataclassをdictにして検証し、JSON互換の値に変換してエンコード）
+        def serialize(questions, single):
+            if single:
+                content = single_adapter.dump_python(
+                    single_adapter.validate_python(dataclasses.asdict(questions[0])), mode="json")
+            else:
+                content = many_adapter.dump_python(
+                    many_adapter.validate_python([dataclasses.asdict(q) for q in questions]), mode="json")
+            return response_class(content).body
+        return serialize
+
+    def preencoded(questions, single):
+        return encode_question(questions[0]) if single else encode_questions(questions)
+
+    def preencoded_cold(questions, single):
+        question_payload_cache.clear()
+        return preencoded(questions, single)
+
+    return {
+        "stdlib": via_response_model(JSONResponse),
+        "orjson": via_response_model(ORJSONResponse),
+        "preencoded": preencoded,
+        "preencoded_cold": preencoded_cold,
+    }
+
+
+def measure(method, questions, single, iterations):
+    for _ in range(min(iterations, 50)):
+        method(questions, single)
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        method(questions, single)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+    return {
+        "mean_us": sum(timings) / len(timings),
+        "p50_us": percentile(timings, 50),
+        "p95_us": percentile(timings, 95),
+    }
+
+
+def parse_sizes(value):
+    try:
+        return [int(size) for size in value.split(",") if size.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid sizes: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="問題レスポンスのシリアライズ方式の比較")
+    parser.add_argument("--sizes", type=parse_sizes, default="1,20,200",
+                        help="レスポンスに含める問題数（カンマ区切り、1は問題1件のエンドポイント）")
+    parser.add_argument("--iterations", type=int, default=1000, help="方式・問題数ごとの計測回数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="結果をJSONで書き出すファイル")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    methods = build_methods()
+    report = {"iterations": args.iterations, "results": {}}
+    mismatches = []
+    next_id = 1
+    for size in args.sizes:
+        questions = make_questions(size, rng, next_id)
+        next_id += size
+        single = size == 1
+        label = "single" if single else f"batch_{size}"
+
+        # すべての方式が同じJSONを返すことを確認（デコードした値が一致すること）
+        outputs = {name: method(questions, single) for name, method in methods.items()}
+        expected = json.loads(outputs["stdlib"])
+        mismatches.extend(f"{label}:{name}" for name, body in outputs.items() if json.loads(body) != expected)
+
+        results = {name: measure(method, questions, single, args.iterations) for name, method in methods.items()}
+        baseline = results["stdlib"]["p50_us"]
+        for name, result in results.items():
+            result["bytes"] = len(outputs[name])
+            result["speedup_vs_stdlib"] = baseline / result["p50_us"] if result["p50_us"] else None
+        report["results"][label] = results
+
+    report["mismatches"] = mismatches
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from domain.grading import grade_answers, score_percentage, summarize_by_category
+from domain.schemas import AttemptResultsResponse, AttemptSubmitRequest, AttemptSubmitResponse
+from adapters.repositories.attempt_repo import SQLAttemptRepo
+from infrastructure.async_db import AsyncDB, AsyncRepo, get_async_db
+
+router = APIRouter(prefix="/exam-attempts")
+
+async def get_attempt_repo(db: AsyncDB = Depends(get_async_db)) -> AsyncRepo:
+    """SQLAttemptRepoの依存関数（独立したクエリを並行実行できるようAsyncRepoで包む）"""
+    return AsyncRepo(SQLAttemptRepo, db)
+
+@router.post("/{attempt_id}/submit", response_model=AttemptSubmitResponse, status_code=200)
+async def submit_attempt(attempt_id: int, request: AttemptSubmitRequest,
+                         repo: AsyncRepo = Depends(get_attempt_repo)):
+    """試験の回答をまとめて採点・保存し、試験記録を完了状態にする"""
+    # 同じ問題への回答が複数ある場合は最後の回答を採用
+    answers = {answer.question_id: answer.answer_ids for answer in request.answers}
+    # 試験記録と正解の取得は互いに依存しないため並行実行する
+    attempt, correct_keys = await asyncio.gather(repo.get(attempt_id), repo.get_correct_keys(list(answers)))
+    if attempt is None:
+        raise HTTPException(status_code=404, detail="Exam attempt not found")
+    if attempt.user_id != request.user_id:
+        raise HTTPException(status_code=403, detail="Exam attempt belongs to another user")
+    if attempt.finished_at is not None:
+        raise HTTPException(status_code=409, detail="Exam attempt is already finished")
+
+    # 試験記録の出題問題以外への回答は採点・保存しない（任意の問題IDで正答数を増やせないように）
+    results, skipped = grade_answers(answers, correct_keys, attempt.question_ids)
+
+    # 回答数はNext.js側（quiz/submit）と同じく、送信された回答の件数とする
+    if not await repo.finish(attempt_id, results, len(request.answers)):
+        raise HTTPException(status_code=409, detail="Exam attempt is already finished")
+
+    return AttemptSubmitResponse(
+        attempt_id=attempt_id,
+        total_questions=len(results),
+        correct_count=sum(1 for result in results if result.is_correct),
+        results=[{"question_id": result.question_id, "is_correct": result.is_correct} for result in results],
+        skipped_question_ids=skipped,
+    )
+
+@router.get("/{attempt_id}/results", response_model=AttemptResultsResponse, status_code=200)
+async def get_attempt_results(attempt_id: int, user_id: int = Query(...),
+                              repo: AsyncRepo = Depends(get_attempt_repo)):
+    """完了した試験の結果（問題ごとの最新の回答とカテゴリー別の正答率）を返す"""
+    # 回答の取得は試験記録の確認を待たずに並行実行する（404・403の場合は結果を捨てる）
+    found, responses = await asyncio.gather(repo.get_with_exam(attempt_id), repo.get_latest_responses(attempt_id))
+    if found is None or found[0].finished_at is None:
+        raise HTTPException(status_code=404, detail="Exam results not found")
+    attempt, exam = found
+    if attempt.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Exam attempt belongs to another user")
+
+    category_scores = summarize_by_category(responses)
+    correct_count = sum(score.correct_count for score in category_scores)
+    total_count = sum(score.total_count for score in category_scores)
+    # dataclassを含むため、モデルを直接作らずFastAPIのレスポンス変換に任せる
+    return {
+        "attempt": attempt,
+        "exam": exam,
+        "responses": responses,
+        "category_scores": category_scores,
+        "correct_count": correct_count,
+        "total_count": total_count,
+        "percentage": score_percentage(correct_count, total_count),
+    }
@@ -0,0 +1,61 @@
+import random
+from fastapi import APIRouter, Depends, Header, Response
+from domain.schemas import ExamCategoriesResponse, QuestionSampleRequest, QuestionSampleResponse
+from domain.services import QuestionRepo
+from domain.sampling import allocate_quotas, sample_uniform, sample_with_quotas
+from adapters.api.questions_router import get_question_repo
+from adapters.api.serialization import PREENCODED_RESPONSES_ENABLED, JSONBytesResponse, encode_sample_response
+from adapters.api.http_cache import CATEGORY_CACHE_CONTROL, etag_matches, make_etag, not_modified, set_cache_headers
+from adapters.repositories.question_index_repo import SQLQuestionIndexRepo, question_index_cache
+from adapters.repositories.exam_repo import SQLExamRepo
+from infrastructure.db import get_db
+
+router = APIRouter(prefix="/exams")
+
+_rng = random.Random()
+
+def get_question_index_repo(db=Depends(get_db)) -> SQLQuestionIndexRepo:
+    """SQLQuestionIndexRepoの依存関数"""
+    return SQLQuestionIndexRepo(db)
+
+def get_exam_repo(db=Depends(get_db)) -> SQLExamRepo:
+    """SQLExamRepoの依存関数"""
+    return SQLExamRepo(db)
+
+@router.get("/{exam_id}/categories", response_model=ExamCategoriesResponse, status_code=200)
+def get_exam_categories(exam_id: int, response: Response, if_none_match: str | None = Header(None),
+                        repo: SQLExamRepo = Depends(get_exam_repo)):
+    """
+    試験のカテゴリー一覧と、カテゴリーごとの問題数（カテゴリー選択画面用）
+    カテゴリーには更新日時が無いため、ETagは一覧の内容（問題数を含む）から作成する
+    """
+    categories = repo.get_categories(exam_id)
+    etag = make_etag(f"c{exam_id}", [
+        (c.exam_categories_id, c.category_id, c.category_name, c.description, c.question_count) for c in categories
+    ])
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, CATEGORY_CACHE_CONTROL)
+    set_cache_headers(response, etag, CATEGORY_CACHE_CONTROL)
+    return {"categories": categories, "total_questions": sum(category.question_count for category in categories)}
+
+@router.post("/{exam_id}/questions/sample", response_model=QuestionSampleResponse, status_code=200)
+def sample_questions(exam_id: int, request: QuestionSampleRequest,
+                     index_repo: SQLQuestionIndexRepo = Depends(get_question_index_repo),
+                     question_repo: QuestionRepo = Depends(get_question_repo)):
+    """出題用id索引から問題をランダムに抽出し、選ばれた問題だけを取得する"""
+    index = question_index_cache.get(exam_id, index_repo)
+    pools = index.pools(request.category_ids)
+
+    if request.mode == "proportional":
+        capacities = {category_id: len(ids) for category_id, ids in pools.items()}
+        weights = request.weights or capacities
+        quotas = allocate_quotas({c: weights.get(c, 0) for c in pools}, capacities, request.count)
+        question_ids, category_counts = sample_with_quotas(pools, quotas, _rng)
+    else:
+        question_ids, category_counts = sample_uniform(pools, request.count, _rng)
+
+    # 選ばれたidの問題だけを取得（キャッシュ越し）
+    questions = question_repo.get_many(question_ids)
+    if PREENCODED_RESPONSES_ENABLED:
+        return JSONBytesResponse(encode_sample_response(questions, category_counts))
+    return {"questions": questions, "category_counts": category_counts}
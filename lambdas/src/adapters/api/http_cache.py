@@ -0,0 +1,51 @@
+import hashlib
+import os
+from datetime import datetime
+from fastapi import Response
+
+# レスポンスの形式を変えた場合はこの値を変えて、クライアント・CDNのETagを無効にする
+ETAG_SCHEMA_VERSION = "1"
+# 問題（単体・一括）のCache-Control（s-maxageはCDN・API Gatewayのキャッシュ用）
+QUESTION_CACHE_CONTROL = os.environ.get(
+    "QUESTION_CACHE_CONTROL", "public, max-age=60, s-maxage=300, stale-while-revalidate=60")
+# 試験カテゴリー一覧のCache-Control（問題数が変わるため短めにする）
+CATEGORY_CACHE_CONTROL = os.environ.get("CATEGORY_CACHE_CONTROL", "public, max-age=30, s-maxage=60")
+
+def _format(value) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else str(value)
+
+def make_etag(kind: str, parts) -> str:
+    """種類とバージョンを表す値の列から強いETagを作成"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{ETAG_SCHEMA_VERSION}:{kind}".encode())
+    for part in parts:
+        digest.update(b"\x1f")
+        digest.update("|".join(_format(value) for value in part).encode())
+    return f'"{kind}-{digest.hexdigest()}"'
+
+def question_etag(qid: int, version: tuple) -> str:
+    """問題のETag（idと更新日時・削除日時から作成するため、問題の書き換えでは updated_at も更新すること）"""
+    return make_etag("q", [(qid, *version)])
+
+def questions_etag(versions: list[tuple[int, tuple]]) -> str:
+    """複数の問題のETag（返す順序のidとバージョンの組から作成）"""
+    return make_etag("qs", [(qid, *version) for qid, version in versions])
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match がETagに一致するか（If-None-Matchは弱い比較で判定する）"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return etag in (value[2:] if value.startswith("W/") else value for value in candidates)
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """本文なしの304レスポンス"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
@@ -1,17 +1,86 @@
-from fastapi import APIRouter, Depends, HTTPException
+import os
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from domain.schemas import QuestionRead
+from domain.services import QuestionRepo
 from adapters.repositories.question_repo import SQLQuestionRepo
+from adapters.repositories.cache import (
+    CachedQuestionRepo, QUESTION_CACHE_ENABLED, question_cache, shared_question_cache
+)
+from adapters.api.http_cache import (
+    QUESTION_CACHE_CONTROL, etag_matches, not_modified, question_etag, questions_etag, set_cache_headers
+)
+from adapters.api.serialization import (
+    PREENCODED_RESPONSES_ENABLED, JSONBytesResponse, encode_question, encode_questions
+)
 from infrastructure.db import get_db
 
 router = APIRouter(prefix="/questions")
 
-def get_question_repo(db=Depends(get_db)) -> SQLQuestionRepo:
-    """QuestionRepoの依存関数"""
-    return SQLQuestionRepo(db)
+# 一括取得で1リクエストに指定できるidの上限
+QUESTION_BATCH_MAX_IDS = int(os.environ.get("QUESTION_BATCH_MAX_IDS", "200"))
+
+def get_question_repo(db=Depends(get_db)) -> QuestionRepo:
+    """QuestionRepoの依存関数（キャッシュが有効な場合はキャッシュ越しに参照）"""
+    repo = SQLQuestionRepo(db)
+    if QUESTION_CACHE_ENABLED:
+        return CachedQuestionRepo(repo, question_cache, shared_question_cache)
+    return repo
+
+def parse_ids(ids: str) -> list[int]:
+    """カンマ区切りのid一覧をパース"""
+    try:
+        parsed = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(parsed) > QUESTION_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"ids must not exceed {QUESTION_BATCH_MAX_IDS} items")
+    return parsed
+
+@router.get("", response_model=list[QuestionRead], status_code=200)
+def get_questions(response: Response,
+                  ids: str = Query(..., description="カンマ区切りの問題id（例: 1,2,3）"),
+                  if_none_match: str | None = Header(None),
+                  repo: QuestionRepo = Depends(get_question_repo)):
+    """
+    複数の問題をまとめて取得（リクエストの順序で返し、存在しないidは含めない）
+    If-None-Match がETagと一致する場合は、問題本体を読まずにバージョンだけ確認して304を返す
+    """
+    qids = list(dict.fromkeys(parse_ids(ids)))
+    if if_none_match:
+        versions = repo.get_versions(qids)
+        etag = questions_etag([(qid, versions[qid]) for qid in qids if qid in versions])
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, QUESTION_CACHE_CONTROL)
+
+    questions = repo.get_many(qids)
+    etag = questions_etag([(q.id, (q.updated_at, q.deleted_at)) for q in questions])
+    if PREENCODED_RESPONSES_ENABLED:
+        response = JSONBytesResponse(encode_questions(questions))
+        set_cache_headers(response, etag, QUESTION_CACHE_CONTROL)
+        return response
+    set_cache_headers(response, etag, QUESTION_CACHE_CONTROL)
+    return questions
 
 @router.get("/{question_id}", response_model=QuestionRead, status_code=200)
-def get_question(question_id: int, repo: SQLQuestionRepo = Depends(get_question_repo)):
+def get_question(question_id: int, response: Response, if_none_match: str | None = Header(None),
+                 repo: QuestionRepo = Depends(get_question_repo)):
+    # 条件付きGET: 更新日時・削除日時だけを確認し、変わっていなければ304を返す
+    if if_none_match:
+        version = repo.get_version(question_id)
+        if version is not None:
+            etag = question_etag(question_id, version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag, QUESTION_CACHE_CONTROL)
+
     question = repo.get(question_id)
     if question is None:
         raise HTTPException(status_code=404, detail="Question not found")
+    etag = question_etag(question.id, (question.updated_at, question.deleted_at))
+    if PREENCODED_RESPONSES_ENABLED:
+        response = JSONBytesResponse(encode_question(question))
+        set_cache_headers(response, etag, QUESTION_CACHE_CONTROL)
+        return response
+    set_cache_headers(response, etag, QUESTION_CACHE_CONTROL)
     return question
@@ -0,0 +1,47 @@
+import os
+import orjson
+from fastapi import Response
+from domain.models import Question
+from domain.schemas import QuestionRead
+from adapters.repositories.cache import LocalLRUCache
+
+# 問題のレスポンスをエンコード済みのバイト列から組み立てる（pydanticの検証・再エンコードを省く）
+PREENCODED_RESPONSES_ENABLED = os.environ.get("PREENCODED_RESPONSES_ENABLED", "true").lower() == "true"
+# エンコード済みの問題を保持する件数の上限（再利用のたびに内容と照合するためTTLは設けない）
+QUESTION_PAYLOAD_CACHE_MAX_SIZE = int(os.environ.get("QUESTION_PAYLOAD_CACHE_MAX_SIZE", "5000"))
+
+# Lambdaのウォームスタート間で再利用する、問題id -> QuestionReadのJSONのキャッシュ
+question_payload_cache = LocalLRUCache(max_size=QUESTION_PAYLOAD_CACHE_MAX_SIZE, ttl=float("inf"))
+
+class JSONBytesResponse(Response):
+    """エンコード済みのJSONをそのまま返すレスポンス"""
+    media_type = "application/json"
+
+def payload_version(question: Question) -> tuple:
+    """エンコード済みのJSONの元になった値（QuestionReadに含める項目）"""
+    return (question.body, question.explanation, question.choices, question.correct_key, question.exam_categories_id)
+
+def encode_question(question: Question) -> bytes:
+    """
+    問題をQuestionReadのJSONにエンコード（response_model を通した場合と同じ内容）
+    updated_at を更新せずに書き換えられた問題も正しく返すよう、エンコードした内容そのものと照合して
+    一致する間だけ再利用する（文字列の比較はエンコードし直すより十分に速い）
+    """
+    version = payload_version(question)
+    entry = question_payload_cache.get_entry(question.id)
+    if entry is not None and entry.version == version:
+        question_payload_cache.record("hits")
+        return entry.value
+    question_payload_cache.record("misses")
+    payload = QuestionRead.model_validate(question, from_attributes=True).model_dump_json().encode()
+    question_payload_cache.set(question.id, payload, version)
+    return payload
+
+def encode_questions(questions: list[Question]) -> bytes:
+    """複数の問題のJSON配列（エンコード済みの問題をつなげるだけで、配列全体は再エンコードしない）"""
+    return b"[" + b",".join(encode_question(question) for question in questions) + b"]"
+
+def encode_sample_response(questions: list[Question], category_counts: dict[int, int]) -> bytes:
+    """QuestionSampleResponseのJSON（dictのキーはpydanticと同じく文字列にする）"""
+    counts = orjson.dumps(category_counts, option=orjson.OPT_NON_STR_KEYS)
+    return b'{"questions":' + encode_questions(questions) + b',"category_counts":' + counts + b"}"
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends
+from domain.schemas import CategoryStatsRead, QuestionStatsRead, UserExamStatsRead
+from domain.stats import accuracy_rate
+from adapters.repositories.stats_repo import SQLStatsRepo
+from infrastructure.db import get_db
+
+# 統計はロールアップテーブル（jobs/stats_rollup.py で集計）から返す
+router = APIRouter(prefix="/stats")
+
+def get_stats_repo(db=Depends(get_db)) -> SQLStatsRepo:
+    """SQLStatsRepoの依存関数"""
+    return SQLStatsRepo(db)
+
+@router.get("/users/{user_id}/exams", response_model=list[UserExamStatsRead], status_code=200)
+def get_user_exam_stats(user_id: int, repo: SQLStatsRepo = Depends(get_stats_repo)):
+    """有効な試験ごとの問題数と、ユーザーの正答数・回答数・正答率"""
+    return [
+        UserExamStatsRead(
+            id=exam.id,
+            exam_name=exam.exam_name,
+            exam_code=exam.exam_code,
+            level=exam.level,
+            description=exam.description,
+            total_questions=total_questions,
+            user_correct_answers=correct_answers,
+            user_total_answers=answered_questions,
+            user_accuracy_rate=accuracy_rate(correct_answers, answered_questions),
+        )
+        for exam, total_questions, answered_questions, correct_answers in repo.get_user_exam_stats(user_id)
+    ]
+
+@router.get("/questions/{question_id}", response_model=QuestionStatsRead, status_code=200)
+def get_question_stats(question_id: int, repo: SQLStatsRepo = Depends(get_stats_repo)):
+    """問題ごとの全ユーザーの回答数・正答率（未回答の場合は0件）"""
+    stats = repo.get_question_stats(question_id)
+    response_count = stats.response_count if stats else 0
+    correct_count = stats.correct_count if stats else 0
+    return QuestionStatsRead(
+        question_id=question_id,
+        response_count=response_count,
+        correct_count=correct_count,
+        accuracy_rate=accuracy_rate(correct_count, response_count),
+    )
+
+@router.get("/exams/{exam_id}/categories", response_model=list[CategoryStatsRead], status_code=200)
+def get_exam_category_stats(exam_id: int, repo: SQLStatsRepo = Depends(get_stats_repo)):
+    """試験のカテゴリーごとの全ユーザーの回答数・正答率"""
+    return [
+        CategoryStatsRead(
+            category_id=category_id,
+            category_name=category_name,
+            response_count=response_count,
+            correct_count=correct_count,
+            accuracy_rate=accuracy_rate(correct_count, response_count),
+        )
+        for category_id, category_name, response_count, correct_count in repo.get_exam_category_stats(exam_id)
+    ]
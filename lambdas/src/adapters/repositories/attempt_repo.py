@@ -0,0 +1,170 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, ForeignKey, Integer, JSON, Text, func
+from sqlalchemy.orm import Session
+from infrastructure.db import Base
+from domain.models import AnswerResult, Exam, ExamAttempt, ResponseDetail
+from adapters.repositories.question_repo import QUESTION_BATCH_CHUNK_SIZE, Questions, _load_json, chunked, to_domain
+from adapters.repositories.exam_repo import Categories, ExamCategories, Exams
+
+class ExamAttempts(Base):
+    __tablename__ = "exam_attempts"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=False)
+    exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False)
+    started_at = Column(DateTime, nullable=False, default=datetime.now)
+    finished_at = Column(DateTime, nullable=True)
+    answer_count = Column(Integer, nullable=True)
+    correct_count = Column(Integer, nullable=True)
+    question_ids = Column(JSON, nullable=False)
+
+class QuestionResponses(Base):
+    __tablename__ = "question_responses"
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    attempt_id = Column(Integer, ForeignKey("exam_attempts.id"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
+    answer_ids = Column(JSON, nullable=False)
+    is_correct = Column(Boolean, nullable=False, default=False)
+    answered_at = Column(DateTime, nullable=False, default=datetime.now)
+    feedback = Column(Text, nullable=True)
+
+def attempt_to_domain(row: ExamAttempts) -> ExamAttempt:
+    """ORMの行をドメインモデルに変換"""
+    return ExamAttempt(
+        id=row.id,
+        user_id=row.user_id,
+        exam_id=row.exam_id,
+        started_at=row.started_at,
+        finished_at=row.finished_at,
+        answer_count=row.answer_count,
+        correct_count=row.correct_count,
+        question_ids=_load_json(row.question_ids) or []
+    )
+
+def exam_to_domain(row: Exams) -> Exam:
+    """ORMの行をドメインモデルに変換"""
+    return Exam(
+        id=row.id,
+        exam_name=row.exam_name,
+        exam_code=row.exam_code,
+        level=row.level,
+        description=row.description
+    )
+
+class SQLAttemptRepo:
+    """
+    試験の回答記録（exam_attempts / question_responses）のリポジトリ
+    回答の送信は 試験記録の取得 → 正解の一括取得 → 回答の一括INSERT＋試験記録の更新 の
+    回答数に依存しない回数のクエリで、1つのトランザクションとして処理する
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # 該当idの試験記録を取得
+    def get(self, attempt_id: int) -> ExamAttempt | None:
+        row = self.db.query(ExamAttempts).filter(ExamAttempts.id == attempt_id).first()
+        if row is None:
+            return None
+        return attempt_to_domain(row)
+
+    # 試験記録と試験情報をJOINして1回のクエリで取得
+    def get_with_exam(self, attempt_id: int) -> tuple[ExamAttempt, Exam] | None:
+        row = (
+            self.db.query(ExamAttempts, Exams)
+            .join(Exams, ExamAttempts.exam_id == Exams.id)
+            .filter(ExamAttempts.id == attempt_id)
+            .first()
+        )
+        if row is None:
+            return None
+        return attempt_to_domain(row.ExamAttempts), exam_to_domain(row.Exams)
+
+    # 問題ごとの最新の回答を、問題・カテゴリーの情報と合わせて1回のクエリで取得（回答日時順）
+    # 最新の回答はウィンドウ関数で求める（問題ごとのMAX(answered_at)をサブクエリで求めて結合し直さない）
+    def get_latest_responses(self, attempt_id: int) -> list[ResponseDetail]:
+        latest = (
+            self.db.query(
+                QuestionResponses.id,
+                QuestionResponses.question_id,
+                QuestionResponses.answer_ids,
+                QuestionResponses.is_correct,
+                QuestionResponses.answered_at,
+                QuestionResponses.feedback,
+                func.row_number().over(
+                    partition_by=QuestionResponses.question_id,
+                    order_by=(QuestionResponses.answered_at.desc(), QuestionResponses.id.desc())
+                ).label("rn"),
+            )
+            .filter(QuestionResponses.attempt_id == attempt_id)
+            .subquery()
+        )
+        rows = (
+            self.db.query(latest, Questions, Categories.id.label("category_id"), Categories.category_name)
+            .join(Questions, Questions.id == latest.c.question_id)
+            .join(ExamCategories, Questions.exam_categories_id == ExamCategories.id)
+            .join(Categories, ExamCategories.category_id == Categories.id)
+            .filter(latest.c.rn == 1, Questions.deleted_at.is_(None))
+            .order_by(latest.c.answered_at, latest.c.id)
+        )
+        return [
+            ResponseDetail(
+                id=row.id,
+                question_id=row.question_id,
+                answer_ids=_load_json(row.answer_ids) or [],
+                is_correct=bool(row.is_correct),
+                answered_at=row.answered_at,
+                feedback=row.feedback,
+                question=to_domain(row.Questions),
+                category_id=row.category_id,
+                category_name=row.category_name
+            )
+            for row in rows
+        ]
+
+    # 複数問題の正解をIN句でまとめて取得（論理削除された問題は含めない）
+    def get_correct_keys(self, qids: list[int]) -> dict[int, list[int]]:
+        correct_keys = {}
+        for chunk in chunked(list(dict.fromkeys(qids)), QUESTION_BATCH_CHUNK_SIZE):
+            query = (
+                self.db.query(Questions.id, Questions.correct_key)
+                .filter(Questions.id.in_(chunk), Questions.deleted_at.is_(None))
+            )
+            for row in query:
+                correct_keys[row.id] = _load_json(row.correct_key) or []
+        return correct_keys
+
+    # 採点結果を複数行INSERTでまとめて保存し、試験記録を完了状態に更新してコミット
+    # answer_count は送信された回答の件数（採点しなかった回答を含む）
+    # 既に完了済み（同時に送信された場合を含む）の場合は何も保存せずFalseを返す
+    def finish(self, attempt_id: int, results: list[AnswerResult], answer_count: int) -> bool:
+        now = datetime.now()
+        try:
+            # 未完了の場合のみ更新することで、二重送信時に回答が重複して保存されるのを防ぐ
+            updated = (
+                self.db.query(ExamAttempts)
+                .filter(ExamAttempts.id == attempt_id, ExamAttempts.finished_at.is_(None))
+                .update({
+                    ExamAttempts.finished_at: now,
+                    ExamAttempts.answer_count: answer_count,
+                    ExamAttempts.correct_count: sum(1 for result in results if result.is_correct),
+                }, synchronize_session=False)
+            )
+            if updated == 0:
+                self.db.rollback()
+                return False
+            if results:
+                self.db.execute(QuestionResponses.__table__.insert().values([
+                    {
+                        "attempt_id": attempt_id,
+                        "question_id": result.question_id,
+                        "answer_ids": result.answer_ids,
+                        "is_correct": result.is_correct,
+                        "answered_at": now,
+                    }
+                    for result in results
+                ]))
+            self.db.commit()
+            return True
+        except Exception:
+            self.db.rollback()
+            raise
@@ -0,0 +1,281 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Protocol
+from domain.models import Question
+from domain.services import QuestionRepo
+
+# キャッシュ設定
+QUESTION_CACHE_ENABLED = os.environ.get("QUESTION_CACHE_ENABLED", "true").lower() == "true"
+QUESTION_CACHE_TTL_SECONDS = float(os.environ.get("QUESTION_CACHE_TTL_SECONDS", "300"))
+QUESTION_CACHE_MAX_SIZE = int(os.environ.get("QUESTION_CACHE_MAX_SIZE", "5000"))
+# TTL切れのエントリをバージョン（updated_at / deleted_at）の確認だけで延命できる、DBから読んでからの最大秒数
+# updated_at を更新せずに書き換えられた問題も、この秒数が経てば本文を読み直して反映される
+QUESTION_CACHE_MAX_AGE_SECONDS = float(os.environ.get("QUESTION_CACHE_MAX_AGE_SECONDS", "3600"))
+
+@dataclass
+class CacheEntry:
+    value: Any
+    version: Any
+    expires_at: float
+    loaded_at: float
+
+class LocalLRUCache:
+    """
+    プロセス内のLRUキャッシュ（TTL・件数上限付き）
+    Lambdaのウォームスタート間で再利用されるよう、モジュールレベルで1つだけ作成する
+    max_age はTTL切れのエントリを延命できる、値を設定してからの上限
+    """
+
+    def __init__(self, max_size: int, ttl: float, clock=time.monotonic, max_age: float = float("inf")):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_age = max_age
+        self._clock = clock
+        self._entries: OrderedDict[Any, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = dict(hits=0, misses=0, shared_hits=0, revalidations=0, evictions=0, invalidations=0)
+
+    def get_entry(self, key) -> CacheEntry | None:
+        """期限切れのエントリも返す（呼び出し側でバージョンを検証して延命できるように）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.expires_at > self._clock()
+
+    def can_revalidate(self, entry: CacheEntry) -> bool:
+        """値を設定してから max_age 以内か（超えたエントリはバージョンが同じでも読み直す）"""
+        return self._clock() - entry.loaded_at < self.max_age
+
+    def set(self, key, value, version) -> None:
+        with self._lock:
+            now = self._clock()
+            self._entries[key] = CacheEntry(value, version, now + self.ttl, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def refresh(self, key) -> None:
+        """バージョンが変わっていないことを確認したエントリのTTLを延長"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = self._clock() + self.ttl
+
+    def delete(self, key) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._counters["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def record(self, counter: str, count: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + count
+
+    def counters(self) -> dict[str, int]:
+        """ヒット・ミスなどの累積カウンター（infrastructure.metrics がリクエストごとの増分をEMFで出力する）"""
+        with self._lock:
+            return dict(self._counters)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters, size=len(self._entries), max_size=self.max_size, ttl=self.ttl,
+                         max_age=self.max_age)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+class SharedCache(Protocol):
+    # 複数のLambdaインスタンスで共有するキャッシュ（ElastiCacheなど）のインターフェース
+    def get(self, key: str) -> tuple[Any, Any] | None: ...
+    def set(self, key: str, value: Any, version: Any, ttl: float) -> None: ...
+    def delete(self, key: str) -> None: ...
+
+class InMemorySharedCache:
+    """SharedCacheのローカル実装（テスト・ローカル開発用の代替）"""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._items: dict[str, tuple[Any, Any, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[Any, Any] | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, version, expires_at = item
+            if expires_at <= self._clock():
+                del self._items[key]
+                return None
+            return value, version
+
+    def set(self, key: str, value: Any, version: Any, ttl: float) -> None:
+        with self._lock:
+            self._items[key] = (value, version, self._clock() + ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+class CachedQuestionRepo:
+    """
+    QuestionRepoのリードスルーキャッシュ
+    ローカル(LRU) → 共有キャッシュ → DB の順に参照し、TTL切れのエントリは
+    updated_at / deleted_at だけを読んでバージョンが同じなら本文を読み直さずに延命する
+
+    問題を書き換える処理は必ず updated_at も更新すること（SQLQuestionRepo.update・db/create-quiz は更新する）。
+    更新されない書き換え（手作業のSQLなど）は、延命の上限（QUESTION_CACHE_MAX_AGE_SECONDS）が経つまで反映されない
+    """
+
+    def __init__(self, repo: QuestionRepo, cache: LocalLRUCache, shared: SharedCache | None = None):
+        self.repo = repo
+        self.cache = cache
+        self.shared = shared
+
+    @staticmethod
+    def _shared_key(qid: int) -> str:
+        return f"question:{qid}"
+
+    @staticmethod
+    def _version_of(q: Question) -> tuple:
+        return (q.updated_at, q.deleted_at)
+
+    def get(self, qid: int) -> Question | None:
+        entry = self.cache.get_entry(qid)
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                self.cache.record("hits")
+                return replace(entry.value)
+            # TTL切れ: 延命の上限内ならバージョンのみを確認
+            if self.cache.can_revalidate(entry) and self.repo.get_version(qid) == entry.version:
+                self.cache.refresh(qid)
+                self.cache.record("revalidations")
+                self.cache.record("hits")
+                return replace(entry.value)
+            self.cache.delete(qid)
+        elif self.shared is not None:
+            item = self.shared.get(self._shared_key(qid))
+            if item is not None:
+                value, version = item
+                self.cache.set(qid, value, version)
+                self.cache.record("shared_hits")
+                self.cache.record("hits")
+                return replace(value)
+
+        self.cache.record("misses")
+        question = self.repo.get(qid)
+        if question is None:
+            return None
+        version = self._version_of(question)
+        self.cache.set(qid, question, version)
+        if self.shared is not None:
+            self.shared.set(self._shared_key(qid), question, version, self.cache.ttl)
+        return replace(question)
+
+    def get_many(self, qids: list[int]) -> list[Question]:
+        unique_ids = list(dict.fromkeys(qids))
+        found: dict[int, Question] = {}
+        stale: list[int] = []
+        missing: list[int] = []
+        for qid in unique_ids:
+            entry = self.cache.get_entry(qid)
+            if entry is None:
+                missing.append(qid)
+            elif self.cache.is_fresh(entry):
+                found[qid] = entry.value
+            elif self.cache.can_revalidate(entry):
+                stale.append(qid)
+            else:
+                self.cache.delete(qid)
+                missing.append(qid)
+
+        # TTL切れのエントリはバージョンだけを1回のクエリでまとめて確認
+        if stale:
+            versions = self.repo.get_versions(stale)
+            for qid in stale:
+                entry = self.cache.get_entry(qid)
+                if entry is not None and versions.get(qid) == entry.version:
+                    self.cache.refresh(qid)
+                    self.cache.record("revalidations")
+                    found[qid] = entry.value
+                else:
+                    self.cache.delete(qid)
+                    missing.append(qid)
+
+        if missing and self.shared is not None:
+            remaining = []
+            for qid in missing:
+                item = self.shared.get(self._shared_key(qid))
+                if item is None:
+                    remaining.append(qid)
+                    continue
+                value, version = item
+                self.cache.set(qid, value, version)
+                self.cache.record("shared_hits")
+                found[qid] = value
+            missing = remaining
+
+        self.cache.record("hits", len(found))
+        self.cache.record("misses", len(missing))
+
+        if missing:
+            for question in self.repo.get_many(missing):
+                version = self._version_of(question)
+                self.cache.set(question.id, question, version)
+                if self.shared is not None:
+                    self.shared.set(self._shared_key(question.id), question, version, self.cache.ttl)
+                found[question.id] = question
+
+        return [replace(found[qid]) for qid in unique_ids if qid in found]
+
+    # 条件付きGET（ETag）用のバージョン確認: TTL内のエントリはDBを読まずにキャッシュのバージョンを返す
+    def get_version(self, qid: int) -> tuple | None:
+        entry = self.cache.get_entry(qid)
+        if entry is not None and self.cache.is_fresh(entry):
+            return entry.version
+        return self.repo.get_version(qid)
+
+    def get_versions(self, qids: list[int]) -> dict[int, tuple]:
+        versions = {}
+        remaining = []
+        for qid in dict.fromkeys(qids):
+            entry = self.cache.get_entry(qid)
+            if entry is not None and self.cache.is_fresh(entry):
+                versions[qid] = entry.version
+            else:
+                remaining.append(qid)
+        if remaining:
+            versions.update(self.repo.get_versions(remaining))
+        return versions
+
+    def update(self, q: Question) -> Question:
+        updated = self.repo.update(q)
+        self.invalidate(q.id)
+        return updated
+
+    def delete(self, qid: int) -> None:
+        self.repo.delete(qid)
+        self.invalidate(qid)
+
+    def invalidate(self, qid: int) -> None:
+        """ローカル・共有の両方のキャッシュから削除"""
+        self.cache.delete(qid)
+        if self.shared is not None:
+            self.shared.delete(self._shared_key(qid))
+
+# Lambdaのウォームスタート間で共有するキャッシュ
+question_cache = LocalLRUCache(QUESTION_CACHE_MAX_SIZE, QUESTION_CACHE_TTL_SECONDS,
+                               max_age=QUESTION_CACHE_MAX_AGE_SECONDS)
+# 共有キャッシュを使う場合はここに設定する（例: ElastiCacheのクライアントをSharedCacheに適合させたもの）
+shared_question_cache: SharedCache | None = None
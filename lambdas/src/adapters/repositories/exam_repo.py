@@ -0,0 +1,97 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Enum, ForeignKey, func, select
+from sqlalchemy.orm import Session
+from infrastructure.db import Base
+from domain.models import ExamCategory
+from datetime import datetime
+
+class Exams(Base):
+    __tablename__ = "exams"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    exam_name = Column(String(255), nullable=False)
+    exam_code = Column(String(20), nullable=False)
+    level = Column(Enum('Foundational', 'Associate', 'Professional', 'Specialty'), nullable=True)
+    description = Column(Text, nullable=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    updated_at = Column(DateTime, nullable=True)
+
+class Categories(Base):
+    __tablename__ = "categories"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    category_name = Column(String(100), nullable=False)
+    description = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+
+class ExamCategories(Base):
+    __tablename__ = "exam_categories"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    # 論理削除されていない問題数（問題の挿入・論理削除と同じトランザクションで更新する）
+    question_count = Column(Integer, nullable=False, default=0)
+
+class SQLExamRepo:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # 試験のカテゴリー一覧と問題数を取得（問題数は exam_categories.question_count を読むだけで集計しない）
+    def get_categories(self, exam_id: int) -> list[ExamCategory]:
+        rows = (
+            self.db.query(ExamCategories.id, ExamCategories.question_count, Categories)
+            .join(Categories, ExamCategories.category_id == Categories.id)
+            .filter(ExamCategories.exam_id == exam_id)
+            .order_by(Categories.category_name)
+        )
+        return [
+            ExamCategory(
+                exam_categories_id=row.id,
+                category_id=row.Categories.id,
+                category_name=row.Categories.category_name,
+                description=row.Categories.description,
+                question_count=row.question_count
+            )
+            for row in rows
+        ]
+
+    # ---- 問題数の整合性チェック用 ----
+
+    # question_count と実際の問題数が一致しない試験カテゴリー
+    # Returns: (exam_categories_id, 保存されている問題数, 実際の問題数) のリスト
+    def find_question_count_drift(self) -> list[tuple[int, int, int]]:
+        # question_repo が exam_repo をインポートしているため、循環インポートを避けて関数内でインポート
+        from adapters.repositories.question_repo import Questions
+        actual = (
+            self.db.query(Questions.exam_categories_id, func.count(Questions.id).label("question_count"))
+            .filter(Questions.deleted_at.is_(None))
+            .group_by(Questions.exam_categories_id)
+            .subquery()
+        )
+        actual_count = func.coalesce(actual.c.question_count, 0)
+        rows = (
+            self.db.query(ExamCategories.id, ExamCategories.question_count, actual_count)
+            .outerjoin(actual, actual.c.exam_categories_id == ExamCategories.id)
+            .filter(ExamCategories.question_count != actual_count)
+            .order_by(ExamCategories.id)
+        )
+        return [(row[0], row[1], int(row[2])) for row in rows]
+
+    # 指定した試験カテゴリーの question_count を再集計した値で上書きしてコミット
+    # 集計をUPDATE文の中で行うため、確認後に問題が追加・削除されていても正しい値になる
+    def recount_questions(self, exam_categories_ids: list[int]) -> int:
+        from adapters.repositories.question_repo import Questions
+        if not exam_categories_ids:
+            return 0
+        actual = (
+            select(func.count(Questions.id))
+            .where(Questions.exam_categories_id == ExamCategories.id, Questions.deleted_at.is_(None))
+            .scalar_subquery()
+        )
+        try:
+            updated = self.db.query(ExamCategories).filter(ExamCategories.id.in_(exam_categories_ids)).update(
+                {ExamCategories.question_count: actual}, synchronize_session=False
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return updated
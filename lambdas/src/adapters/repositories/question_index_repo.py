@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from adapters.repositories.question_repo import Questions
+from adapters.repositories.exam_repo import ExamCategories
+
+# 出題用id索引の有効期限（期限切れ後はバージョンを確認し、変わっていなければ読み直さない）
+QUESTION_INDEX_TTL_SECONDS = float(os.environ.get("QUESTION_INDEX_TTL_SECONDS", "300"))
+
+@dataclass
+class ExamQuestionIndex:
+    exam_id: int
+    # カテゴリーIDごとの出題可能な（論理削除されていない）問題id
+    ids_by_category: dict[int, list[int]]
+    version: tuple
+    expires_at: float
+
+    def pools(self, category_ids: list[int]) -> dict[int, list[int]]:
+        return {category_id: self.ids_by_category.get(category_id, []) for category_id in dict.fromkeys(category_ids)}
+
+class SQLQuestionIndexRepo:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # 試験の出題可能な問題idをカテゴリーごとに取得（本文は読まない）
+    def load_live_ids(self, exam_id: int) -> dict[int, list[int]]:
+        rows = (
+            self.db.query(ExamCategories.category_id, Questions.id)
+            .join(ExamCategories, Questions.exam_categories_id == ExamCategories.id)
+            .filter(ExamCategories.exam_id == exam_id, Questions.deleted_at.is_(None))
+            .order_by(Questions.id)
+        )
+        ids_by_category: dict[int, list[int]] = {}
+        for category_id, question_id in rows:
+            ids_by_category.setdefault(category_id, []).append(question_id)
+        return ids_by_category
+
+    # 索引の再作成が必要かを判定するためのバージョン（追加・更新・論理削除で変化する）
+    def get_version(self, exam_id: int) -> tuple:
+        row = (
+            self.db.query(
+                func.count(Questions.id),
+                func.count(Questions.deleted_at),
+                func.max(Questions.id),
+                func.max(Questions.updated_at),
+                func.max(Questions.deleted_at),
+            )
+            .join(ExamCategories, Questions.exam_categories_id == ExamCategories.id)
+            .filter(ExamCategories.exam_id == exam_id)
+            .one()
+        )
+        return tuple(row)
+
+class QuestionIndexCache:
+    """
+    試験ごとの出題用id索引をプロセス内に保持するキャッシュ
+    出題のたびに ORDER BY RAND() で全件を並べ替える代わりに、この索引から抽出する
+    """
+
+    def __init__(self, ttl: float, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._indexes: dict[int, ExamQuestionIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, exam_id: int, repo: SQLQuestionIndexRepo) -> ExamQuestionIndex:
+        with self._lock:
+            index = self._indexes.get(exam_id)
+        now = self._clock()
+        if index is not None and index.expires_at > now:
+            return index
+
+        version = repo.get_version(exam_id)
+        if index is not None and index.version == version:
+            index.expires_at = now + self.ttl
+            return index
+
+        index = ExamQuestionIndex(exam_id, repo.load_live_ids(exam_id), version, now + self.ttl)
+        with self._lock:
+            self._indexes[exam_id] = index
+        return index
+
+    def invalidate(self, exam_id: int | None = None) -> None:
+        with self._lock:
+            if exam_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(exam_id, None)
+
+# Lambdaのウォームスタート間で共有する索引
+question_index_cache = QuestionIndexCache(QUESTION_INDEX_TTL_SECONDS)
@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, Text, JSON, DateTime, ForeignKey
+import json
+import os
+from sqlalchemy import Column, Integer, Text, JSON, DateTime, ForeignKey, select
 from sqlalchemy.orm import Session
 from infrastructure.db import Base
+from adapters.repositories.exam_repo import ExamCategories
 from domain.models import Question
 from datetime import datetime
 
+# IN句1回あたりのid数（Data APIのSQL長・レスポンスサイズの上限に収まるように分割する）
+QUESTION_BATCH_CHUNK_SIZE = int(os.environ.get("QUESTION_BATCH_CHUNK_SIZE", "200"))
+
 class Questions(Base):
     __tablename__ = "questions"
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -16,6 +22,29 @@ class Questions(Base):
     updated_at = Column(DateTime, nullable=True)
     deleted_at = Column(DateTime, nullable=True)
 
+def _load_json(value):
+    # Data API経由ではJSONカラムが文字列で返る場合があるため、両方に対応
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
+def to_domain(row: Questions) -> Question:
+    """ORMの行をドメインモデルに変換"""
+    return Question(
+        id=row.id,
+        body=row.body,
+        explanation=row.explanation,
+        choices=_load_json(row.choices) or [],
+        correct_key=_load_json(row.correct_key) or [],
+        exam_categories_id=row.exam_categories_id,
+        updated_at=row.updated_at,
+        deleted_at=row.deleted_at
+    )
+
+def chunked(ids: list[int], size: int):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
 class SQLQuestionRepo:
     def __init__(self, db: Session):
         self.db = db
@@ -23,11 +52,58 @@ class SQLQuestionRepo:
     # QuestionRepoインターフェースの実装
     # 該当idのQuestionsデータを取得
     def get(self, qid: int) -> Question | None:
-        print(f"Getting question with id: {qid}")
         row = self.db.query(Questions).filter(Questions.id == qid).first()
         if row is None:
             return None
-        return Question(
-            id=row.id,
-            body=row.body
-        )
+        return to_domain(row)
+
+    # 複数idのQuestionsデータをIN句でまとめて取得（引数の順序で返す）
+    def get_many(self, qids: list[int]) -> list[Question]:
+        unique_ids = list(dict.fromkeys(qids))
+        rows = {}
+        for chunk in chunked(unique_ids, QUESTION_BATCH_CHUNK_SIZE):
+            for row in self.db.query(Questions).filter(Questions.id.in_(chunk)):
+                rows[row.id] = to_domain(row)
+        return [rows[qid] for qid in unique_ids if qid in rows]
+
+    # 該当idの更新日時・削除日時のみを取得（本文を読まずにキャッシュを検証するため）
+    def get_version(self, qid: int) -> tuple | None:
+        row = self.db.query(Questions.updated_at, Questions.deleted_at).filter(Questions.id == qid).first()
+        if row is None:
+            return None
+        return (row.updated_at, row.deleted_at)
+
+    # 複数idの更新日時・削除日時をまとめて取得
+    def get_versions(self, qids: list[int]) -> dict[int, tuple]:
+        versions = {}
+        for chunk in chunked(list(dict.fromkeys(qids)), QUESTION_BATCH_CHUNK_SIZE):
+            query = self.db.query(Questions.id, Questions.updated_at, Questions.deleted_at).filter(Questions.id.in_(chunk))
+            for row in query:
+                versions[row.id] = (row.updated_at, row.deleted_at)
+        return versions
+
+    # 問題文を更新し、updated_atを進める（キャッシュの検証に使われる）
+    def update(self, q: Question) -> Question:
+        row = self.db.query(Questions).filter(Questions.id == q.id).first()
+        if row is None:
+            raise KeyError(q.id)
+        row.body = q.body
+        row.updated_at = datetime.now()
+        self.db.commit()
+        return to_domain(row)
+
+    # 論理削除（deleted_atを設定）し、同じトランザクションでカテゴリーの問題数を減らす
+    def delete(self, qid: int) -> None:
+        try:
+            deleted = self.db.query(Questions).filter(Questions.id == qid, Questions.deleted_at.is_(None)).update(
+                {Questions.deleted_at: datetime.now()}, synchronize_session=False
+            )
+            if deleted:
+                exam_categories_id = select(Questions.exam_categories_id).where(Questions.id == qid).scalar_subquery()
+                self.db.query(ExamCategories).filter(ExamCategories.id == exam_categories_id).update(
+                    {ExamCategories.question_count: ExamCategories.question_count - 1}, synchronize_session=False
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
@@ -0,0 +1,379 @@
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Integer, String, func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+from infrastructure.db import Base
+from domain.stats import LatestAnswer, ResponseEvent, RollupDelta
+from adapters.repositories.question_repo import QUESTION_BATCH_CHUNK_SIZE, Questions, chunked
+from adapters.repositories.exam_repo import Categories, ExamCategories, Exams
+from adapters.repositories.attempt_repo import ExamAttempts, QuestionResponses
+
+# 1回の集計で読み込む回答数
+STATS_BATCH_SIZE = int(os.environ.get("STATS_BATCH_SIZE", "5000"))
+# INSERT直後の回答はコミット順がidの順と前後する可能性があるため、この秒数より新しい回答に到達したら走査を止めて次回に回す
+STATS_LAG_SECONDS = int(os.environ.get("STATS_LAG_SECONDS", "60"))
+# 開始からこの時間が経っても完了していない試験は放棄されたものとして集計しない
+STATS_ABANDONED_ATTEMPT_HOURS = int(os.environ.get("STATS_ABANDONED_ATTEMPT_HOURS", "24"))
+
+RESPONSES_WATERMARK = "question_responses"
+
+# 統計のロールアップテーブル（question_responses の集計結果）
+
+class StatsUserExam(Base):
+    __tablename__ = "stats_user_exam"
+    # ユーザー×試験ごとの、問題ごとの最新の回答に基づく回答問題数・正答数
+    user_id = Column(Integer, primary_key=True)
+    exam_id = Column(Integer, primary_key=True)
+    answered_questions = Column(Integer, nullable=False, default=0)
+    correct_answers = Column(Integer, nullable=False, default=0)
+    last_answered_at = Column(DateTime, nullable=True)
+
+class StatsUserQuestionLatest(Base):
+    __tablename__ = "stats_user_question_latest"
+    # ユーザー×問題ごとの最新の回答（stats_user_exam を差分で更新するために保持）
+    user_id = Column(Integer, primary_key=True)
+    question_id = Column(Integer, primary_key=True)
+    exam_id = Column(Integer, nullable=False)
+    response_id = Column(BigInteger, nullable=False)
+    answered_at = Column(DateTime, nullable=False)
+    is_correct = Column(Boolean, nullable=False)
+
+class StatsQuestion(Base):
+    __tablename__ = "stats_question"
+    # 問題ごとの全回答数・正答数
+    question_id = Column(Integer, primary_key=True, autoincrement=False)
+    response_count = Column(Integer, nullable=False, default=0)
+    correct_count = Column(Integer, nullable=False, default=0)
+
+class StatsExamCategory(Base):
+    __tablename__ = "stats_exam_category"
+    # 試験×カテゴリーごとの全回答数・正答数
+    exam_categories_id = Column(Integer, primary_key=True, autoincrement=False)
+    exam_id = Column(Integer, nullable=False, index=True)
+    category_id = Column(Integer, nullable=False)
+    response_count = Column(Integer, nullable=False, default=0)
+    correct_count = Column(Integer, nullable=False, default=0)
+
+class StatsPendingAttempts(Base):
+    __tablename__ = "stats_pending_attempts"
+    # ウォーターマークが回答を通り過ぎた時点で回答中だった試験（完了後に、ウォーターマーク以前の回答を集計する）
+    attempt_id = Column(Integer, primary_key=True, autoincrement=False)
+    started_at = Column(DateTime, nullable=False)
+
+class StatsWatermarks(Base):
+    __tablename__ = "stats_watermarks"
+    # 集計済みの最後のid
+    name = Column(String(64), primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
+
+def _upsert_counts(table, rows: list[dict], *columns: str):
+    """件数のカラムは既存の値に加算するUPSERT（INSERT ... ON DUPLICATE KEY UPDATE）"""
+    stmt = mysql_insert(table).values(rows)
+    return stmt.on_duplicate_key_update({column: table.c[column] + stmt.inserted[column] for column in columns})
+
+class SQLStatsRepo:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ---- 集計ジョブ用 ----
+
+    # ウォーターマークを行ロック付きで取得（存在しない場合は0で作成）
+    # ロックはコミットまで保持されるため、集計ジョブが同時に実行されても二重に加算されない
+    def lock_watermark(self, name: str = RESPONSES_WATERMARK) -> int:
+        table = StatsWatermarks.__table__
+        stmt = mysql_insert(table).values(name=name, last_id=0)
+        self.db.execute(stmt.on_duplicate_key_update(name=stmt.inserted.name))
+        return self.db.query(StatsWatermarks.last_id).filter(StatsWatermarks.name == name).with_for_update().scalar()
+
+    def get_watermark(self, name: str = RESPONSES_WATERMARK) -> int:
+        return self.db.query(StatsWatermarks.last_id).filter(StatsWatermarks.name == name).scalar() or 0
+
+    def set_watermark(self, last_id: int, name: str = RESPONSES_WATERMARK) -> None:
+        self.db.query(StatsWatermarks).filter(StatsWatermarks.name == name).update(
+            {StatsWatermarks.last_id: last_id, StatsWatermarks.updated_at: datetime.now()},
+            synchronize_session=False
+        )
+
+    # 回答を試験記録・問題・カテゴリーと結合するクエリ
+    def _response_rows(self):
+        return (
+            self.db.query(
+                QuestionResponses.id,
+                QuestionResponses.attempt_id,
+                QuestionResponses.question_id,
+                QuestionResponses.is_correct,
+                QuestionResponses.answered_at,
+                ExamAttempts.user_id,
+                ExamAttempts.started_at,
+                ExamAttempts.finished_at,
+                Questions.exam_categories_id,
+                ExamCategories.exam_id,
+                ExamCategories.category_id,
+            )
+            .join(ExamAttempts, QuestionResponses.attempt_id == ExamAttempts.id)
+            .join(Questions, QuestionResponses.question_id == Questions.id)
+            .join(ExamCategories, Questions.exam_categories_id == ExamCategories.id)
+        )
+
+    @staticmethod
+    def _to_event(row) -> ResponseEvent:
+        return ResponseEvent(
+            response_id=row.id,
+            user_id=row.user_id,
+            question_id=row.question_id,
+            exam_id=row.exam_id,
+            exam_categories_id=row.exam_categories_id,
+            category_id=row.category_id,
+            is_correct=bool(row.is_correct),
+            answered_at=row.answered_at
+        )
+
+    # ウォーターマークより新しい回答をid順に取得
+    # 回答中の試験の回答は読み飛ばし、試験を保留中として返す（完了後に fetch_pending_responses で集計する）
+    # Returns: (集計対象の回答, 新しいウォーターマーク, 保留する試験id → 開始日時)
+    def fetch_new_responses(self, after_id: int,
+                            limit: int = STATS_BATCH_SIZE) -> tuple[list[ResponseEvent], int, dict[int, datetime]]:
+        now = datetime.now()
+        rows = (
+            self._response_rows()
+            .filter(QuestionResponses.id > after_id)
+            .order_by(QuestionResponses.id)
+            .limit(limit)
+            .all()
+        )
+        lag_cutoff = now - timedelta(seconds=STATS_LAG_SECONDS)
+        abandoned_before = now - timedelta(hours=STATS_ABANDONED_ATTEMPT_HOURS)
+        events = []
+        pending = {}
+        watermark = after_id
+        for row in rows:
+            # 新しすぎる回答に到達したら止める（より小さいidの回答がまだコミットされていない可能性があるため）
+            if row.answered_at > lag_cutoff:
+                break
+            watermark = row.id
+            if row.finished_at is None:
+                # 放棄された試験の回答は集計しない
+                if row.started_at > abandoned_before:
+                    pending[row.attempt_id] = row.started_at
+                continue
+            events.append(self._to_event(row))
+        return events, watermark, pending
+
+    # 保留中の試験のうち完了したものの、ウォーターマーク以前の回答を取得
+    # （ウォーターマークより新しい回答は fetch_new_responses で集計される）
+    # Returns: (集計対象の回答, 保留を解除する試験id（完了・放棄）)
+    def fetch_pending_responses(self, watermark: int) -> tuple[list[ResponseEvent], list[int]]:
+        abandoned_before = datetime.now() - timedelta(hours=STATS_ABANDONED_ATTEMPT_HOURS)
+        finished = []
+        resolved = []
+        rows = (
+            self.db.query(StatsPendingAttempts.attempt_id, ExamAttempts.started_at, ExamAttempts.finished_at)
+            .outerjoin(ExamAttempts, StatsPendingAttempts.attempt_id == ExamAttempts.id)
+        )
+        for row in rows:
+            if row.finished_at is not None:
+                finished.append(row.attempt_id)
+                resolved.append(row.attempt_id)
+            elif row.started_at is None or row.started_at <= abandoned_before:
+                resolved.append(row.attempt_id)
+
+        events = []
+        for chunk in chunked(finished, QUESTION_BATCH_CHUNK_SIZE):
+            query = (
+                self._response_rows()
+                .filter(QuestionResponses.attempt_id.in_(chunk), QuestionResponses.id <= watermark)
+                .order_by(QuestionResponses.id)
+            )
+            events.extend(self._to_event(row) for row in query)
+        return events, resolved
+
+    def add_pending_attempts(self, attempts: dict[int, datetime]) -> None:
+        if not attempts:
+            return
+        stmt = mysql_insert(StatsPendingAttempts.__table__).values([
+            {"attempt_id": attempt_id, "started_at": started_at} for attempt_id, started_at in attempts.items()
+        ])
+        self.db.execute(stmt.on_duplicate_key_update(attempt_id=stmt.inserted.attempt_id))
+
+    def remove_pending_attempts(self, attempt_ids: list[int]) -> None:
+        for chunk in chunked(attempt_ids, QUESTION_BATCH_CHUNK_SIZE):
+            self.db.query(StatsPendingAttempts).filter(StatsPendingAttempts.attempt_id.in_(chunk)).delete(
+                synchronize_session=False
+            )
+
+    # ユーザー×問題ごとの保存済みの最新の回答を取得
+    def get_latest_answers(self, keys: list[tuple[int, int]]) -> dict[tuple[int, int], LatestAnswer]:
+        latest = {}
+        wanted = set(keys)
+        user_ids = list({user_id for user_id, _ in keys})
+        question_ids = list({question_id for _, question_id in keys})
+        for user_chunk in chunked(user_ids, QUESTION_BATCH_CHUNK_SIZE):
+            for question_chunk in chunked(question_ids, QUESTION_BATCH_CHUNK_SIZE):
+                query = self.db.query(StatsUserQuestionLatest).filter(
+                    StatsUserQuestionLatest.user_id.in_(user_chunk),
+                    StatsUserQuestionLatest.question_id.in_(question_chunk)
+                )
+                for row in query:
+                    key = (row.user_id, row.question_id)
+                    if key in wanted:
+                        latest[key] = LatestAnswer(row.user_id, row.question_id, row.exam_id,
+                                                   row.response_id, row.answered_at, bool(row.is_correct))
+        return latest
+
+    # 差分をロールアップテーブルにテーブルごとに1回の複数行UPSERTで加算
+    def apply_delta(self, delta: RollupDelta) -> None:
+        if delta.questions:
+            self.db.execute(_upsert_counts(StatsQuestion.__table__, [
+                {"question_id": question_id, "response_count": counts.response_count,
+                 "correct_count": counts.correct_count}
+                for question_id, counts in delta.questions.items()
+            ], "response_count", "correct_count"))
+
+        if delta.exam_categories:
+            self.db.execute(_upsert_counts(StatsExamCategory.__table__, [
+                {"exam_categories_id": exam_categories_id,
+                 "exam_id": delta.exam_category_keys[exam_categories_id][0],
+                 "category_id": delta.exam_category_keys[exam_categories_id][1],
+                 "response_count": counts.response_count, "correct_count": counts.correct_count}
+                for exam_categories_id, counts in delta.exam_categories.items()
+            ], "response_count", "correct_count"))
+
+        if delta.user_exams:
+            table = StatsUserExam.__table__
+            stmt = mysql_insert(table).values([
+                {"user_id": user_id, "exam_id": exam_id, "answered_questions": user_exam.answered_questions,
+                 "correct_answers": user_exam.correct_answers, "last_answered_at": user_exam.last_answered_at}
+                for (user_id, exam_id), user_exam in delta.user_exams.items()
+            ])
+            self.db.execute(stmt.on_duplicate_key_update(
+                answered_questions=table.c.answered_questions + stmt.inserted.answered_questions,
+                correct_answers=table.c.correct_answers + stmt.inserted.correct_answers,
+                last_answered_at=func.greatest(func.coalesce(table.c.last_answered_at, stmt.inserted.last_answered_at),
+                                               stmt.inserted.last_answered_at),
+            ))
+
+        if delta.latest:
+            table = StatsUserQuestionLatest.__table__
+            stmt = mysql_insert(table).values([
+                {"user_id": latest.user_id, "question_id": latest.question_id, "exam_id": latest.exam_id,
+                 "response_id": latest.response_id, "answered_at": latest.answered_at,
+                 "is_correct": latest.is_correct}
+                for latest in delta.latest.values()
+            ])
+            self.db.execute(stmt.on_duplicate_key_update(
+                exam_id=stmt.inserted.exam_id,
+                response_id=stmt.inserted.response_id,
+                answered_at=stmt.inserted.answered_at,
+                is_correct=stmt.inserted.is_correct,
+            ))
+
+    # ロールアップテーブルを空にしてウォーターマークを0に戻す
+    def reset(self) -> None:
+        for model in (StatsUserExam, StatsUserQuestionLatest, StatsQuestion, StatsExamCategory, StatsPendingAttempts):
+            self.db.query(model).delete(synchronize_session=False)
+        self.lock_watermark()
+        self.set_watermark(0)
+
+    # ---- 参照用 ----
+
+    # ユーザーの試験ごとの統計（有効な試験のみ、試験名順）
+    # Returns: (試験, 出題可能な問題数, 回答した問題数, 正答数) のリスト
+    def get_user_exam_stats(self, user_id: int) -> list[tuple[Exams, int, int, int]]:
+        question_counts = (
+            self.db.query(ExamCategories.exam_id, func.sum(ExamCategories.question_count).label("total_questions"))
+            .group_by(ExamCategories.exam_id)
+            .subquery()
+        )
+        rows = (
+            self.db.query(Exams, question_counts.c.total_questions,
+                          StatsUserExam.answered_questions, StatsUserExam.correct_answers)
+            .outerjoin(question_counts, question_counts.c.exam_id == Exams.id)
+            .outerjoin(StatsUserExam, (StatsUserExam.exam_id == Exams.id) & (StatsUserExam.user_id == user_id))
+            .filter(Exams.is_active.is_(True))
+            .order_by(Exams.exam_name)
+        )
+        return [(row.Exams, int(row.total_questions or 0), row.answered_questions or 0, row.correct_answers or 0)
+                for row in rows]
+
+    def get_question_stats(self, question_id: int) -> StatsQuestion | None:
+        return self.db.query(StatsQuestion).filter(StatsQuestion.question_id == question_id).first()
+
+    # 試験のカテゴリーごとの統計（回答のないカテゴリーも0件として含める）
+    def get_exam_category_stats(self, exam_id: int) -> list[tuple[int, str, int, int]]:
+        rows = (
+            self.db.query(Categories.id.label("category_id"), Categories.category_name,
+                          StatsExamCategory.response_count, StatsExamCategory.correct_count)
+            .select_from(ExamCategories)
+            .join(Categories, ExamCategories.category_id == Categories.id)
+            .outerjoin(StatsExamCategory, StatsExamCategory.exam_categories_id == ExamCategories.id)
+            .filter(ExamCategories.exam_id == exam_id)
+            .order_by(Categories.id)
+        )
+        return [(row.category_id, row.category_name, row.response_count or 0, row.correct_count or 0) for row in rows]
+
+    # ---- 整合性チェック用（生データから集計し直す） ----
+
+    # 保留中の試験は、完了していても次回の集計までロールアップに含まれないため除く
+    def _finished_responses(self, watermark: int):
+        return (
+            self.db.query(QuestionResponses)
+            .join(ExamAttempts, QuestionResponses.attempt_id == ExamAttempts.id)
+            .filter(QuestionResponses.id <= watermark, ExamAttempts.finished_at.isnot(None),
+                    QuestionResponses.attempt_id.notin_(select(StatsPendingAttempts.attempt_id)))
+        )
+
+    def raw_question_counts(self, watermark: int) -> dict[int, tuple[int, int]]:
+        rows = (
+            self._finished_responses(watermark)
+            .with_entities(QuestionResponses.question_id, func.count(QuestionResponses.id),
+                           func.sum(QuestionResponses.is_correct, type_=Integer))
+            .group_by(QuestionResponses.question_id)
+        )
+        return {row[0]: (int(row[1]), int(row[2] or 0)) for row in rows}
+
+    def raw_exam_category_counts(self, watermark: int) -> dict[int, tuple[int, int]]:
+        rows = (
+            self._finished_responses(watermark)
+            .join(Questions, QuestionResponses.question_id == Questions.id)
+            .with_entities(Questions.exam_categories_id, func.count(QuestionResponses.id),
+                           func.sum(QuestionResponses.is_correct, type_=Integer))
+            .group_by(Questions.exam_categories_id)
+        )
+        return {row[0]: (int(row[1]), int(row[2] or 0)) for row in rows}
+
+    def raw_user_exam_counts(self, watermark: int) -> dict[tuple[int, int], tuple[int, int]]:
+        latest = (
+            self._finished_responses(watermark)
+            .join(Questions, QuestionResponses.question_id == Questions.id)
+            .join(ExamCategories, Questions.exam_categories_id == ExamCategories.id)
+            .with_entities(
+                ExamAttempts.user_id,
+                ExamCategories.exam_id,
+                QuestionResponses.is_correct,
+                func.row_number().over(
+                    partition_by=(ExamAttempts.user_id, QuestionResponses.question_id),
+                    order_by=(QuestionResponses.answered_at.desc(), QuestionResponses.id.desc())
+                ).label("rn"),
+            )
+            .subquery()
+        )
+        rows = (
+            self.db.query(latest.c.user_id, latest.c.exam_id, func.count(),
+                          func.sum(latest.c.is_correct, type_=Integer))
+            .filter(latest.c.rn == 1)
+            .group_by(latest.c.user_id, latest.c.exam_id)
+        )
+        return {(row[0], row[1]): (int(row[2]), int(row[3] or 0)) for row in rows}
+
+    def rollup_question_counts(self) -> dict[int, tuple[int, int]]:
+        return {row.question_id: (row.response_count, row.correct_count) for row in self.db.query(StatsQuestion)}
+
+    def rollup_exam_category_counts(self) -> dict[int, tuple[int, int]]:
+        return {row.exam_categories_id: (row.response_count, row.correct_count)
+                for row in self.db.query(StatsExamCategory)}
+
+    def rollup_user_exam_counts(self) -> dict[tuple[int, int], tuple[int, int]]:
+        return {(row.user_id, row.exam_id): (row.answered_questions, row.correct_answers)
+                for row in self.db.query(StatsUserExam)}
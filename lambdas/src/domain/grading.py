@@ -0,0 +1,49 @@
+from .models import AnswerResult, CategoryScore, ResponseDetail
+
+# 回答の採点ロジック（DBに依存しない）
+
+def is_answer_correct(answer_ids: list[int], correct_key: list[int]) -> bool:
+    """選択した選択肢IDの集合が正解の集合と一致するかを判定（順序は問わない）"""
+    return set(answer_ids) == set(correct_key)
+
+def grade_answers(answers: dict[int, list[int]], correct_keys: dict[int, list[int]],
+                  question_ids: list[int] | None = None) -> tuple[list[AnswerResult], list[int]]:
+    """
+    回答をまとめて採点する
+
+    Args:
+        answers: 問題IDごとの選択した選択肢ID
+        correct_keys: 問題IDごとの正解の選択肢ID
+        question_ids: 採点対象の問題ID（試験記録の出題問題）。指定した場合、それ以外の問題への回答は採点しない
+
+    Returns:
+        (採点結果のリスト, 出題されていない・問題が見つからないため採点しなかった問題IDのリスト)
+    """
+    allowed = set(question_ids) if question_ids is not None else None
+    results = []
+    skipped = []
+    for question_id, answer_ids in answers.items():
+        correct_key = correct_keys.get(question_id)
+        if correct_key is None or (allowed is not None and question_id not in allowed):
+            skipped.append(question_id)
+            continue
+        results.append(AnswerResult(question_id, answer_ids, is_answer_correct(answer_ids, correct_key)))
+    return results, skipped
+
+def score_percentage(correct_count: int, total_count: int) -> float:
+    """正答率（%、小数点以下1桁）"""
+    return round(correct_count * 100 / total_count, 1) if total_count else 0.0
+
+def summarize_by_category(responses: list[ResponseDetail]) -> list[CategoryScore]:
+    """回答を1回走査してカテゴリーごとの正答数・回答数・正答率を集計（最初に出現した順）"""
+    scores: dict[int, CategoryScore] = {}
+    for response in responses:
+        score = scores.get(response.category_id)
+        if score is None:
+            score = scores[response.category_id] = CategoryScore(response.category_id, response.category_name)
+        score.total_count += 1
+        if response.is_correct:
+            score.correct_count += 1
+    for score in scores.values():
+        score.percentage = score_percentage(score.correct_count, score.total_count)
+    return list(scores.values())
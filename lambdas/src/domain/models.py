@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import datetime
 
 # ドメインモデル
 
@@ -6,3 +7,62 @@ from dataclasses import dataclass
 class Question:
     id: int | None
     body: str
+    explanation: str | None = None
+    choices: list[dict] = field(default_factory=list)
+    correct_key: list[int] = field(default_factory=list)
+    exam_categories_id: int | None = None
+    updated_at: datetime | None = None
+    deleted_at: datetime | None = None
+
+@dataclass
+class ExamAttempt:
+    id: int
+    user_id: int
+    exam_id: int
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    answer_count: int | None = None
+    correct_count: int | None = None
+    question_ids: list[int] = field(default_factory=list)
+
+@dataclass
+class AnswerResult:
+    question_id: int
+    answer_ids: list[int]
+    is_correct: bool
+
+@dataclass
+class Exam:
+    id: int
+    exam_name: str
+    exam_code: str
+    level: str | None = None
+    description: str | None = None
+
+@dataclass
+class ResponseDetail:
+    id: int
+    question_id: int
+    answer_ids: list[int]
+    is_correct: bool
+    answered_at: datetime | None
+    feedback: str | None
+    question: Question
+    category_id: int
+    category_name: str
+
+@dataclass
+class CategoryScore:
+    category_id: int
+    category_name: str
+    correct_count: int = 0
+    total_count: int = 0
+    percentage: float = 0.0
+
+@dataclass
+class ExamCategory:
+    exam_categories_id: int
+    category_id: int
+    category_name: str
+    description: str | None = None
+    question_count: int = 0
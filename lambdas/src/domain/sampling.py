@@ -0,0 +1,69 @@
+import random
+from bisect import bisect_right
+from itertools import accumulate
+
+# 問題のランダム抽出ロジック（DBに依存しない）
+
+def allocate_quotas(weights: dict[int, float], capacities: dict[int, int], count: int) -> dict[int, int]:
+    """
+    出題数を重みに比例してカテゴリーに割り当てる（最大剰余方式）
+    カテゴリーの問題数（capacities）を超えた分は、まだ余裕のあるカテゴリーに再配分する
+    """
+    count = min(count, sum(capacities.values()))
+    quotas = {category_id: 0 for category_id in capacities}
+    remaining = count
+    active = {category_id for category_id, weight in weights.items()
+              if weight > 0 and capacities.get(category_id, 0) > 0}
+    while remaining > 0 and active:
+        total_weight = sum(weights[category_id] for category_id in active)
+        exact = {category_id: remaining * weights[category_id] / total_weight for category_id in active}
+        shares = {category_id: int(value) for category_id, value in exact.items()}
+        # 端数の大きい順に1問ずつ追加
+        leftover = remaining - sum(shares.values())
+        for category_id in sorted(active, key=lambda c: exact[c] - shares[c], reverse=True)[:leftover]:
+            shares[category_id] += 1
+        for category_id, share in shares.items():
+            granted = min(share, capacities[category_id] - quotas[category_id])
+            quotas[category_id] += granted
+            remaining -= granted
+        active = {category_id for category_id in active if quotas[category_id] < capacities[category_id]}
+    return quotas
+
+def sample_uniform(pools: dict[int, list[int]], count: int,
+                   rng: random.Random) -> tuple[list[int], dict[int, int]]:
+    """
+    選択カテゴリー全体から一様に非復元抽出する
+    idの連結リストを作らず、通し番号を抽出してからカテゴリー内の位置に変換する
+
+    Returns:
+        (抽出したidのリスト, カテゴリーごとの抽出数)
+    """
+    category_ids = list(pools)
+    boundaries = list(accumulate(len(pools[category_id]) for category_id in category_ids))
+    total = boundaries[-1] if boundaries else 0
+    picked = []
+    counts = {category_id: 0 for category_id in category_ids}
+    for position in rng.sample(range(total), min(count, total)):
+        index = bisect_right(boundaries, position)
+        offset = position - (boundaries[index - 1] if index else 0)
+        picked.append(pools[category_ids[index]][offset])
+        counts[category_ids[index]] += 1
+    return picked, counts
+
+def sample_with_quotas(pools: dict[int, list[int]], quotas: dict[int, int],
+                       rng: random.Random) -> tuple[list[int], dict[int, int]]:
+    """
+    カテゴリーごとの出題数に従って非復元抽出し、全体をシャッフルする
+
+    Returns:
+        (抽出したidのリスト, カテゴリーごとの抽出数)
+    """
+    picked = []
+    counts = {category_id: 0 for category_id in pools}
+    for category_id, quota in quotas.items():
+        pool = pools.get(category_id, [])
+        chosen = rng.sample(pool, min(quota, len(pool)))
+        picked.extend(chosen)
+        counts[category_id] = len(chosen)
+    rng.shuffle(picked)
+    return picked, counts
@@ -1,7 +1,123 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Literal
+from pydantic import BaseModel, Field
 
 # DTO、APIのリクエストやレスポンスで使用するスキーマを定義
  
+class Choice(BaseModel):
+    choice_id: int
+    choice_text: str
+
 class QuestionRead(BaseModel):
     id: int
     body: str
+    explanation: str | None = None
+    choices: list[Choice] = []
+    correct_key: list[int] = []
+    exam_categories_id: int | None = None
+
+class QuestionSampleRequest(BaseModel):
+    category_ids: list[int]
+    count: int = Field(gt=0, le=1000)
+    # uniform: 選択カテゴリー全体から一様に抽出
+    # proportional: weights（省略時は各カテゴリーの問題数）に比例してカテゴリーごとの出題数を決めて抽出
+    mode: Literal["uniform", "proportional"] = "uniform"
+    weights: dict[int, float] | None = None
+
+class QuestionSampleResponse(BaseModel):
+    questions: list[QuestionRead]
+    category_counts: dict[int, int]
+
+class AnswerSubmit(BaseModel):
+    question_id: int
+    answer_ids: list[int]
+
+class AttemptSubmitRequest(BaseModel):
+    user_id: int
+    answers: list[AnswerSubmit] = Field(max_length=1000)
+
+class AnswerResultRead(BaseModel):
+    question_id: int
+    is_correct: bool
+
+class AttemptSubmitResponse(BaseModel):
+    attempt_id: int
+    total_questions: int
+    correct_count: int
+    results: list[AnswerResultRead]
+    # 試験記録の出題問題でない、または問題が存在しない（削除済みを含む）ため採点しなかった問題ID
+    skipped_question_ids: list[int] = []
+
+class ExamRead(BaseModel):
+    id: int
+    exam_name: str
+    exam_code: str
+    level: str | None = None
+    description: str | None = None
+
+class ExamAttemptRead(BaseModel):
+    id: int
+    user_id: int
+    exam_id: int
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    answer_count: int | None = None
+    correct_count: int | None = None
+    question_ids: list[int] = []
+
+class QuestionResponseRead(BaseModel):
+    id: int
+    question_id: int
+    answer_ids: list[int]
+    is_correct: bool
+    answered_at: datetime | None = None
+    feedback: str | None = None
+    question: QuestionRead
+    category_id: int
+    category_name: str
+
+class CategoryScoreRead(BaseModel):
+    category_id: int
+    category_name: str
+    correct_count: int
+    total_count: int
+    percentage: float
+
+class AttemptResultsResponse(BaseModel):
+    attempt: ExamAttemptRead
+    exam: ExamRead
+    responses: list[QuestionResponseRead]
+    category_scores: list[CategoryScoreRead]
+    correct_count: int
+    total_count: int
+    percentage: float
+
+class UserExamStatsRead(ExamRead):
+    total_questions: int
+    user_correct_answers: int
+    user_total_answers: int
+    user_accuracy_rate: int
+
+class QuestionStatsRead(BaseModel):
+    question_id: int
+    response_count: int
+    correct_count: int
+    accuracy_rate: int
+
+class CategoryStatsRead(BaseModel):
+    category_id: int
+    category_name: str
+    response_count: int
+    correct_count: int
+    accuracy_rate: int
+
+class ExamCategoryRead(BaseModel):
+    exam_categories_id: int
+    category_id: int
+    category_name: str
+    description: str | None = None
+    question_count: int
+
+class ExamCategoriesResponse(BaseModel):
+    categories: list[ExamCategoryRead]
+    total_questions: int
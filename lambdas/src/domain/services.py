@@ -7,4 +7,9 @@ class QuestionRepo(Protocol):
     def add(self, q: Question) -> Question: ...
     def update(self, q: Question) -> Question: ...
     def delete(self, qid: int) -> None: ...
-    def get(self, qid: int) -> Question | None: ...
\ No newline at end of file
+    def get(self, qid: int) -> Question | None: ...
+    # 複数idをまとめて取得（存在しないidは除外し、引数の順序で返す）
+    def get_many(self, qids: list[int]) -> list[Question]: ...
+    # キャッシュの検証用に、更新日時と削除日時だけを取得する
+    def get_version(self, qid: int) -> tuple | None: ...
+    def get_versions(self, qids: list[int]) -> dict[int, tuple]: ...
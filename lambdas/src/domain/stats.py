@@ -0,0 +1,104 @@
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+
+# 統計ロールアップの差分計算ロジック（DBに依存しない）
+
+@dataclass
+class ResponseEvent:
+    # 完了した試験の回答1件（question_responses と exam_attempts・questions・exam_categories を結合したもの）
+    response_id: int
+    user_id: int
+    question_id: int
+    exam_id: int
+    exam_categories_id: int
+    category_id: int
+    is_correct: bool
+    answered_at: datetime
+
+@dataclass
+class LatestAnswer:
+    # ユーザー×問題ごとの最新の回答
+    user_id: int
+    question_id: int
+    exam_id: int
+    response_id: int
+    answered_at: datetime
+    is_correct: bool
+
+    def sort_key(self) -> tuple:
+        return (self.answered_at, self.response_id)
+
+@dataclass
+class AnswerCounts:
+    response_count: int = 0
+    correct_count: int = 0
+
+@dataclass
+class UserExamDelta:
+    # 最新の回答ベースの回答問題数・正答数の増減
+    answered_questions: int = 0
+    correct_answers: int = 0
+    last_answered_at: datetime | None = None
+
+@dataclass
+class RollupDelta:
+    questions: dict[int, AnswerCounts] = field(default_factory=dict)
+    exam_categories: dict[int, AnswerCounts] = field(default_factory=dict)
+    # exam_categories_id → (exam_id, category_id)
+    exam_category_keys: dict[int, tuple[int, int]] = field(default_factory=dict)
+    user_exams: dict[tuple[int, int], UserExamDelta] = field(default_factory=dict)
+    # 最新の回答が入れ替わったユーザー×問題
+    latest: dict[tuple[int, int], LatestAnswer] = field(default_factory=dict)
+
+def build_rollup_delta(events: list[ResponseEvent],
+                       existing_latest: dict[tuple[int, int], LatestAnswer]) -> RollupDelta:
+    """
+    回答のバッチからロールアップテーブルへの加算分を計算する
+
+    Args:
+        events: 前回のウォーターマークより新しい回答
+        existing_latest: バッチに含まれるユーザー×問題の、保存済みの最新の回答
+
+    Returns:
+        各ロールアップテーブルに加算する差分
+    """
+    delta = RollupDelta()
+    for event in events:
+        counts = delta.questions.setdefault(event.question_id, AnswerCounts())
+        counts.response_count += 1
+        counts.correct_count += int(event.is_correct)
+
+        counts = delta.exam_categories.setdefault(event.exam_categories_id, AnswerCounts())
+        counts.response_count += 1
+        counts.correct_count += int(event.is_correct)
+        delta.exam_category_keys[event.exam_categories_id] = (event.exam_id, event.category_id)
+
+        key = (event.user_id, event.question_id)
+        candidate = LatestAnswer(event.user_id, event.question_id, event.exam_id,
+                                 event.response_id, event.answered_at, event.is_correct)
+        current = delta.latest.get(key) or existing_latest.get(key)
+        if current is not None and current.sort_key() >= candidate.sort_key():
+            continue
+        delta.latest[key] = candidate
+
+    # 入れ替わった最新の回答ごとに、保存済みの最新の回答との差分をユーザー×試験に反映
+    for key, latest in delta.latest.items():
+        user_exam = delta.user_exams.setdefault((latest.user_id, latest.exam_id), UserExamDelta())
+        previous = existing_latest.get(key)
+        if previous is None:
+            user_exam.answered_questions += 1
+        else:
+            user_exam.correct_answers -= int(previous.is_correct)
+        user_exam.correct_answers += int(latest.is_correct)
+        if user_exam.last_answered_at is None or latest.answered_at > user_exam.last_answered_at:
+            user_exam.last_answered_at = latest.answered_at
+    return delta
+
+def accuracy_rate(correct_count: int, total_count: int) -> int:
+    """
+    正答率（%、整数に四捨五入）
+    Next.js側（api/exams/stats）の Math.round((correct / total) * 100) と同じ値になるよう、
+    同じ順序で計算して0.5を切り上げる（Pythonのroundは偶数丸めのため使わない）
+    """
+    return math.floor(correct_count / total_count * 100 + 0.5) if total_count else 0
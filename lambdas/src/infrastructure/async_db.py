@@ -0,0 +1,68 @@
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from infrastructure.db import get_db_session
+
+# DBアクセス用スレッドプールのスレッド数（プロセス全体で共有）
+DB_THREAD_POOL_SIZE = int(os.environ.get("DB_THREAD_POOL_SIZE", "8"))
+# 1リクエストで同時に実行するクエリ数の上限
+DB_REQUEST_CONCURRENCY = int(os.environ.get("DB_REQUEST_CONCURRENCY", "4"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    """DBアクセス用のスレッドプールを取得（初回呼び出し時に作成）"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DB_THREAD_POOL_SIZE, thread_name_prefix="db")
+    return _executor
+
+def _run_in_session(fn, args, kwargs):
+    # Sessionはスレッド間で共有できないため、呼び出しごとに新しいセッションを使う
+    db = get_db_session()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+class AsyncDB:
+    """
+    1リクエスト内の独立したDBアクセスを並行実行する
+    boto3のData APIクライアントは同期のため、スレッドプール上で実行し asyncio.gather で待ち合わせる
+    """
+
+    def __init__(self, concurrency: int = DB_REQUEST_CONCURRENCY):
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(self, fn, *args, **kwargs):
+        """fn(db, *args, **kwargs) を新しいセッションで実行"""
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            # 計測用のcontextvar（infrastructure/metrics.py）をスレッドに引き継ぐ
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(get_executor(), context.run, _run_in_session, fn, args, kwargs)
+
+class AsyncRepo:
+    """
+    同期リポジトリのメソッドを await で呼び出せるようにするラッパー
+    呼び出しごとに別のセッション・トランザクションで実行するため、並行実行するのは参照系のみとする
+    """
+
+    def __init__(self, repo_class, db: AsyncDB):
+        self.repo_class = repo_class
+        self.db = db
+
+    def __getattr__(self, name):
+        async def call(*args, **kwargs):
+            return await self.db.run(lambda session: getattr(self.repo_class(session), name)(*args, **kwargs))
+        return call
+
+# FastAPI依存関数
+async def get_async_db() -> AsyncDB:
+    """リクエストごとの同時実行数の上限を持つAsyncDB"""
+    return AsyncDB()
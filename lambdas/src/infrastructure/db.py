@@ -1,13 +1,9 @@
 import os
-import boto3
+import threading
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy_aurora_data_api import register_dialects
 from sqlalchemy.orm import sessionmaker
 
-# ダイアレクトを登録
-register_dialects()
-
 # SQLAlchemyのベースクラスを定義
 Base = declarative_base()
 
@@ -18,41 +14,118 @@ DB_NAME = os.environ.get("AURORA_DB_NAME")
 AWS_REGION = os.environ.get("AWS_REGION")
 AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
+# 接続方式（dataapi: RDS Data API経由 / pymysql: RDS Proxy・VPC内からMySQLプロトコルで直接接続）
+DB_DRIVER = os.environ.get("DB_DRIVER", "dataapi").lower()
+# pymysql接続の設定（DB_NAMEは共通）
+DB_HOST = os.environ.get("DB_HOST")
+DB_PORT = int(os.environ.get("DB_PORT", "3306"))
+DB_USER = os.environ.get("DB_USER")
+DB_PASSWORD = os.environ.get("DB_PASSWORD")
+DB_CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", "5"))
+# コネクションプール（Lambdaは1実行環境で同時に1リクエストのため小さくし、リクエスト内の並行クエリ分だけ余裕を持たせる）
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "1"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "3"))
+DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", "10"))
+# RDS Proxy・MySQLのアイドルタイムアウトより短くする
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "280"))
+# SQLログの出力（全SQLを同期的に標準出力へ書き出すため、デバッグ時のみ有効にする）
+SQL_ECHO = os.environ.get("SQL_ECHO", "false").lower() == "true"
 
-# boto3 RDS Data APIクライアントを明示的に作成してリージョンを設定
-rds_data_client = boto3.client('rds-data', region_name=AWS_REGION)
+# boto3 RDS Data APIクライアント（初回利用時に作成し、以降のリクエストで再利用）
+_rds_data_client = None
 
 # グローバルエンジン（Lambda環境での再利用のため）
 _engine = None
+# リクエスト内の並行クエリ（infrastructure/async_db.py）から同時に初期化されないようにするロック
+_engine_lock = threading.Lock()
+
+# セッションファクトリ（モジュールで1つだけ作成し、エンジン作成時にbindする）
+SessionLocal = sessionmaker()
+
+def get_rds_data_client():
+    """boto3 RDS Data APIクライアントを取得（boto3のインポートも初回呼び出しまで遅延）"""
+    global _rds_data_client
+    if _rds_data_client is None:
+        from infrastructure.resilience import ResilientDataAPIClient, data_api_client_config, emit_retry_metrics
+        if os.environ.get("DATA_API_EMULATOR_URL"):
+            # ローカルのエミュレーター（packages/dataapi-support の dataapi_support.emulator）でData APIを再現
+            from dataapi_support.emulator import create_emulator_client
+            client = create_emulator_client()
+        else:
+            import boto3
+            # リージョンを明示的に設定
+            client = boto3.client('rds-data', region_name=AWS_REGION, config=data_api_client_config())
+        # Aurora Serverlessの再開中・スロットリングのエラーは待って再試行する
+        _rds_data_client = ResilientDataAPIClient(client, observer=emit_retry_metrics)
+    return _rds_data_client
 
 def get_engine():
-    """Aurora Serverless V2 Data API接続を取得"""
+    """DB_DRIVERに応じたエンジンを取得（初回呼び出し時に作成し、以降は再利用）"""
     global _engine
     if _engine is not None:
         return _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = _create_engine()
+    return _engine
+
+def _create_engine():
+    if DB_DRIVER == "pymysql":
+        engine = _create_pymysql_engine()
+    elif DB_DRIVER == "dataapi":
+        engine = _create_dataapi_engine()
+    else:
+        raise ValueError(f"Unsupported DB_DRIVER: {DB_DRIVER}")
+
+    # SQLごとの実行時間を計測（遅いクエリのみ記録し、全SQLのログは出力しない）
+    from infrastructure.metrics import instrument_engine
+    instrument_engine(engine)
+    SessionLocal.configure(bind=engine)
 
-    # AWS認証情報を環境変数に設定
-    os.environ['AWS_ACCESS_KEY_ID'] = AWS_ACCESS_KEY_ID
-    os.environ['AWS_SECRET_ACCESS_KEY'] = AWS_SECRET_ACCESS_KEY
+    return engine
+
+def _create_pymysql_engine():
+    """RDS Proxy・MySQLへのコネクションプール付きエンジン"""
+    from sqlalchemy.engine import URL
+    url = URL.create("mysql+pymysql", username=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT,
+                     database=DB_NAME, query={"charset": "utf8mb4"})
+    return create_engine(url,
+        echo=SQL_ECHO,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        # Lambdaの実行環境が凍結・再開された後は接続が切れている場合があるため、貸し出し前に確認する
+        pool_pre_ping=True,
+        connect_args=dict(connect_timeout=DB_CONNECT_TIMEOUT))
+
+def _create_dataapi_engine():
+    """Aurora Serverless V2 Data API接続のエンジン"""
+    # ダイアレクトを登録（aurora_data_api・boto3を読み込むため、初回接続まで遅延）
+    from sqlalchemy_aurora_data_api import register_dialects
+    register_dialects()
+
+    # AWS認証情報を環境変数に設定（Lambda実行ロールを使う場合は未設定のまま）
+    if AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY:
+        os.environ['AWS_ACCESS_KEY_ID'] = AWS_ACCESS_KEY_ID
+        os.environ['AWS_SECRET_ACCESS_KEY'] = AWS_SECRET_ACCESS_KEY
     # AWSリージョンを環境変数に設定
-    os.environ['AWS_DEFAULT_REGION'] = AWS_REGION
+    if AWS_REGION:
+        os.environ['AWS_DEFAULT_REGION'] = AWS_REGION
 
     # Data APIでAuroraに接続
-    _engine = create_engine(f'mysql+auroradataapi://:@/{DB_NAME}',
-        echo=True,
+    return create_engine(f'mysql+auroradataapi://:@/{DB_NAME}',
+        echo=SQL_ECHO,
         connect_args=dict(
         aurora_cluster_arn=AURORA_CLUSTER_ARN,
         secret_arn=AURORA_SECRET_ARN,
-        rds_data_client=rds_data_client
+        rds_data_client=get_rds_data_client()
     ))
 
-    return _engine
-
 def get_db_session():
-    """データベースセッション（Data API接続）を取得"""
-    engine = get_engine()
-    SessionClass = sessionmaker(bind=engine)
-    return SessionClass()
+    """データベースセッションを取得"""
+    get_engine()
+    return SessionLocal()
 
 # FastAPI依存関数
 def get_db():
@@ -64,4 +137,4 @@ def get_db():
         db.close()
 
 if __name__ == "__main__":
-    get_db_session()
\ No newline at end of file
+    get_db_session()
@@ -0,0 +1,269 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable
+
+# 計測の有効化（falseならミドルウェア・SQLフックを登録しない）
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+# CloudWatchメトリクスの名前空間
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "QuizApi")
+# 出力先（stdout: CloudWatch Logs経由でEMFとして取り込まれる / memory: テスト用にメモリへ保持 / none: 出力しない）
+METRICS_SINK = os.environ.get("METRICS_SINK", "stdout").lower()
+# この時間以上かかったSQLを遅いクエリとして記録する（ミリ秒）
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "200"))
+# 遅いクエリのうち記録する割合（0〜1）
+SLOW_QUERY_SAMPLE_RATE = float(os.environ.get("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+# 記録するSQL文の最大文字数（パラメータは個人情報を含みうるため記録しない）
+SLOW_QUERY_MAX_CHARS = 1000
+# レスポンスに Server-Timing ヘッダーを付与するか
+SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING_ENABLED", "true").lower() == "true"
+
+class StdoutSink:
+    """1レコード1行のJSONを標準出力に書き出す（LambdaではCloudWatch LogsがEMFとして取り込む）"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.lock = threading.Lock()
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self.lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+class MemorySink:
+    """書き出したレコードをメモリに保持する（テスト・ベンチマーク用）"""
+
+    def __init__(self):
+        self.records: list[dict] = []
+
+    def write(self, record: dict) -> None:
+        self.records.append(record)
+
+    def clear(self) -> None:
+        self.records.clear()
+
+class NullSink:
+    def write(self, record: dict) -> None:
+        pass
+
+def _create_sink():
+    if METRICS_SINK == "memory":
+        return MemorySink()
+    if METRICS_SINK == "none":
+        return NullSink()
+    return StdoutSink()
+
+_sink = _create_sink()
+
+def get_sink():
+    return _sink
+
+def set_sink(sink) -> None:
+    """出力先を差し替える（テストで MemorySink を使う場合など）"""
+    global _sink
+    _sink = sink
+
+class RequestMetrics:
+    """1リクエスト分の計測値（SQLフックからも更新するため contextvar で共有する）"""
+
+    def __init__(self, method: str, path: str, cold_start: bool, scope: dict | None = None):
+        self.method = method
+        self.path = path
+        # ルーティングで scope に設定されるルートを参照する（遅いクエリの記録時にはハンドラーの実行中のため）
+        self.scope = scope if scope is not None else {}
+        self.cold_start = cold_start
+        self.started = time.perf_counter()
+        self.handler_ms = None
+        self.status_code = None
+        self.db_ms = 0.0
+        self.query_count = 0
+        self.slow_query_count = 0
+        # 同じリクエスト内で複数スレッドからクエリを実行する場合があるためロックする
+        self.lock = threading.Lock()
+
+    def record_query(self, elapsed_ms: float, slow: bool) -> None:
+        with self.lock:
+            self.db_ms += elapsed_ms
+            self.query_count += 1
+            if slow:
+                self.slow_query_count += 1
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    @property
+    def route(self) -> str | None:
+        """ルートのパス（/questions/{question_id} など。ルーティング前・該当なしはNone）"""
+        return getattr(self.scope.get("route"), "path", None)
+
+_current_request: ContextVar[RequestMetrics | None] = ContextVar("current_request_metrics", default=None)
+
+def current_request() -> RequestMetrics | None:
+    """実行中のリクエストの計測値（リクエスト外のジョブなどではNone）"""
+    return _current_request.get()
+
+def emf_record(metrics: dict[str, tuple[float, str]], dimensions: dict[str, str], properties: dict | None = None) -> dict:
+    """
+    CloudWatch Embedded Metric Format のレコードを作成
+
+    Args:
+        metrics: メトリクス名 -> (値, 単位)
+        dimensions: ディメンション名 -> 値
+        properties: 検索用に付与する追加の項目（メトリクスにはならない）
+    """
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": METRICS_NAMESPACE,
+                "Dimensions": [list(dimensions)],
+                "Metrics": [{"Name": name, "Unit": unit} for name, (_, unit) in metrics.items()],
+            }],
+        },
+    }
+    record.update(properties or {})
+    record.update(dimensions)
+    record.update({name: value for name, (value, _) in metrics.items()})
+    return record
+
+def emit(metrics: dict[str, tuple[float, str]], dimensions: dict[str, str], properties: dict | None = None) -> None:
+    get_sink().write(emf_record(metrics, dimensions, properties))
+
+# --- 累積カウンターの増分 ---
+
+# 接頭辞 -> 累積カウンターを返す関数
+_counter_sources: dict[str, Callable[[], dict[str, int]]] = {}
+# 接頭辞 -> 前回出力した時点の値
+_counter_last: dict[str, dict[str, int]] = {}
+_counter_lock = threading.Lock()
+
+def register_counters(prefix: str, read: Callable[[], dict[str, int]]) -> None:
+    """
+    プロセス内の累積カウンター（キャッシュのヒット数など）を登録する
+    リクエストのEMFに、前回の出力からの増分を「接頭辞+カウンター名」のメトリクスとして含める
+    増分はいずれか1つのリクエストにだけ計上されるため、合計すると累積値と一致する
+    """
+    with _counter_lock:
+        _counter_sources[prefix] = read
+        _counter_last[prefix] = dict(read())
+
+def counter_deltas() -> dict[str, int]:
+    """登録したカウンターの前回呼び出しからの増分（メトリクス名 -> 増分）"""
+    deltas = {}
+    with _counter_lock:
+        for prefix, read in _counter_sources.items():
+            current = dict(read())
+            last = _counter_last[prefix]
+            for name, value in current.items():
+                deltas[prefix + "".join(part.capitalize() for part in name.split("_"))] = value - last.get(name, 0)
+            _counter_last[prefix] = current
+    return deltas
+
+# --- SQLAlchemy のフック ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    slow = elapsed_ms >= SLOW_QUERY_MS
+    request = current_request()
+    if request is not None:
+        request.record_query(elapsed_ms, slow)
+    if slow and random.random() < SLOW_QUERY_SAMPLE_RATE:
+        get_sink().write({
+            "message": "slow query",
+            "duration_ms": round(elapsed_ms, 2),
+            "statement": statement[:SLOW_QUERY_MAX_CHARS],
+            "executemany": executemany,
+            "route": request.route if request else None,
+        })
+
+def _handle_error(exception_context):
+    # 失敗したSQLの開始時刻を取り除く（例外時は after_cursor_execute が呼ばれない）
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+def instrument_engine(engine) -> None:
+    """SQLごとの実行時間を計測するフックをエンジンに登録"""
+    if not METRICS_ENABLED:
+        return
+    from sqlalchemy import event
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+# --- ASGIミドルウェア ---
+
+# プロセスで最初のリクエストかどうか（Lambdaではコールドスタート）
+_cold_start = True
+
+class MetricsMiddleware:
+    """
+    リクエストごとにハンドラー時間・DB時間・クエリ数・コールドスタートを計測し、
+    Server-Timing ヘッダーの付与とEMFの出力を行うASGIミドルウェア
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global _cold_start
+        request = RequestMetrics(scope["method"], scope["path"], _cold_start, scope)
+        _cold_start = False
+        token = _current_request.set(request)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                request.status_code = message["status"]
+                # ボディ送信前の時点をハンドラー時間とする（JSONレスポンスでは処理完了時点）
+                request.handler_ms = request.elapsed_ms()
+                if SERVER_TIMING_ENABLED:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(request).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            emit_request_metrics(request, scope)
+
+def server_timing(request: RequestMetrics) -> str:
+    return (f'app;dur={request.handler_ms:.1f}, '
+            f'db;dur={request.db_ms:.1f};desc="{request.query_count} queries"')
+
+def emit_request_metrics(request: RequestMetrics, scope) -> None:
+    total_ms = request.elapsed_ms()
+    properties = {
+        "Method": request.method,
+        "Path": request.path,
+        "StatusCode": request.status_code or 500,
+        "SlowQueryCount": request.slow_query_count,
+    }
+    # Mangum経由の場合はLambdaのリクエストidを付与（ログ検索用）
+    context = scope.get("aws.context")
+    if context is not None:
+        properties["RequestId"] = getattr(context, "aws_request_id", None)
+    metrics = {
+        "Latency": (total_ms, "Milliseconds"),
+        "HandlerTime": (request.handler_ms if request.handler_ms is not None else total_ms, "Milliseconds"),
+        "DbTime": (request.db_ms, "Milliseconds"),
+        "QueryCount": (request.query_count, "Count"),
+        "ColdStart": (1 if request.cold_start else 0, "Count"),
+        "Error": (1 if (request.status_code or 500) >= 500 else 0, "Count"),
+    }
+    metrics.update({name: (delta, "Count") for name, delta in counter_deltas().items()})
+    emit(metrics, {"Route": f"{request.method} {request.route or 'UNMATCHED'}"}, properties)
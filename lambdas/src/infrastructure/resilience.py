@@ -0,0 +1,81 @@
+import os
+import time
+from dataapi_support.retry import (  # noqa: F401  lambdas からはこのモジュール経由で参照する
+    CONNECT, DEFAULT_POLICY, RESUMING, THROTTLED, UNAVAILABLE, ResilientDataAPIClient, RetryOutcome, RetryPolicy,
+    call_with_retry, classify_error, data_api_client_config
+)
+
+# 再試行の判定・待機は packages/dataapi-support の dataapi_support.retry（db/create-quiz と共有）
+# このモジュールはLambda固有の処理（EMFメトリクスの出力・事前ウォームアップ）を持つ
+
+# 事前ウォームアップで再開を待つ最大秒数
+DB_PREWARM_DEADLINE_SECONDS = float(os.environ.get("DB_PREWARM_DEADLINE_SECONDS", "60"))
+
+def emit_retry_metrics(outcome: RetryOutcome) -> None:
+    """再試行が発生した呼び出しのメトリクスをEMFで出力"""
+    from infrastructure.metrics import emit
+    emit(
+        {
+            "RetryCount": (outcome.attempts - 1, "Count"),
+            "RetryWaitTime": (outcome.waited_seconds * 1000, "Milliseconds"),
+            "ResumeWaitTime": (outcome.resume_wait_seconds * 1000, "Milliseconds"),
+            "RetryGaveUp": (0 if outcome.succeeded else 1, "Count"),
+        },
+        {"Operation": outcome.operation},
+        {"ErrorClasses": sorted(set(outcome.categories))},
+    )
+
+def prewarm(deadline_seconds: float = DB_PREWARM_DEADLINE_SECONDS) -> dict:
+    """
+    軽量なクエリでDBを起こしておく（EventBridgeのスケジュール・Lambdaの初期化時に実行）
+    Aurora Serverlessが一時停止している場合は再開を待つ
+
+    Returns:
+        成否・所要時間・試行回数・再開待ちの有無
+    """
+    from infrastructure import db
+
+    outcomes = []
+    policy = RetryPolicy(deadline_seconds=deadline_seconds, max_attempts=1000)
+    started = time.monotonic()
+    try:
+        if db.DB_DRIVER == "dataapi":
+            # SQLAlchemyを介さず、Data APIに SELECT 1 を直接送る
+            client = db.get_rds_data_client()
+            if isinstance(client, ResilientDataAPIClient):
+                client = client.client
+            call_with_retry(client.execute_statement, operation="prewarm", policy=policy, observer=outcomes.append,
+                            resourceArn=db.AURORA_CLUSTER_ARN, secretArn=db.AURORA_SECRET_ARN,
+                            database=db.DB_NAME, sql="SELECT 1")
+        else:
+            from sqlalchemy import text
+
+            def probe():
+                with db.get_engine().connect() as connection:
+                    connection.execute(text("SELECT 1"))
+            call_with_retry(probe, operation="prewarm", policy=policy, observer=outcomes.append)
+        ok = True
+    except Exception as e:
+        ok = False
+        error = f"{type(e).__name__}: {e}"
+    elapsed = time.monotonic() - started
+
+    outcome = outcomes[0] if outcomes else None
+    from infrastructure.metrics import emit
+    emit(
+        {
+            "PrewarmTime": (elapsed * 1000, "Milliseconds"),
+            "ResumeWaitTime": ((outcome.resume_wait_seconds if outcome else 0) * 1000, "Milliseconds"),
+            "PrewarmFailed": (0 if ok else 1, "Count"),
+        },
+        {"Operation": "prewarm"},
+    )
+    result = {
+        "ok": ok,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "attempts": outcome.attempts if outcome else 1,
+        "resumed": bool(outcome and RESUMING in outcome.categories),
+    }
+    if not ok:
+        result["error"] = error
+    return result
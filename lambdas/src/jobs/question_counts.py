@@ -0,0 +1,51 @@
+"""
+試験カテゴリーの問題数（exam_categories.question_count）の整合性チェック・修復
+
+question_count は問題の挿入（db/create-quiz）と論理削除の際に同じトランザクションで更新されますが、
+手作業でのデータ修正などでずれた場合に、questions テーブルから集計し直して修復します。
+カラムの追加は db/schema/migrations/001_exam_categories_question_count.sql で行います。
+
+使い方:
+    python -m jobs.question_counts --dry-run      # ずれている試験カテゴリーを出力するだけ
+    python -m jobs.question_counts                # ずれている試験カテゴリーを修復
+"""
+
+import argparse
+import json
+from adapters.repositories.exam_repo import SQLExamRepo
+from infrastructure.db import get_db_session
+
+def reconcile(db, dry_run: bool = False) -> dict:
+    """question_count と実際の問題数のずれを検出し、dry_runでなければ修復する"""
+    repo = SQLExamRepo(db)
+    drift = repo.find_question_count_drift()
+    db.rollback()
+    repaired = 0 if dry_run else repo.recount_questions([exam_categories_id for exam_categories_id, _, _ in drift])
+    return {
+        "drifted": len(drift),
+        "repaired": repaired,
+        "examples": [
+            {"exam_categories_id": exam_categories_id, "stored": stored, "actual": actual}
+            for exam_categories_id, stored, actual in drift[:20]
+        ],
+    }
+
+def run(dry_run: bool = False) -> dict:
+    db = get_db_session()
+    try:
+        return reconcile(db, dry_run)
+    finally:
+        db.close()
+
+# Lambda entry（EventBridgeのスケジュールなどから定期的に呼び出す）
+def handler(event, context):
+    return run(dry_run=bool((event or {}).get("dry_run", False)))
+
+def main():
+    parser = argparse.ArgumentParser(description="試験カテゴリーの問題数の整合性チェック・修復")
+    parser.add_argument("--dry-run", action="store_true", help="修復せずにずれを出力するだけ")
+    args = parser.parse_args()
+    print(json.dumps(run(args.dry_run), ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
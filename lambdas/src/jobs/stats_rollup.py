@@ -0,0 +1,126 @@
+"""
+統計ロールアップの集計ジョブ
+
+question_responses のうち、ウォーターマーク（集計済みの最後のid）より新しい回答だけを読み込み、
+stats_* テーブルに差分を加算します。統計の参照APIはロールアップテーブルのみを読むため、
+回答履歴の件数に関係なく一定の時間で応答できます。
+回答中の試験の回答はウォーターマークを止めずに読み飛ばし、stats_pending_attempts に記録して
+試験の完了後の実行で集計します。
+
+ロールアップテーブルは db/schema/migrations/002_stats_rollups.sql で作成します。
+
+使い方:
+    python -m jobs.stats_rollup                      # 差分集計（EventBridgeのスケジュールから handler を呼び出す）
+    python -m jobs.stats_rollup --mode rebuild       # 全件集計し直す
+    python -m jobs.stats_rollup --mode check         # 生データと突き合わせて不整合を出力
+"""
+
+import argparse
+import json
+from domain.stats import build_rollup_delta
+from adapters.repositories.stats_repo import STATS_BATCH_SIZE, SQLStatsRepo
+from infrastructure.db import get_db_session
+
+# 整合性チェックで出力する不整合の最大件数（テーブルごと）
+CHECK_REPORT_LIMIT = 20
+
+def run_incremental(db, batch_size: int = STATS_BATCH_SIZE) -> dict:
+    """
+    ウォーターマークより新しい回答をバッチごとに集計する（1バッチ1トランザクション）
+
+    Returns:
+        処理したバッチ数・回答数と最終的なウォーターマーク
+    """
+    repo = SQLStatsRepo(db)
+    batches = 0
+    responses = 0
+    check_pending = True
+    while True:
+        try:
+            watermark = repo.lock_watermark()
+            # 保留中の試験のうち、前回以降に完了したものは最初のバッチで集計する
+            pending_events, resolved = repo.fetch_pending_responses(watermark) if check_pending else ([], [])
+            check_pending = False
+            events, new_watermark, pending = repo.fetch_new_responses(watermark, batch_size)
+            if new_watermark == watermark and not resolved:
+                db.rollback()
+                break
+            events = pending_events + events
+            if events:
+                existing = repo.get_latest_answers([(event.user_id, event.question_id) for event in events])
+                repo.apply_delta(build_rollup_delta(events, existing))
+            repo.remove_pending_attempts(resolved)
+            repo.add_pending_attempts(pending)
+            repo.set_watermark(new_watermark)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        batches += 1
+        responses += len(events)
+    return {"batches": batches, "responses": responses, "watermark": watermark}
+
+def rebuild(db, batch_size: int = STATS_BATCH_SIZE) -> dict:
+    """ロールアップテーブルを空にしてから全件を集計し直す（完了までは統計が途中の値になる）"""
+    repo = SQLStatsRepo(db)
+    try:
+        repo.reset()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return run_incremental(db, batch_size)
+
+def _compare(name: str, raw: dict, rollup: dict) -> dict:
+    mismatches = [
+        {"key": list(key) if isinstance(key, tuple) else key, "raw": raw.get(key), "rollup": rollup.get(key)}
+        for key in sorted(raw.keys() | rollup.keys())
+        # 回答が0件のキーは行が無くても一致とみなす
+        if (raw.get(key) or (0, 0)) != (rollup.get(key) or (0, 0))
+    ]
+    return {"table": name, "rows": len(rollup), "mismatches": len(mismatches),
+            "examples": mismatches[:CHECK_REPORT_LIMIT]}
+
+def check(db) -> dict:
+    """
+    ウォーターマークまでの生データから集計し直した値とロールアップテーブルを比較する
+    放棄扱いにした試験が後から完了した場合などの不整合を検出する（不整合があれば rebuild で修復）
+    """
+    repo = SQLStatsRepo(db)
+    watermark = repo.get_watermark()
+    results = [
+        _compare("stats_question", repo.raw_question_counts(watermark), repo.rollup_question_counts()),
+        _compare("stats_exam_category", repo.raw_exam_category_counts(watermark), repo.rollup_exam_category_counts()),
+        _compare("stats_user_exam", repo.raw_user_exam_counts(watermark), repo.rollup_user_exam_counts()),
+    ]
+    db.rollback()
+    return {"watermark": watermark, "consistent": all(result["mismatches"] == 0 for result in results),
+            "tables": results}
+
+def run(mode: str = "incremental") -> dict:
+    db = get_db_session()
+    try:
+        if mode == "rebuild":
+            return rebuild(db)
+        if mode == "check":
+            return check(db)
+        return run_incremental(db)
+    finally:
+        db.close()
+
+# Lambda entry（EventBridgeのスケジュールなどから {"mode": "incremental"} で呼び出す）
+def handler(event, context):
+    return run((event or {}).get("mode", "incremental"))
+
+def main():
+    parser = argparse.ArgumentParser(description="統計ロールアップの集計ジョブ")
+    parser.add_argument("--mode", choices=["incremental", "rebuild", "check"], default="incremental")
+    args = parser.parse_args()
+
+    result = run(args.mode)
+    print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+    if args.mode == "check" and not result["consistent"]:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
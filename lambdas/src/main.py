@@ -1,9 +1,75 @@
-from fastapi import FastAPI
-from mangum import Mangum
-from adapters.api.questions_router import router
+import os
 
-app = FastAPI(title="Quiz API")
-app.include_router(router)
+# 初期化モード
+# lazy : FastAPI・ルーター・DB接続を最初のリクエストまで遅延し、コールドスタートのインポート時間を短縮
+# eager: インポート時にアプリとDBエンジンを作成（Provisioned Concurrency / SnapStart向け）
+LAMBDA_INIT_MODE = os.environ.get("LAMBDA_INIT_MODE", "lazy").lower()
+# 初期化時にDBを起こしておく（Aurora Serverlessの再開待ちを最初のリクエストより前に済ませる）
+DB_PREWARM_ON_INIT = os.environ.get("DB_PREWARM_ON_INIT", "false").lower() == "true"
+
+_app = None
+_mangum_handler = None
+
+def create_app():
+    """FastAPIアプリケーションを作成"""
+    from fastapi import FastAPI
+    from fastapi.responses import ORJSONResponse
+    from adapters.api.questions_router import router as questions_router
+    from adapters.api.exams_router import router as exams_router
+    from adapters.api.attempts_router import router as attempts_router
+    from adapters.api.stats_router import router as stats_router
+    from adapters.api.serialization import question_payload_cache
+    from adapters.repositories.cache import question_cache
+    from infrastructure.metrics import METRICS_ENABLED, MetricsMiddleware, register_counters
+
+    # response_model の出力は orjson でエンコードする（標準のjsonより速い）
+    app = FastAPI(title="Quiz API", default_response_class=ORJSONResponse)
+    if METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+        # キャッシュのヒット・ミスなどの増分をリクエストのEMFに含める
+        register_counters("QuestionCache", question_cache.counters)
+        register_counters("QuestionPayloadCache", question_payload_cache.counters)
+    app.include_router(questions_router)
+    app.include_router(exams_router)
+    app.include_router(attempts_router)
+    app.include_router(stats_router)
+    return app
+
+def get_app():
+    """FastAPIアプリケーションを取得（初回呼び出し時に作成）"""
+    global _app
+    if _app is None:
+        _app = create_app()
+    return _app
+
+def __getattr__(name):
+    # uvicorn main:app のように属性として参照された場合も遅延作成する
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def is_prewarm_event(event) -> bool:
+    """EventBridgeのスケジュール、または {"prewarm": true} での呼び出しか"""
+    return isinstance(event, dict) and (event.get("source") == "aws.events" or event.get("prewarm") is True)
 
 # Lambda entry
-handler = Mangum(app)
+def handler(event, context):
+    global _mangum_handler
+    if is_prewarm_event(event):
+        # 試験開始前のスケジュール実行でDBを起こし、実行環境も温めておく
+        from infrastructure.resilience import prewarm
+        return prewarm()
+    if _mangum_handler is None:
+        from mangum import Mangum
+        _mangum_handler = Mangum(get_app())
+    return _mangum_handler(event, context)
+
+if LAMBDA_INIT_MODE == "eager":
+    from infrastructure.db import get_engine
+    get_app()
+    get_engine()
+
+if DB_PREWARM_ON_INIT:
+    from infrastructure.resilience import prewarm
+    # Lambdaの初期化フェーズは10秒までのため、待ちきれない分は最初のリクエストの再試行に任せる
+    prewarm(deadline_seconds=8)
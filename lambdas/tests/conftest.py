@@ -0,0 +1,74 @@
+import os
+import sys
+
+import pytest
+
+# Lambdaと同じく lambdas/src をインポートのルートにする
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+@pytest.fixture
+def db_engine():
+    """全テーブルを作成したインメモリのSQLite（TestClientのスレッドからも同じ接続を使う）"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    from infrastructure.db import Base
+    from infrastructure.metrics import instrument_engine
+    import main  # noqa: F401 全ルーターのモデルを Base に登録する
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    # infrastructure.db のエンジンと同じくSQLの計測フックを登録する
+    instrument_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    from sqlalchemy.orm import sessionmaker
+    session = sessionmaker(bind=db_engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def metrics_sink(monkeypatch):
+    """メトリクスの出力先を MemorySink に差し替え、プロセス単位の状態を初期化する"""
+    from infrastructure import metrics
+    sink = metrics.MemorySink()
+    monkeypatch.setattr(metrics, "_sink", sink)
+    monkeypatch.setattr(metrics, "_cold_start", True)
+    monkeypatch.setattr(metrics, "_counter_sources", {})
+    monkeypatch.setattr(metrics, "_counter_last", {})
+    return sink
+
+
+@pytest.fixture
+def api_client(db_engine, metrics_sink):
+    """main.create_app のアプリを、get_db を db_engine のセッションに差し替えて呼び出すクライアント"""
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import sessionmaker
+    from adapters.api.serialization import question_payload_cache
+    from adapters.repositories.cache import question_cache
+    from infrastructure.db import get_db
+    import main
+
+    session_factory = sessionmaker(bind=db_engine)
+
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # キャッシュはプロセス内で共有されるため、テストごとに空にする
+    question_cache.clear()
+    question_payload_cache.clear()
+    app = main.create_app()
+    app.dependency_overrides[get_db] = get_test_db
+    with TestClient(app) as client:
+        yield client
+    question_cache.clear()
+    question_payload_cache.clear()
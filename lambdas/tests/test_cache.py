@@ -0,0 +1,226 @@
+from dataclasses import replace
+from datetime import datetime
+
+import pytest
+
+from adapters.repositories.cache import CachedQuestionRepo, InMemorySharedCache, LocalLRUCache
+from domain.models import Question
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeQuestionRepo:
+    """QuestionRepoの代わりに辞書の問題を返し、呼び出しを記録するリポジトリ"""
+
+    def __init__(self, questions):
+        self.questions = {q.id: q for q in questions}
+        self.calls = []
+
+    def get(self, qid):
+        self.calls.append(("get", qid))
+        question = self.questions.get(qid)
+        return replace(question) if question else None
+
+    def get_many(self, qids):
+        self.calls.append(("get_many", tuple(qids)))
+        return [replace(self.questions[qid]) for qid in qids if qid in self.questions]
+
+    def get_version(self, qid):
+        self.calls.append(("get_version", qid))
+        question = self.questions.get(qid)
+        return (question.updated_at, question.deleted_at) if question else None
+
+    def get_versions(self, qids):
+        self.calls.append(("get_versions", tuple(qids)))
+        return {qid: (self.questions[qid].updated_at, self.questions[qid].deleted_at)
+                for qid in qids if qid in self.questions}
+
+    def update(self, q):
+        self.calls.append(("update", q.id))
+        self.questions[q.id] = replace(q, updated_at=datetime(2024, 2, 1))
+        return replace(self.questions[q.id])
+
+    def delete(self, qid):
+        self.calls.append(("delete", qid))
+
+
+def question(qid, body="body"):
+    return Question(id=qid, body=f"{body}{qid}", updated_at=datetime(2024, 1, 1))
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+# ---- LocalLRUCache ----
+
+def test_lru_evicts_least_recently_used(clock):
+    cache = LocalLRUCache(max_size=2, ttl=10, clock=clock)
+    cache.set(1, "a", None)
+    cache.set(2, "b", None)
+    cache.get_entry(1)
+
+    cache.set(3, "c", None)
+
+    assert cache.get_entry(2) is None
+    assert cache.get_entry(1).value == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_ttl_refresh_and_max_age(clock):
+    cache = LocalLRUCache(max_size=10, ttl=10, clock=clock, max_age=25)
+    cache.set(1, "a", "v1")
+    entry = cache.get_entry(1)
+
+    clock.now = 11
+    assert not cache.is_fresh(entry)
+    assert cache.can_revalidate(entry)
+
+    cache.refresh(1)
+    assert cache.is_fresh(entry)
+
+    # 延命しても、値を設定してから max_age を超えたら読み直しの対象になる
+    clock.now = 25
+    assert not cache.can_revalidate(entry)
+
+
+def test_lru_stats(clock):
+    cache = LocalLRUCache(max_size=10, ttl=10, clock=clock)
+    cache.record("hits", 3)
+    cache.record("misses")
+    cache.set(1, "a", None)
+    cache.delete(1)
+
+    stats = cache.stats()
+
+    assert (stats["hits"], stats["misses"], stats["invalidations"], stats["size"]) == (3, 1, 1, 0)
+    assert stats["hit_ratio"] == 0.75
+
+
+def test_lru_counters_are_emitted_as_deltas(clock, monkeypatch):
+    from infrastructure import metrics
+    monkeypatch.setattr(metrics, "_counter_sources", {})
+    monkeypatch.setattr(metrics, "_counter_last", {})
+    cache = LocalLRUCache(max_size=10, ttl=10, clock=clock)
+    cache.record("hits", 5)
+
+    # 登録前のヒットは計上しない
+    metrics.register_counters("QuestionCache", cache.counters)
+    cache.record("hits", 2)
+    cache.record("shared_hits")
+    first = metrics.counter_deltas()
+    cache.record("misses")
+    second = metrics.counter_deltas()
+
+    assert (first["QuestionCacheHits"], first["QuestionCacheSharedHits"], first["QuestionCacheMisses"]) == (2, 1, 0)
+    assert (second["QuestionCacheHits"], second["QuestionCacheMisses"]) == (0, 1)
+
+
+# ---- CachedQuestionRepo ----
+
+def make_repo(clock, questions, shared=None, max_age=float("inf")):
+    backend = FakeQuestionRepo(questions)
+    cache = LocalLRUCache(max_size=100, ttl=10, clock=clock, max_age=max_age)
+    return CachedQuestionRepo(backend, cache, shared), backend
+
+
+def test_get_reads_through_once_and_returns_copies(clock):
+    repo, backend = make_repo(clock, [question(1)])
+
+    first = repo.get(1)
+    first.body = "changed by caller"
+    second = repo.get(1)
+
+    assert second.body == "body1"
+    assert backend.calls == [("get", 1)]
+    assert repo.get(99) is None
+
+
+def test_get_revalidates_stale_entry_by_version(clock):
+    repo, backend = make_repo(clock, [question(1)])
+    repo.get(1)
+    clock.now = 11
+
+    assert repo.get(1).body == "body1"
+    assert backend.calls == [("get", 1), ("get_version", 1)]
+    assert repo.cache.stats()["revalidations"] == 1
+
+
+def test_get_rereads_when_version_changed(clock):
+    repo, backend = make_repo(clock, [question(1)])
+    repo.get(1)
+    backend.questions[1] = replace(question(1, "edited"), updated_at=datetime(2024, 3, 1))
+    clock.now = 11
+
+    assert repo.get(1).body == "edited1"
+    assert backend.calls[-1] == ("get", 1)
+
+
+def test_get_rereads_after_max_age_even_if_version_matches(clock):
+    repo, backend = make_repo(clock, [question(1)], max_age=30)
+    repo.get(1)
+    # updated_at を変えずに書き換えられた場合
+    backend.questions[1] = question(1, "edited")
+
+    clock.now = 11
+    assert repo.get(1).body == "body1"
+    clock.now = 31
+    assert repo.get(1).body == "edited1"
+    assert backend.calls == [("get", 1), ("get_version", 1), ("get", 1)]
+
+
+def test_get_many_batches_misses_and_stale_versions(clock):
+    repo, backend = make_repo(clock, [question(qid) for qid in range(1, 6)])
+    repo.get_many([1, 2])
+    clock.now = 11
+    repo.get(2)  # 2だけ再検証済み（TTL内）になる
+    backend.calls.clear()
+
+    result = repo.get_many([3, 1, 2, 3, 99])
+
+    assert [q.id for q in result] == [3, 1, 2]
+    assert backend.calls == [("get_versions", (1,)), ("get_many", (3, 99))]
+
+
+def test_shared_cache_is_used_before_database(clock):
+    shared = InMemorySharedCache(clock=clock)
+    first, _ = make_repo(clock, [question(1)], shared=shared)
+    first.get(1)
+    second, backend = make_repo(clock, [question(1)], shared=shared)
+
+    assert second.get_many([1])[0].body == "body1"
+    assert backend.calls == []
+    assert second.cache.stats()["shared_hits"] == 1
+
+
+def test_update_and_delete_invalidate_local_and_shared(clock):
+    shared = InMemorySharedCache(clock=clock)
+    repo, backend = make_repo(clock, [question(1)], shared=shared)
+    repo.get(1)
+
+    repo.update(question(1, "updated"))
+
+    assert repo.cache.get_entry(1) is None
+    assert shared.get("question:1") is None
+    assert repo.get(1).body == "updated1"
+
+    repo.delete(1)
+    assert repo.cache.get_entry(1) is None
+
+
+def test_get_versions_uses_fresh_entries(clock):
+    repo, backend = make_repo(clock, [question(1), question(2)])
+    repo.get(1)
+    backend.calls.clear()
+
+    versions = repo.get_versions([1, 2])
+
+    assert versions == {1: (datetime(2024, 1, 1), None), 2: (datetime(2024, 1, 1), None)}
+    assert backend.calls == [("get_versions", (2,))]
@@ -0,0 +1,26 @@
+from domain.grading import grade_answers, is_answer_correct, score_percentage
+
+
+def test_is_answer_correct_ignores_order():
+    assert is_answer_correct([3, 1], [1, 3])
+    assert not is_answer_correct([1], [1, 3])
+    assert not is_answer_correct([], [1])
+
+
+def test_grade_answers():
+    results, skipped = grade_answers({1: [2], 2: [1, 3], 3: [4]}, {1: [2], 2: [3]})
+
+    assert [(r.question_id, r.answer_ids, r.is_correct) for r in results] == [(1, [2], True), (2, [1, 3], False)]
+    assert skipped == [3]
+
+
+def test_grade_answers_skips_questions_not_in_attempt():
+    results, skipped = grade_answers({1: [2], 2: [3]}, {1: [2], 2: [3]}, question_ids=[1])
+
+    assert [r.question_id for r in results] == [1]
+    assert skipped == [2]
+
+
+def test_score_percentage():
+    assert score_percentage(2, 3) == 66.7
+    assert score_percentage(0, 0) == 0.0
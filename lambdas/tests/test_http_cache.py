@@ -0,0 +1,193 @@
+from datetime import datetime
+
+import pytest
+from fastapi import Depends
+
+from adapters.api.http_cache import etag_matches, question_etag, questions_etag
+from adapters.api.questions_router import get_question_repo
+from adapters.repositories.exam_repo import Categories, ExamCategories, Exams
+from adapters.repositories.question_repo import Questions, SQLQuestionRepo
+from infrastructure.db import get_db
+
+UPDATED_AT = datetime(2024, 1, 1)
+
+
+class RecordingRepo:
+    """SQLQuestionRepo の呼び出しを記録する（キャッシュを通さずにDBのバージョンを読む）"""
+
+    def __init__(self, repo, calls):
+        self.repo = repo
+        self.calls = calls
+
+    def __getattr__(self, name):
+        method = getattr(self.repo, name)
+
+        def call(*args):
+            self.calls.append(name)
+            return method(*args)
+        return call
+
+
+@pytest.fixture
+def repo_calls(api_client):
+    calls = []
+
+    def recording_repo(db=Depends(get_db)):
+        return RecordingRepo(SQLQuestionRepo(db), calls)
+    api_client.app.dependency_overrides[get_question_repo] = recording_repo
+    return calls
+
+
+@pytest.fixture
+def questions(db_session):
+    db_session.add_all([
+        Questions(id=qid, body=f"body{qid}", explanation="", choices=[], correct_key=[], exam_categories_id=1,
+                  updated_at=UPDATED_AT)
+        for qid in (1, 2)
+    ])
+    db_session.commit()
+
+
+def touch(db_session, qid):
+    db_session.query(Questions).filter(Questions.id == qid).update({"updated_at": datetime(2024, 2, 1)})
+    db_session.commit()
+
+
+# ---- etag_matches ----
+
+def test_etag_matches_uses_weak_comparison():
+    etag = '"q-abc"'
+
+    assert etag_matches('"q-abc"', etag)
+    assert etag_matches('W/"q-abc"', etag)
+    assert etag_matches('"q-other", W/"q-abc"', etag)
+    assert etag_matches(" * ", etag)
+    assert not etag_matches('"q-other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_etag_depends_on_id_and_version():
+    version = (UPDATED_AT, None)
+
+    assert question_etag(1, version) == question_etag(1, version)
+    assert question_etag(1, version) != question_etag(2, version)
+    assert question_etag(1, version) != question_etag(1, (UPDATED_AT, datetime(2024, 3, 1)))
+    assert questions_etag([(1, version), (2, version)]) != questions_etag([(2, version), (1, version)])
+
+
+# ---- GET /questions/{question_id} ----
+
+def test_question_returns_304_when_etag_matches(api_client, repo_calls, questions):
+    first = api_client.get("/questions/1")
+    etag = first.headers["etag"]
+    repo_calls.clear()
+
+    second = api_client.get("/questions/1", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert first.headers["cache-control"].startswith("public")
+    assert etag == question_etag(1, (UPDATED_AT, None))
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    # 本体は読まずにバージョンだけ確認する
+    assert repo_calls == ["get_version"]
+
+
+def test_question_etag_changes_when_updated(api_client, repo_calls, db_session, questions):
+    etag = api_client.get("/questions/1").headers["etag"]
+    touch(db_session, 1)
+
+    response = api_client.get("/questions/1", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["body"] == "body1"
+
+
+def test_question_with_stale_etag_for_missing_question_is_404(api_client, repo_calls, questions):
+    response = api_client.get("/questions/99", headers={"If-None-Match": question_etag(99, (UPDATED_AT, None))})
+
+    assert response.status_code == 404
+
+
+# ---- GET /questions?ids= ----
+
+def test_questions_returns_304_via_get_versions(api_client, repo_calls, questions):
+    first = api_client.get("/questions", params={"ids": "1,2"})
+    etag = first.headers["etag"]
+    repo_calls.clear()
+
+    second = api_client.get("/questions", params={"ids": "1,2"}, headers={"If-None-Match": f"W/{etag}"})
+
+    assert [q["id"] for q in first.json()] == [1, 2]
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert repo_calls == ["get_versions"]
+
+
+def test_questions_etag_covers_only_returned_questions(api_client, repo_calls, questions):
+    # 存在しないidは結果に含めず、ETagにも含めない
+    first = api_client.get("/questions", params={"ids": "2,99,1,2"})
+    etag = first.headers["etag"]
+
+    assert [q["id"] for q in first.json()] == [2, 1]
+    assert etag == questions_etag([(2, (UPDATED_AT, None)), (1, (UPDATED_AT, None))])
+    assert etag != api_client.get("/questions", params={"ids": "1,2"}).headers["etag"]
+    assert api_client.get("/questions", params={"ids": "2,99,1"},
+                          headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_questions_etag_changes_when_any_question_is_updated(api_client, repo_calls, db_session, questions):
+    etag = api_client.get("/questions", params={"ids": "1,2"}).headers["etag"]
+    touch(db_session, 2)
+    repo_calls.clear()
+
+    response = api_client.get("/questions", params={"ids": "1,2"}, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert repo_calls == ["get_versions", "get_many"]
+
+
+def test_questions_star_matches_any_etag(api_client, repo_calls, questions):
+    response = api_client.get("/questions", params={"ids": "1"}, headers={"If-None-Match": "*"})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == questions_etag([(1, (UPDATED_AT, None))])
+
+
+# ---- GET /exams/{exam_id}/categories ----
+
+@pytest.fixture
+def categories(db_session):
+    db_session.add_all([
+        Exams(id=1, exam_name="Solutions Architect", exam_code="SAA-C03"),
+        Categories(id=1, category_name="Compute"),
+        Categories(id=2, category_name="Storage"),
+        ExamCategories(id=10, exam_id=1, category_id=1, question_count=3),
+        ExamCategories(id=11, exam_id=1, category_id=2, question_count=5),
+    ])
+    db_session.commit()
+
+
+def test_categories_return_304_until_question_count_changes(api_client, db_session, categories):
+    first = api_client.get("/exams/1/categories")
+    etag = first.headers["etag"]
+
+    assert first.json()["total_questions"] == 8
+    assert api_client.get("/exams/1/categories", headers={"If-None-Match": etag}).status_code == 304
+
+    db_session.query(ExamCategories).filter(ExamCategories.id == 11).update({"question_count": 6})
+    db_session.commit()
+    changed = api_client.get("/exams/1/categories", headers={"If-None-Match": etag})
+
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["total_questions"] == 9
+
+
+def test_category_etag_differs_between_exams(api_client, categories):
+    # 同じ内容（カテゴリーなし）でも試験ごとにETagが異なる
+    assert api_client.get("/exams/2/categories").headers["etag"] != \
+        api_client.get("/exams/3/categories").headers["etag"]
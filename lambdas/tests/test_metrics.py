@@ -0,0 +1,117 @@
+import re
+from datetime import datetime
+
+import pytest
+
+from adapters.repositories.question_repo import Questions
+from infrastructure import metrics
+
+SERVER_TIMING = re.compile(r'^app;dur=\d+\.\d, db;dur=(\d+\.\d);desc="(\d+) queries"$')
+
+
+@pytest.fixture
+def questions(db_session):
+    db_session.add_all([
+        Questions(id=qid, body=f"body{qid}", explanation="", choices=[], correct_key=[], exam_categories_id=1,
+                  updated_at=datetime(2024, 1, 1))
+        for qid in (1, 2)
+    ])
+    db_session.commit()
+
+
+def request_records(sink):
+    return [record for record in sink.records if "_aws" in record]
+
+
+def slow_query_records(sink):
+    return [record for record in sink.records if record.get("message") == "slow query"]
+
+
+def test_request_emits_emf_record(api_client, metrics_sink, questions):
+    response = api_client.get("/questions/1")
+
+    assert response.status_code == 200
+    [record] = request_records(metrics_sink)
+    [directive] = record["_aws"]["CloudWatchMetrics"]
+    assert directive["Namespace"] == metrics.METRICS_NAMESPACE
+    assert directive["Dimensions"] == [["Route"]]
+    units = {metric["Name"]: metric["Unit"] for metric in directive["Metrics"]}
+    assert {name: units[name] for name in ("Latency", "HandlerTime", "DbTime", "QueryCount", "ColdStart", "Error")} \
+        == {"Latency": "Milliseconds", "HandlerTime": "Milliseconds", "DbTime": "Milliseconds",
+            "QueryCount": "Count", "ColdStart": "Count", "Error": "Count"}
+    # 宣言したメトリクスはすべてレコードに値がある
+    assert all(name in record for name in units)
+    assert record["Route"] == "GET /questions/{question_id}"
+    assert (record["Method"], record["Path"], record["StatusCode"]) == ("GET", "/questions/1", 200)
+    assert (record["ColdStart"], record["Error"]) == (1, 0)
+    # キャッシュのカウンターは増分として含まれる
+    assert record["QuestionCacheMisses"] == 1
+
+
+def test_query_count_and_db_time_match_server_timing(api_client, metrics_sink, questions):
+    first = api_client.get("/questions", params={"ids": "1,2"})
+    # 2回目はキャッシュから返すためクエリを実行しない
+    second = api_client.get("/questions", params={"ids": "1,2"})
+
+    first_record, second_record = request_records(metrics_sink)
+    assert first_record["QueryCount"] == 1
+    assert first_record["DbTime"] > 0
+    assert first_record["DbTime"] <= first_record["Latency"]
+    db_ms, query_count = SERVER_TIMING.match(first.headers["server-timing"]).groups()
+    assert (float(db_ms), int(query_count)) == (round(first_record["DbTime"], 1), 1)
+
+    assert (second_record["QueryCount"], second_record["DbTime"], second_record["ColdStart"]) == (0, 0, 0)
+    assert SERVER_TIMING.match(second.headers["server-timing"]).groups() == ("0.0", "0")
+    assert (second_record["QuestionCacheHits"], second_record["QuestionCacheMisses"]) == (2, 0)
+
+
+def test_error_and_unmatched_routes(api_client, metrics_sink, questions):
+    assert api_client.get("/questions/99").status_code == 404
+    assert api_client.get("/no-such-path").status_code == 404
+
+    missing, unmatched = request_records(metrics_sink)
+    # 4xxはエラーとして数えない
+    assert (missing["StatusCode"], missing["Error"]) == (404, 0)
+    assert unmatched["Route"] == "GET UNMATCHED"
+
+
+def test_server_timing_can_be_disabled(api_client, monkeypatch, questions):
+    monkeypatch.setattr(metrics, "SERVER_TIMING_ENABLED", False)
+
+    assert "server-timing" not in api_client.get("/questions/1").headers
+
+
+def test_slow_queries_are_sampled(api_client, metrics_sink, monkeypatch, questions):
+    monkeypatch.setattr(metrics, "SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(metrics, "SLOW_QUERY_SAMPLE_RATE", 1.0)
+
+    api_client.get("/questions/1")
+
+    [slow] = slow_query_records(metrics_sink)
+    assert slow["statement"].startswith("SELECT")
+    assert slow["route"] == "/questions/{question_id}"
+    assert slow["duration_ms"] >= 0
+    assert request_records(metrics_sink)[0]["SlowQueryCount"] == 1
+
+
+def test_unsampled_slow_queries_are_still_counted(api_client, metrics_sink, monkeypatch, questions):
+    monkeypatch.setattr(metrics, "SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(metrics, "SLOW_QUERY_SAMPLE_RATE", 0.0)
+
+    api_client.get("/questions/1")
+
+    assert slow_query_records(metrics_sink) == []
+    assert request_records(metrics_sink)[0]["SlowQueryCount"] == 1
+
+
+def test_slow_query_statement_is_truncated(db_engine, metrics_sink, monkeypatch):
+    monkeypatch.setattr(metrics, "SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(metrics, "SLOW_QUERY_MAX_CHARS", 20)
+
+    # リクエスト外（ジョブなど）のクエリはルートなしで記録する
+    with db_engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1 AS a_rather_long_column_name")
+
+    [slow] = slow_query_records(metrics_sink)
+    assert slow["statement"] == "SELECT 1 AS a_rather"
+    assert slow["route"] is None
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from domain.sampling import allocate_quotas, sample_uniform, sample_with_quotas
+
+
+# ---- allocate_quotas ----
+
+def test_allocates_proportionally_with_largest_remainder():
+    quotas = allocate_quotas({1: 1, 2: 1, 3: 1}, {1: 100, 2: 100, 3: 100}, 10)
+
+    assert sum(quotas.values()) == 10
+    assert sorted(quotas.values()) == [3, 3, 4]
+
+
+def test_redistributes_over_capacity_to_remaining_categories():
+    quotas = allocate_quotas({1: 8, 2: 1, 3: 1}, {1: 2, 2: 50, 3: 50}, 20)
+
+    assert quotas == {1: 2, 2: 9, 3: 9}
+
+
+def test_count_is_limited_by_total_capacity():
+    assert allocate_quotas({1: 1, 2: 1}, {1: 3, 2: 4}, 100) == {1: 3, 2: 4}
+
+
+def test_zero_weight_and_empty_categories_get_nothing():
+    quotas = allocate_quotas({1: 0, 2: 1, 3: 5}, {1: 10, 2: 10, 3: 0}, 6)
+
+    assert quotas == {1: 0, 2: 6, 3: 0}
+
+
+def test_no_active_categories():
+    assert allocate_quotas({}, {1: 10}, 5) == {1: 0}
+
+
+# ---- sample_with_quotas・sample_uniform ----
+
+POOLS = {1: list(range(100, 110)), 2: list(range(200, 203)), 3: []}
+
+
+def test_sample_with_quotas_respects_quotas_without_duplicates():
+    picked, counts = sample_with_quotas(POOLS, {1: 4, 2: 5, 3: 2}, random.Random(0))
+
+    assert counts == {1: 4, 2: 3, 3: 0}
+    assert len(picked) == len(set(picked)) == 7
+    assert sum(1 for qid in picked if qid in POOLS[1]) == 4
+
+
+def test_sample_with_quotas_is_deterministic_for_seed():
+    first = sample_with_quotas(POOLS, {1: 5, 2: 2}, random.Random(42))
+    second = sample_with_quotas(POOLS, {1: 5, 2: 2}, random.Random(42))
+
+    assert first == second
+
+
+@pytest.mark.parametrize("count, expected", [(5, 5), (13, 13), (50, 13)])
+def test_sample_uniform_picks_distinct_ids(count, expected):
+    picked, counts = sample_uniform(POOLS, count, random.Random(1))
+
+    assert len(picked) == len(set(picked)) == expected
+    assert sum(counts.values()) == expected
+    assert all(qid in POOLS[1] + POOLS[2] for qid in picked)
+
+
+def test_sample_uniform_with_empty_pools():
+    assert sample_uniform({}, 5, random.Random(0)) == ([], {})
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from domain.stats import LatestAnswer, ResponseEvent, accuracy_rate, build_rollup_delta
+
+BASE = datetime(2024, 1, 1, 12, 0)
+
+
+def event(response_id, user_id, question_id, is_correct, minutes, exam_categories_id=10):
+    return ResponseEvent(response_id=response_id, user_id=user_id, question_id=question_id, exam_id=1,
+                         exam_categories_id=exam_categories_id, category_id=exam_categories_id * 10,
+                         is_correct=is_correct, answered_at=BASE + timedelta(minutes=minutes))
+
+
+def test_counts_every_response_per_question_and_category():
+    delta = build_rollup_delta([
+        event(1, 1, 100, True, 0),
+        event(2, 2, 100, False, 1),
+        event(3, 1, 200, True, 2, exam_categories_id=20),
+    ], {})
+
+    assert (delta.questions[100].response_count, delta.questions[100].correct_count) == (2, 1)
+    assert (delta.exam_categories[20].response_count, delta.exam_categories[20].correct_count) == (1, 1)
+    assert delta.exam_category_keys == {10: (1, 100), 20: (1, 200)}
+
+
+def test_user_exam_uses_latest_answer_per_question():
+    delta = build_rollup_delta([
+        event(1, 1, 100, False, 0),
+        event(2, 1, 100, True, 5),
+        event(3, 1, 200, False, 3),
+    ], {})
+
+    user_exam = delta.user_exams[(1, 1)]
+    assert (user_exam.answered_questions, user_exam.correct_answers) == (2, 1)
+    assert user_exam.last_answered_at == BASE + timedelta(minutes=5)
+    assert delta.latest[(1, 100)].response_id == 2
+
+
+def test_replaces_existing_latest_answer():
+    existing = {(1, 100): LatestAnswer(1, 100, 1, response_id=1, answered_at=BASE, is_correct=True)}
+
+    delta = build_rollup_delta([event(5, 1, 100, False, 10)], existing)
+
+    user_exam = delta.user_exams[(1, 1)]
+    # 既に回答済みの問題のため回答問題数は増えず、正答が誤答に入れ替わる
+    assert (user_exam.answered_questions, user_exam.correct_answers) == (0, -1)
+
+
+def test_older_event_does_not_replace_existing_latest():
+    existing = {(1, 100): LatestAnswer(1, 100, 1, response_id=9, answered_at=BASE + timedelta(hours=1),
+                                       is_correct=True)}
+
+    delta = build_rollup_delta([event(5, 1, 100, False, 10)], existing)
+
+    assert delta.latest == {}
+    assert delta.user_exams == {}
+    assert delta.questions[100].response_count == 1
+
+
+def test_same_timestamp_is_ordered_by_response_id():
+    delta = build_rollup_delta([event(8, 1, 100, True, 0), event(7, 1, 100, False, 0)], {})
+
+    assert delta.latest[(1, 100)].response_id == 8
+
+
+@pytest.mark.parametrize("correct, total, expected", [(1, 2, 50), (1, 8, 13), (5, 8, 63), (1, 3, 33), (2, 3, 67),
+                                                      (0, 0, 0)])
+def test_accuracy_rate_rounds_half_up(correct, total, expected):
+    assert accuracy_rate(correct, total) == expected
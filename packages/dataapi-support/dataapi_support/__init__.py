@@ -0,0 +1,9 @@
+"""
+lambdas と db/create-quiz で共有する RDS Data API（rds-data）の補助モジュール
+
+    dataapi_support.retry    : Aurora Serverless の再開中・スロットリングのエラーを待って再試行する処理
+    dataapi_support.emulator : rds-data クライアントの代わりに注入するローカルのエミュレーター
+
+どちらも requirements.txt にこのディレクトリへの相対パスで登録しています
+（lambdas/ または db/create-quiz/ で pip install -r requirements.txt を実行してください）。
+"""
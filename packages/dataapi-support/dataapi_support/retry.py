@@ -0,0 +1,152 @@
+import os
+import random
+import time
+
+# Data APIの再試行設定（Aurora Serverlessの再開・スロットリングのみ再試行する）
+DB_RETRY_MAX_ATTEMPTS = int(os.environ.get("DB_RETRY_MAX_ATTEMPTS", "8"))
+# 再試行を打ち切るまでの合計時間（API Gatewayの29秒の上限より短くする）
+DB_RETRY_DEADLINE_SECONDS = float(os.environ.get("DB_RETRY_DEADLINE_SECONDS", "20"))
+# 再開待ちの基準秒数（再開には数秒〜十数秒かかるため長めにする）
+DB_RETRY_RESUME_BASE_DELAY = float(os.environ.get("DB_RETRY_RESUME_BASE_DELAY", "1.0"))
+# スロットリング・一時的な接続エラーの基準秒数
+DB_RETRY_BASE_DELAY = float(os.environ.get("DB_RETRY_BASE_DELAY", "0.1"))
+DB_RETRY_MAX_DELAY = float(os.environ.get("DB_RETRY_MAX_DELAY", "5.0"))
+
+# エラーの分類
+RESUMING = "resuming"
+THROTTLED = "throttled"
+UNAVAILABLE = "unavailable"
+CONNECT = "connect"
+
+_ERROR_CODES = {
+    "DatabaseResumingException": RESUMING,
+    "ThrottlingException": THROTTLED,
+    "TooManyRequestsException": THROTTLED,
+    "ServiceUnavailableError": UNAVAILABLE,
+    "DatabaseUnavailableException": UNAVAILABLE,
+}
+# 接続前に失敗したことが確実なエラー（送信後のタイムアウトは文が実行された可能性があるため再試行しない）
+_CONNECT_ERRORS = {"ConnectTimeoutError", "EndpointConnectionError"}
+_RESUMING_MESSAGES = ("resuming after being auto-paused", "is resuming")
+
+def classify_error(error: BaseException) -> str | None:
+    """
+    再試行してよいエラーの分類を返す（再試行しないエラーはNone）
+    SQLAlchemy（.orig）や aurora_data_api（__cause__）が包んだ元の例外もたどる
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        response = getattr(error, "response", None)
+        if isinstance(response, dict):
+            category = _ERROR_CODES.get(response.get("Error", {}).get("Code"))
+            if category:
+                return category
+        name = type(error).__name__
+        if name in _ERROR_CODES:
+            return _ERROR_CODES[name]
+        if name in _CONNECT_ERRORS:
+            return CONNECT
+        # pymysql: Can't connect to MySQL server（再開中のクラスターへの接続失敗）
+        if name == "OperationalError" and getattr(error, "args", None) and error.args[0] == 2003:
+            return CONNECT
+        if any(message in str(error) for message in _RESUMING_MESSAGES):
+            return RESUMING
+        error = getattr(error, "orig", None) or error.__cause__ or error.__context__
+    return None
+
+class RetryPolicy:
+    """指数バックオフ（フルジッター）と、合計待ち時間の上限を持つ再試行ポリシー"""
+
+    def __init__(self, max_attempts: int = DB_RETRY_MAX_ATTEMPTS, deadline_seconds: float = DB_RETRY_DEADLINE_SECONDS,
+                 resume_base_delay: float = DB_RETRY_RESUME_BASE_DELAY, base_delay: float = DB_RETRY_BASE_DELAY,
+                 max_delay: float = DB_RETRY_MAX_DELAY):
+        self.max_attempts = max_attempts
+        self.deadline_seconds = deadline_seconds
+        self.resume_base_delay = resume_base_delay
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, category: str, attempt: int, rng=random) -> float:
+        base = self.resume_base_delay if category == RESUMING else self.base_delay
+        cap = min(self.max_delay, base * (2 ** attempt))
+        if category == RESUMING:
+            # 再開には時間がかかるため、待ち時間の下限を半分にする
+            return rng.uniform(cap / 2, cap)
+        return rng.uniform(0, cap)
+
+class RetryOutcome:
+    """1回の呼び出しの再試行結果（メトリクス出力用）"""
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.attempts = 0
+        self.waited_seconds = 0.0
+        self.resume_wait_seconds = 0.0
+        self.categories: list[str] = []
+        self.succeeded = False
+
+def call_with_retry(fn, *args, operation: str = "call", policy: RetryPolicy | None = None, observer=None,
+                    clock=time.monotonic, sleep=time.sleep, **kwargs):
+    """
+    fn(*args, **kwargs) を実行し、再開中・スロットリングなどの一時的なエラーの場合は待って再試行する
+    再試行が発生した場合のみ observer(RetryOutcome) を呼び出す
+    """
+    policy = policy or DEFAULT_POLICY
+    outcome = RetryOutcome(operation)
+    started = clock()
+    while True:
+        outcome.attempts += 1
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            category = classify_error(e)
+            if category is None:
+                raise
+            outcome.categories.append(category)
+            delay = policy.delay(category, outcome.attempts - 1)
+            if outcome.attempts >= policy.max_attempts or clock() - started + delay > policy.deadline_seconds:
+                if observer:
+                    observer(outcome)
+                raise
+            sleep(delay)
+            outcome.waited_seconds += delay
+            if category == RESUMING:
+                outcome.resume_wait_seconds += delay
+            continue
+        if outcome.attempts > 1 and observer:
+            outcome.succeeded = True
+            observer(outcome)
+        return result
+
+DEFAULT_POLICY = RetryPolicy()
+
+class ResilientDataAPIClient:
+    """
+    rds-data クライアントの呼び出しを call_with_retry で包むプロキシ
+    再開中・スロットリングのエラーは文の実行前に返るため、書き込みを含めて再試行できる
+    """
+
+    _RETRIED_METHODS = {"execute_statement", "batch_execute_statement", "begin_transaction",
+                        "commit_transaction", "rollback_transaction"}
+
+    def __init__(self, client, policy: RetryPolicy | None = None, observer=None):
+        self.client = client
+        self.policy = policy
+        self.observer = observer
+
+    def __getattr__(self, name):
+        attribute = getattr(self.client, name)
+        if name not in self._RETRIED_METHODS:
+            return attribute
+
+        def call(*args, **kwargs):
+            return call_with_retry(attribute, *args, operation=name, policy=self.policy, observer=self.observer, **kwargs)
+        return call
+
+def data_api_client_config():
+    """
+    boto3クライアントの設定（botocore自身の再試行を無効にし、再試行はこのモジュールで一元管理する）
+    """
+    from botocore.config import Config
+    return Config(retries={"mode": "standard", "max_attempts": 1}, connect_timeout=5)
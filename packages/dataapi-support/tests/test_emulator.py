@@ -0,0 +1,246 @@
+import pytest
+
+from dataapi_support.emulator import DataAPIEmulator, create_backend, exceptions, to_pyformat
+from dataapi_support.retry import ResilientDataAPIClient, RetryPolicy, call_with_retry
+
+
+class FakeClock:
+    """emulator の clock・sleep に注入する手動で進める時計"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def param(name, **value):
+    return {"name": name, "value": value}
+
+
+@pytest.fixture
+def client():
+    emulator = DataAPIEmulator("sqlite://")
+    emulator.execute_statement(sql="CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, price REAL)")
+    return emulator
+
+
+def select_names(client, transaction_id=None):
+    kwargs = {"transactionId": transaction_id} if transaction_id else {}
+    response = client.execute_statement(sql="SELECT name FROM items ORDER BY id", **kwargs)
+    return [row[0]["stringValue"] for row in response["records"]]
+
+
+# ---- SQLiteバックエンド ----
+
+def test_insert_returns_generated_id_and_row_count(client):
+    response = client.execute_statement(
+        sql="INSERT INTO items (name, price) VALUES (:name, :price)",
+        parameters=[param("name", stringValue="lambda"), param("price", doubleValue=1.5)],
+    )
+
+    assert response["numberOfRecordsUpdated"] == 1
+    assert response["generatedFields"] == [{"longValue": 1}]
+    assert select_names(client) == ["lambda"]
+
+
+def test_select_encodes_values_and_column_metadata(client):
+    client.execute_statement(
+        sql="INSERT INTO items (name, price) VALUES (:name, :price)",
+        parameters=[param("name", stringValue="s3"), param("price", isNull=True)],
+    )
+
+    response = client.execute_statement(sql="SELECT id, name, price FROM items", includeResultMetadata=True)
+
+    assert response["records"] == [[{"longValue": 1}, {"stringValue": "s3"}, {"isNull": True}]]
+    assert [(column["name"], column["typeName"]) for column in response["columnMetadata"]] == [
+        ("id", "BIGINT"), ("name", "VARCHAR"), ("price", "NULL")]
+
+
+def test_select_as_json_records(client):
+    client.execute_statement(sql="INSERT INTO items (name, price) VALUES ('ec2', 2.5)")
+
+    response = client.execute_statement(sql="SELECT name, price FROM items", formatRecordsAs="JSON")
+
+    assert response["formattedRecords"] == '[{"name": "ec2", "price": 2.5}]'
+
+
+def test_rollback_discards_statements_in_transaction(client):
+    transaction_id = client.begin_transaction()["transactionId"]
+    client.execute_statement(sql="INSERT INTO items (name) VALUES ('vpc')", transactionId=transaction_id)
+    assert select_names(client, transaction_id) == ["vpc"]
+
+    assert client.rollback_transaction(transactionId=transaction_id) == {"transactionStatus": "Rollback Complete"}
+
+    assert select_names(client) == []
+
+
+def test_commit_keeps_statements_in_transaction(client):
+    transaction_id = client.begin_transaction()["transactionId"]
+    client.batch_execute_statement(
+        sql="INSERT INTO items (name) VALUES (:name)",
+        parameterSets=[[param("name", stringValue="iam")], [param("name", stringValue="kms")]],
+        transactionId=transaction_id,
+    )
+    client.commit_transaction(transactionId=transaction_id)
+
+    assert select_names(client) == ["iam", "kms"]
+
+
+def test_batch_outside_transaction_is_atomic(client):
+    # 2件目がNOT NULL制約に違反するため、1件目も保存されない
+    with pytest.raises(exceptions.BadRequestException):
+        client.batch_execute_statement(
+            sql="INSERT INTO items (name) VALUES (:name)",
+            parameterSets=[[param("name", stringValue="sqs")], [param("name", isNull=True)]],
+        )
+
+    assert select_names(client) == []
+
+
+def test_sql_error_is_mapped_to_bad_request(client):
+    with pytest.raises(exceptions.BadRequestException) as raised:
+        client.execute_statement(sql="SELECT * FROM missing_table")
+
+    error = raised.value
+    assert isinstance(error, exceptions.ClientError)
+    assert error.response["Error"]["Code"] == "BadRequestException"
+    assert error.response["Error"]["Message"].startswith("Database error code: 0. Message: no such table")
+    assert client.stats()["errors"] == 1
+
+
+def test_unknown_transaction_is_rejected(client):
+    with pytest.raises(exceptions.BadRequestException, match="is not found"):
+        client.commit_transaction(transactionId="unknown")
+
+
+def test_array_parameters_are_rejected(client):
+    with pytest.raises(exceptions.BadRequestException, match="Array parameters"):
+        client.execute_statement(sql="SELECT :ids", parameters=[param("ids", arrayValue={"longValues": [1]})])
+
+
+def test_sql_error_through_aurora_data_api(client):
+    aurora_data_api = pytest.importorskip("aurora_data_api")
+    connection = aurora_data_api.connect(aurora_cluster_arn="arn", secret_arn="secret", database="quiz",
+                                         rds_data_client=client)
+    cursor = connection.cursor()
+
+    with pytest.raises(aurora_data_api.exceptions.DatabaseError):
+        cursor.execute("SELECT * FROM missing_table")
+
+
+# ---- :name -> %(name)s の変換（MySQLバックエンド） ----
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM items WHERE id = :id", "SELECT * FROM items WHERE id = %(id)s"),
+    (":first_name,:b2", "%(first_name)s,%(b2)s"),
+    ("VALUES (:a,:b)", "VALUES (%(a)s,%(b)s)"),
+    # 文字列リテラル・識別子の中は変換しない
+    ("SELECT ':id', \":id\", `:id` FROM t WHERE x = :x", "SELECT ':id', \":id\", `:id` FROM t WHERE x = %(x)s"),
+    ("SELECT 'it\\'s :a', :b", "SELECT 'it\\'s :a', %(b)s"),
+    ("SELECT 'it''s :a', :b", "SELECT 'it''s :a', %(b)s"),
+    # リテラルの % はpymysqlのためにエスケープする
+    ("WHERE name LIKE '%lambda%' AND id = :id", "WHERE name LIKE '%%lambda%%' AND id = %(id)s"),
+    ("SELECT 10 % 3", "SELECT 10 %% 3"),
+    # 名前で始まらないコロン・:: は変換しない
+    ("SELECT '12:30', x::int, :1", "SELECT '12:30', x::int, :1"),
+    ("", ""),
+])
+def test_to_pyformat(sql, expected):
+    assert to_pyformat(sql) == expected
+
+
+def test_mysql_backend_converts_named_parameters():
+    pytest.importorskip("pymysql")
+    backend = create_backend("mysql://root:p%40ss@db:3307/quiz")
+
+    assert backend.convert("SELECT :id") == "SELECT %(id)s"
+    assert backend.connect_args["password"] == "p@ss"
+    assert (backend.connect_args["host"], backend.connect_args["port"], backend.connect_args["database"]) == (
+        "db", 3307, "quiz")
+
+
+def test_unsupported_url_is_rejected():
+    with pytest.raises(ValueError):
+        create_backend("postgresql://localhost/quiz")
+
+
+# ---- スロットリング・再開中・遅延 ----
+
+def test_throttles_when_tokens_run_out():
+    clock = FakeClock()
+    client = DataAPIEmulator("sqlite://", max_rps=2, clock=clock, sleep=clock.sleep)
+
+    client.execute_statement(sql="SELECT 1")
+    client.execute_statement(sql="SELECT 1")
+    with pytest.raises(exceptions.ThrottlingException):
+        client.execute_statement(sql="SELECT 1")
+
+    # 0.5秒で1個補充される
+    clock.now += 0.5
+    client.execute_statement(sql="SELECT 1")
+    with pytest.raises(exceptions.ThrottlingException):
+        client.execute_statement(sql="SELECT 1")
+    assert client.stats()["throttled"] == 2
+    assert client.stats()["calls"]["ExecuteStatement"] == 5
+
+
+def test_resuming_after_start_and_after_auto_pause():
+    clock = FakeClock()
+    client = DataAPIEmulator("sqlite://", resume_seconds=5, auto_pause_seconds=60, clock=clock, sleep=clock.sleep)
+
+    with pytest.raises(exceptions.DatabaseResumingException):
+        client.execute_statement(sql="SELECT 1")
+    clock.now += 5
+    client.execute_statement(sql="SELECT 1")
+
+    # 自動一時停止の秒数を超えて空くと、再び再開中になる
+    clock.now += 61
+    with pytest.raises(exceptions.DatabaseResumingException):
+        client.begin_transaction()
+    clock.now += 5
+    client.begin_transaction()
+    assert client.stats()["resuming"] == 2
+
+
+def test_injects_latency_with_jitter():
+    clock = FakeClock()
+    client = DataAPIEmulator("sqlite://", latency_ms=20, jitter_ms=5, seed=1, clock=clock, sleep=clock.sleep)
+
+    for _ in range(20):
+        client.execute_statement(sql="SELECT 1")
+
+    assert len(clock.sleeps) == 20
+    assert all(0.015 <= seconds <= 0.025 for seconds in clock.sleeps)
+    assert client.stats()["injected_latency_ms"] == pytest.approx(sum(clock.sleeps) * 1000)
+
+
+def test_retry_waits_until_resumed():
+    clock = FakeClock()
+    client = DataAPIEmulator("sqlite://", resume_seconds=3, clock=clock, sleep=clock.sleep)
+    outcomes = []
+
+    response = call_with_retry(client.execute_statement, operation="execute_statement",
+                               policy=RetryPolicy(resume_base_delay=1.0, max_delay=2.0), observer=outcomes.append,
+                               clock=clock, sleep=clock.sleep, sql="SELECT 1")
+
+    assert response["records"] == [[{"longValue": 1}]]
+    assert outcomes[0].succeeded
+    assert outcomes[0].attempts > 1
+    assert set(outcomes[0].categories) == {"resuming"}
+    assert outcomes[0].resume_wait_seconds >= 3
+
+
+def test_resilient_client_passes_through_other_errors(client):
+    outcomes = []
+    resilient = ResilientDataAPIClient(client, observer=outcomes.append)
+
+    with pytest.raises(exceptions.BadRequestException):
+        resilient.execute_statement(sql="SELECT * FROM missing_table")
+    assert outcomes == []
+    assert client.stats()["calls"]["ExecuteStatement"] == 2